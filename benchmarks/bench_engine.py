@@ -0,0 +1,112 @@
+"""Compare write throughput of the engine settings profiles on SQLite.
+
+Usage:
+  python benchmarks/bench_engine.py --adds 500 --rows 50000
+  python benchmarks/bench_engine.py --output engine.json
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from budgetwise_cli.domain.models import Base
+from budgetwise_cli.infra.db import EngineSettings, create_engine_from_settings
+from budgetwise_cli.services.budget_service import BudgetService
+
+from ledger import generate_ledger
+
+# SQLite defaults plus pre-ping, i.e. the engine before settings existed
+LEGACY = EngineSettings(
+    pool_pre_ping=True,
+    sqlite_journal_mode=None,
+    sqlite_synchronous=None,
+    sqlite_cache_size=None,
+    sqlite_mmap_size=None,
+    sqlite_busy_timeout=None,
+)
+
+PROFILES = {
+    "legacy": LEGACY,
+    "no-pre-ping": LEGACY._replace(pool_pre_ping=False),
+    "wal": LEGACY._replace(pool_pre_ping=False, sqlite_journal_mode="wal"),
+    "wal-normal": LEGACY._replace(
+        pool_pre_ping=False, sqlite_journal_mode="wal", sqlite_synchronous="normal"
+    ),
+    "default": EngineSettings(),
+}
+
+
+def bench_profile(
+    name: str, settings: EngineSettings, adds: int, rows: int, workdir: Path
+) -> dict[str, Any]:
+    path = workdir / f"{name}.db"
+    engine = create_engine_from_settings(settings._replace(url=f"sqlite:///{path}"))
+    Base.metadata.create_all(engine)
+
+    # One session and commit per add, like separate `add` invocations
+    started = time.perf_counter()
+    for i in range(adds):
+        with Session(engine) as db:
+            BudgetService(db).add_transaction(
+                f"Envelope {i % 20}", Decimal("-1.25"), "bench"
+            )
+            db.commit()
+    add_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    with Session(engine) as db:
+        BudgetService(db).import_transactions(
+            generate_ledger(rows, 50, 12, 42, date(2020, 1, 1))
+        )
+        db.commit()
+    import_seconds = time.perf_counter() - started
+
+    engine.dispose()
+    return {
+        "profile": name,
+        "adds_per_second": round(adds / add_seconds, 1),
+        "import_rows_per_second": round(rows / import_seconds, 1),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--adds", type=int, default=500)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument(
+        "--profiles",
+        default=",".join(PROFILES),
+        help="Comma separated profile names",
+    )
+    parser.add_argument("--output", type=Path, help="Write JSON results here")
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in args.profiles.split(","):
+            row = bench_profile(name, PROFILES[name], args.adds, args.rows, Path(tmp))
+            print(
+                f"{name:<12} {row['adds_per_second']:>10.1f} adds/s "
+                f"{row['import_rows_per_second']:>12.1f} import rows/s",
+                file=sys.stderr,
+            )
+            results.append(row)
+
+    report = json.dumps({"results": results}, indent=2)
+    if args.output:
+        args.output.write_text(report)
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""Compare Decimal and integer-cents handling of ledger amounts.
+
+Usage:
+  python benchmarks/bench_money.py --rows 200000
+  python benchmarks/bench_money.py --output money.json
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from budgetwise_cli.domain import models as m
+from budgetwise_cli.domain.money import format_amount, format_cents
+from budgetwise_cli.services.budget_service import BudgetService, _add_delta, _cents
+
+from ledger import generate_ledger
+
+
+def _best(fn: Callable[[], Any], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def bench(rows: int, repeat: int, workdir: Path) -> list[dict[str, Any]]:
+    engine = create_engine(f"sqlite:///{workdir / 'money.db'}")
+    m.Base.metadata.create_all(engine)
+    t = m.Transaction
+    results = []
+
+    with Session(engine) as db:
+        BudgetService(db).import_transactions(
+            generate_ledger(rows, 50, 12, 42, date(2020, 1, 1))
+        )
+        db.commit()
+
+        # Per (envelope, month) totals folded in Python, as the write path does
+        def fold_decimal() -> None:
+            deltas: dict[tuple[int, int, int], list[Any]] = {}
+            for env_id, ts, amount in db.execute(select(t.env_id, t.ts, t.amount)):
+                key = (env_id, ts.year, ts.month)
+                delta = deltas.get(key)
+                if delta is None:
+                    deltas[key] = [amount, 1]
+                else:
+                    delta[0] += amount
+                    delta[1] += 1
+
+        def fold_cents() -> None:
+            deltas: dict[tuple[int, int, int], list[int]] = {}
+            for env_id, ts, cents in db.execute(
+                select(t.env_id, t.ts, _cents(t.amount))
+            ):
+                _add_delta(deltas, env_id, ts, cents)
+
+        amounts = db.scalars(select(t.amount)).all()
+        cents = db.scalars(select(_cents(t.amount))).all()
+
+        def render_float() -> None:
+            for amount in amounts:
+                f"{float(amount):.2f}"
+
+        def render_decimal() -> None:
+            for amount in amounts:
+                format_amount(amount)
+
+        def render_cents() -> None:
+            for c in cents:
+                format_cents(c)
+
+        def sum_decimal() -> None:
+            sum(amounts, Decimal("0"))
+
+        def sum_cents() -> None:
+            sum(cents)
+
+        for op, fn in (
+            ("fold_decimal", fold_decimal),
+            ("fold_cents", fold_cents),
+            ("sum_decimal", sum_decimal),
+            ("sum_cents", sum_cents),
+            ("render_float", render_float),
+            ("render_decimal", render_decimal),
+            ("render_cents", render_cents),
+        ):
+            seconds = _best(fn, repeat)
+            results.append(
+                {
+                    "op": op,
+                    "rows": rows,
+                    "seconds": round(seconds, 6),
+                    "per_row_ns": round(seconds / rows * 1e9, 1),
+                }
+            )
+
+    engine.dispose()
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, help="Write JSON results here")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = bench(args.rows, args.repeat, Path(tmp))
+    for row in results:
+        print(f"{row['op']:<16} {row['per_row_ns']:>10.1f} ns/row", file=sys.stderr)
+
+    report = json.dumps({"results": results}, indent=2)
+    if args.output:
+        args.output.write_text(report)
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""Time BudgetService operations on synthetic ledgers of increasing size.
+
+Usage:
+  python benchmarks/bench_service.py --sizes 10000,100000 --output results.json
+  python benchmarks/bench_service.py --baseline results.json --max-regression 1.25
+"""
+
+import argparse
+import json
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable
+
+import sqlalchemy
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from budgetwise_cli.domain.models import Base
+from budgetwise_cli.services.analytics import AnalyticsEngine
+from budgetwise_cli.services.budget_service import BudgetService
+
+from ledger import generate_ledger
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+# Single-row operations are repeated this many times per size
+REPEAT = 200
+
+# Recurring schedules expanded by the materialize benchmark
+SCHEDULES = 500
+
+
+def _timed(fn: Callable[[], Any], repeat: int = 1) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return time.perf_counter() - started
+
+
+def bench_size(
+    size: int, envelopes: int, months: int, seed: int, workdir: Path
+) -> list[dict[str, Any]]:
+    path = workdir / f"ledger_{size}.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    start = date(2020, 1, 1)
+    results = []
+
+    def record(op: str, seconds: float, ops: int = 1) -> None:
+        results.append(
+            {
+                "op": op,
+                "size": size,
+                "ops": ops,
+                "seconds": round(seconds, 6),
+                "per_op_us": round(seconds / ops * 1e6, 3),
+            }
+        )
+
+    with Session(engine) as db:
+        service = BudgetService(db)
+        ledger = generate_ledger(size, envelopes, months, seed, start)
+        record("import", _timed(lambda: service.import_transactions(ledger)), size)
+        db.commit()
+
+        ts_range = (start + timedelta(days=40), start + timedelta(days=75))
+        whole_month = (date(2020, 2, 1), date(2020, 2, 29))
+        last_month = (start + timedelta(days=30 * months - 1)).replace(day=1)
+
+        def add() -> None:
+            service.add_transaction("Groceries", Decimal("-12.34"), "bench", None)
+
+        def move() -> None:
+            service.move("Salary", "Groceries", Decimal("1.00"))
+
+        record("add_transaction", _timed(add, REPEAT), REPEAT)
+        record("move", _timed(move, REPEAT), REPEAT)
+        db.commit()
+
+        def uncached(start: date, end: date) -> Callable[[], Any]:
+            # Empty the report cache first so every call runs the query
+            def run() -> None:
+                service.reports.clear()
+                service.report(start, end)
+
+            return run
+
+        record("report_range", _timed(uncached(*ts_range), 20), 20)
+        record("report_month", _timed(uncached(*whole_month), 20), 20)
+        service.report(*ts_range)
+        record("report_cached", _timed(lambda: service.report(*ts_range), 20), 20)
+        record(
+            "pivot_running",
+            _timed(lambda: service.pivot_report(*ts_range, running=True), 20),
+            20,
+        )
+        record(
+            "balance_as_of",
+            _timed(lambda: service.balance_as_of(ts_range[1]), 20),
+            20,
+        )
+        record("search", _timed(lambda: service.search("online ord"), 20), 20)
+        record(
+            "search_filtered",
+            _timed(lambda: service.search("cash", envelope="Travel"), 20),
+            20,
+        )
+        record(
+            "close_month",
+            _timed(lambda: service.close_month(last_month.year, last_month.month)),
+        )
+        db.commit()
+        record(
+            "iter_transactions",
+            _timed(lambda: sum(1 for _ in service.iter_transactions())),
+            size,
+        )
+
+        cache = workdir / f"ledger_{size}.cols"
+        columns = AnalyticsEngine(db, cache)
+        record("analytics_load", _timed(columns.refresh), size)
+        record(
+            "analytics_open",
+            _timed(lambda: AnalyticsEngine(db, cache).refresh()),
+        )
+        record(
+            "analytics_report_range",
+            _timed(lambda: columns.report(*ts_range), 20),
+            20,
+        )
+
+        # Five years of 500 monthly schedules, then an idempotent rerun
+        for i in range(SCHEDULES):
+            service.add_schedule(
+                f"Env {i % envelopes}", Decimal("-9.99"), "monthly", start, f"sub {i}"
+            )
+        db.commit()
+        through = date(start.year + 5, 1, 1) - timedelta(days=1)
+        record(
+            "materialize",
+            _timed(lambda: service.materialize(through)),
+            SCHEDULES * 60,
+        )
+        record("materialize_rerun", _timed(lambda: service.materialize(through)))
+        db.commit()
+
+    engine.dispose()
+    return results
+
+
+def compare(
+    results: list[dict[str, Any]], baseline: list[dict[str, Any]], limit: float
+) -> list[str]:
+    # Returns a line per (op, size) slower than limit x the baseline
+    previous = {(r["op"], r["size"]): r["per_op_us"] for r in baseline}
+    print(f"{'op':<18} {'size':>9} {'baseline us':>12} {'current us':>12} {'ratio':>7}")
+    regressions = []
+    for r in results:
+        before = previous.get((r["op"], r["size"]))
+        if not before:
+            continue
+        ratio = r["per_op_us"] / before
+        line = (
+            f"{r['op']:<18} {r['size']:>9} "
+            f"{before:>12.1f} {r['per_op_us']:>12.1f} {ratio:>6.2f}x"
+        )
+        print(line)
+        if ratio > limit:
+            regressions.append(line)
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        default=",".join(map(str, DEFAULT_SIZES)),
+        help="Comma separated transaction counts",
+    )
+    parser.add_argument("--envelopes", type=int, default=50)
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="Write JSON results here")
+    parser.add_argument("--baseline", type=Path, help="Compare against saved results")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=1.25,
+        help="Fail when an op is this many times slower than the baseline",
+    )
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    results: list[dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            for row in bench_size(
+                size, args.envelopes, args.months, args.seed, Path(tmp)
+            ):
+                print(
+                    f"{row['op']:<18} {row['size']:>9} "
+                    f"{row['per_op_us']:>12.1f} us/op",
+                    file=sys.stderr,
+                )
+                results.append(row)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "sqlite": sqlite3.sqlite_version,
+            "envelopes": args.envelopes,
+            "months": args.months,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())["results"]
+        regressions = compare(results, baseline, args.max_regression)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.max_regression}x:")
+            print("\n".join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
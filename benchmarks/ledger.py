@@ -0,0 +1,66 @@
+"""Deterministic synthetic ledgers for benchmarking the service layer."""
+
+import random
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Iterator
+
+from budgetwise_cli.services.budget_service import TransactionRecord
+
+# Envelopes that receive money each month; every other envelope is spent from
+INCOME_ENVELOPES = ("Salary", "Freelance", "Interest")
+
+EXPENSE_ENVELOPES = (
+    "Groceries",
+    "Rent",
+    "Utilities",
+    "Transport",
+    "Dining",
+    "Entertainment",
+    "Health",
+    "Insurance",
+    "Clothing",
+    "Gifts",
+    "Travel",
+    "Education",
+)
+
+NOTES = ("card payment", "direct debit", "transfer", "cash", "online order", "")
+
+
+def envelope_names(count: int) -> list[str]:
+    base = list(INCOME_ENVELOPES + EXPENSE_ENVELOPES)
+    names = base[:count]
+    names.extend(f"Envelope {i:05d}" for i in range(len(names), count))
+    return names
+
+
+def generate_ledger(
+    transactions: int,
+    envelopes: int = 50,
+    months: int = 12,
+    seed: int = 42,
+    start: date = date(2020, 1, 1),
+) -> Iterator[TransactionRecord]:
+    # Yield records in time order; the same arguments always give the same ledger
+    if envelopes < 1 or months < 1:
+        raise ValueError("Need at least one envelope and one month")
+    rng = random.Random(seed)
+    names = envelope_names(envelopes)
+    incomes = [n for n in names if n in INCOME_ENVELOPES] or names[:1]
+    expenses = [n for n in names if n not in incomes] or names
+    # Skew spending towards a few busy envelopes, as real ledgers do
+    weights = [1 / (rank + 1) for rank in range(len(expenses))]
+
+    span = months * 30 * 86400
+    first = datetime.combine(start, datetime.min.time())
+    step = span / max(transactions, 1)
+    for i in range(transactions):
+        ts = first + timedelta(seconds=int(i * step + rng.random() * step))
+        if rng.random() < 0.05:
+            name = rng.choice(incomes)
+            amount = Decimal(rng.randint(50_000, 500_000)) / 100
+        else:
+            name = rng.choices(expenses, weights)[0]
+            amount = -Decimal(int(rng.lognormvariate(7.5, 1.0)) + 1) / 100
+        yield (name, amount, rng.choice(NOTES), ts)
@@ -1,7 +1,57 @@
+from pathlib import Path
+
 import typer
-from .commands import add, move, report, close_month
+from .commands import (
+    add,
+    analytics,
+    archive,
+    balance,
+    move,
+    report,
+    close_month,
+    export,
+    import_statement,
+    rebuild_balances,
+    recurring,
+    search,
+    set_budget,
+    shell,
+    variance,
+)
 
 app = typer.Typer(help="BudgetWise envelope budgeting")
+recurring_app = typer.Typer(help="Recurring transaction schedules")
+analytics_app = typer.Typer(help="Fast reports from an in-memory column store")
+
+
+@app.callback()
+def main(
+    ctx: typer.Context,
+    profile: bool = typer.Option(
+        False, "--profile", help="Print SQL counts and timings to stderr at exit"
+    ),
+    profile_json: Path | None = typer.Option(
+        None, "--profile-json", help="Write the profile as JSON to this file"
+    ),
+) -> None:
+    if not (profile or profile_json):
+        return
+
+    from budgetwise_cli import STARTED
+    from budgetwise_cli.infra.profiling import Profiler
+    from budgetwise_cli.services.budget_service import BudgetService
+
+    profiler = Profiler(STARTED)
+    profiler.enable(BudgetService)
+
+    def finish() -> None:
+        profiler.disable()
+        if profile_json:
+            profiler.write_json(profile_json)
+        if profile:
+            typer.echo(profiler.format_text(), err=True)
+
+    ctx.call_on_close(finish)
 
 
 app.command(
@@ -23,5 +73,82 @@ app.command(
     help="Close a month and roll balances. • Format: close-month --month year-month",
 )(close_month.cmd_close_month)
 
+app.command(
+    name="import",
+    help="Bulk import a bank statement. • Format: import file [--format csv|ofx|jsonl]",
+)(import_statement.import_statement)
+
+app.command(
+    name="balance",
+    help="Envelope balances as of a date. • Format: balance envelope --as-of date",
+)(balance.balance)
+
+app.command(
+    name="export",
+    help="Stream transactions to CSV or JSONL. • Format: export [--format csv|jsonl]",
+)(export.export)
+
+app.command(
+    name="archive",
+    help="Archive raw rows of closed months. • Format: archive --before year-month",
+)(archive.archive)
+
+app.command(
+    name="rebuild-balances",
+    help="Rebuild or verify monthly balances. • Format: rebuild-balances [--check]",
+)(rebuild_balances.rebuild_balances)
+
+app.command(
+    name="search",
+    help="Search transaction notes. • Format: search query [-e envelope]",
+)(search.search)
+
+app.command(
+    name="variance",
+    help="Budget vs actual per envelope. • Format: variance year-month [--over]",
+)(variance.variance)
+
+app.command(
+    name="set-budget",
+    help="Set many envelope budgets at once. • Format: set-budget name=amount ...",
+)(set_budget.set_budget)
+
+recurring_app.command(
+    name="add",
+    help="Add a recurring schedule. • Format: recurring add envelope amount --every rule",
+)(recurring.add_schedule)
+
+recurring_app.command(
+    name="list", help="List recurring schedules. • Format: recurring list"
+)(recurring.list_schedules)
+
+app.add_typer(recurring_app, name="recurring")
+
+app.command(
+    name="materialize",
+    help="Write due recurring transactions. • Format: materialize --through year-month",
+)(recurring.materialize)
+
+analytics_app.command(
+    name="report",
+    help="Balances per envelope or period. • Format: analytics report year-month",
+)(analytics.report)
+
+analytics_app.command(
+    name="top", help="Largest spending envelopes. • Format: analytics top n"
+)(analytics.top)
+
+analytics_app.command(
+    name="balance",
+    help="Running balance per day. • Format: analytics balance year-month",
+)(analytics.running_balance)
+
+app.add_typer(analytics_app, name="analytics")
+
+app.command(
+    name="shell",
+    help="Interactive shell that reuses one connection pool. • Format: shell",
+)(shell.shell)
+
 if __name__ == "__main__":
     app()
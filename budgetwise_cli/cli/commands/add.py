@@ -1,8 +1,6 @@
 import typer
 from decimal import Decimal
-from rich import print as rprint
 from budgetwise_cli.infra.db import get_session
-from budgetwise_cli.services.budget_service import BudgetService
 
 
 def add(
@@ -14,6 +12,9 @@ def add(
     expense: bool = typer.Option(
         False, "--expense", "-e", help="Mark as expense (amount will be negative)"
     ),
+    external_id: str | None = typer.Option(
+        None, "--id", help="Idempotency key; adding the same id again is a no-op"
+    ),
 ) -> None:
     """Add a transaction to an envelope.
 
@@ -24,7 +25,11 @@ def add(
       add Groceries 50.00 --expense "Weekly shopping"
       add Salary 1500.00 "Monthly income"
       add Entertainment 25.50 --expense
+      add Rent 800.00 --expense --id rent-2025-06
     """
+    from budgetwise_cli.services.budget_service import BudgetService
+    from rich import print as rprint
+
     try:
         # Parse amount and apply sign if needed
         decimal_amount = Decimal(amount)
@@ -32,7 +37,16 @@ def add(
             decimal_amount = -decimal_amount
 
         with get_session() as db:
-            tx = BudgetService(db).add_transaction(env, decimal_amount, note)
+            added = BudgetService(db).add_transactions(
+                [(env, decimal_amount, note, None, external_id)]
+            )
+            if not added:
+                rprint(
+                    f"Skipped transaction: id [bold]{external_id}[/bold] "
+                    "was already added"
+                )
+                return
+            tx = added[0]
 
             tx_info = {
                 "type": tx.type.value if tx.type else "Unknown",
@@ -0,0 +1,177 @@
+import os
+import typer
+from datetime import date
+from pathlib import Path
+from typing import TYPE_CHECKING
+from budgetwise_cli.cli.commands.report import parse_bound
+from budgetwise_cli.infra.db import get_session
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
+    from budgetwise_cli.services.analytics import AnalyticsEngine
+
+CACHE_FILE = Path(
+    os.environ.get("BUDGETWISE_ANALYTICS_CACHE", "~/.cache/budgetwise/ledger.cols")
+)
+
+_CACHE_OPTION = typer.Option(
+    CACHE_FILE, "--cache", help="Memory-mapped column cache, refreshed on each run"
+)
+_NO_CACHE_OPTION = typer.Option(
+    False, "--no-cache", help="Load the ledger into memory only"
+)
+_REBUILD_OPTION = typer.Option(
+    False, "--rebuild", help="Reload every row instead of only new ones"
+)
+
+
+def _engine(
+    db: "Session", cache: Path, no_cache: bool, rebuild: bool
+) -> "AnalyticsEngine":
+    from budgetwise_cli.services.analytics import AnalyticsEngine
+
+    engine = AnalyticsEngine(db, None if no_cache else cache.expanduser())
+    engine.refresh(full=rebuild)
+    return engine
+
+
+def _range(month: str | None, start: str | None, end: str | None) -> tuple[date, date]:
+    month = month or date.today().strftime("%Y-%m")
+    return parse_bound(start or month), parse_bound(end or start or month, last=True)
+
+
+def report(
+    month: str | None = typer.Argument(None, help="Month to report (YYYY-MM)"),
+    start: str | None = typer.Option(None, "--from", help="First month or day"),
+    end: str | None = typer.Option(None, "--to", help="Last month or day"),
+    by: str | None = typer.Option(None, "--by", help="Group by month, quarter or year"),
+    running: bool = typer.Option(
+        False, "--running", help="Show running totals across periods"
+    ),
+    envelope: str | None = typer.Option(
+        None, "--envelope", "-e", help="Only report this envelope"
+    ),
+    cache: Path = _CACHE_OPTION,
+    no_cache: bool = _NO_CACHE_OPTION,
+    rebuild: bool = _REBUILD_OPTION,
+) -> None:
+    """Report balances from the in-memory column store.
+
+    Format: analytics report [YYYY-MM] [--from YYYY-MM --to YYYY-MM] [--by PERIOD]
+
+    Same numbers as `report`, computed over columns of the whole ledger
+    instead of SQL. Install numpy to vectorize the queries.
+
+    Examples:
+      analytics report 2025-06
+      analytics report --from 2024-01 --to 2025-12 --by quarter --running
+    """
+    from budgetwise_cli.domain.money import format_amount
+    from rich.console import Console
+    from rich.table import Table
+
+    first, last = _range(month, start, end)
+    try:
+        with get_session(readonly=True) as db:
+            engine = _engine(db, cache, no_cache, rebuild)
+            if by or running:
+                pivot = engine.pivot_report(first, last, by or "month", running)
+                balances = {
+                    name: row
+                    for name, row in pivot.balances.items()
+                    if envelope is None or name == envelope
+                }
+                periods = pivot.periods
+            else:
+                totals = engine.report(first, last, envelope)
+                balances = {name: [total] for name, total in totals.items()}
+                periods = ["Balance"]
+    except Exception as e:
+        typer.echo(f"Error: {str(e)}", err=True)
+        raise typer.Exit(1)
+
+    table = Table(title=f"Budget report {first} to {last}")
+    table.add_column("Envelope", style="bold")
+    for period in periods:
+        table.add_column(period, justify="right", style="green")
+    for name, row in balances.items():
+        table.add_row(name, *(format_amount(b) for b in row))
+    Console().print(table)
+
+
+def top(
+    n: int = typer.Argument(10, help="Number of envelopes"),
+    month: str | None = typer.Argument(None, help="Month (YYYY-MM)"),
+    start: str | None = typer.Option(None, "--from", help="First month or day"),
+    end: str | None = typer.Option(None, "--to", help="Last month or day"),
+    cache: Path = _CACHE_OPTION,
+    no_cache: bool = _NO_CACHE_OPTION,
+    rebuild: bool = _REBUILD_OPTION,
+) -> None:
+    """Envelopes with the largest spending.
+
+    Format: analytics top [N] [YYYY-MM] [--from YYYY-MM --to YYYY-MM]
+
+    Examples:
+      analytics top 5
+      analytics top 10 --from 2025-01 --to 2025-12
+    """
+    from budgetwise_cli.domain.money import format_amount
+    from rich.console import Console
+    from rich.table import Table
+
+    first, last = _range(month, start, end)
+    try:
+        with get_session(readonly=True) as db:
+            rows = _engine(db, cache, no_cache, rebuild).top_spending(n, first, last)
+    except Exception as e:
+        typer.echo(f"Error: {str(e)}", err=True)
+        raise typer.Exit(1)
+
+    table = Table(title=f"Top spending {first} to {last}")
+    table.add_column("Envelope", style="bold")
+    table.add_column("Spent", justify="right", style="red")
+    for name, spent in rows:
+        table.add_row(name, format_amount(spent))
+    Console().print(table)
+
+
+def running_balance(
+    month: str | None = typer.Argument(None, help="Month (YYYY-MM)"),
+    start: str | None = typer.Option(None, "--from", help="First month or day"),
+    end: str | None = typer.Option(None, "--to", help="Last month or day"),
+    envelope: str | None = typer.Option(
+        None, "--envelope", "-e", help="One envelope instead of all of them"
+    ),
+    cache: Path = _CACHE_OPTION,
+    no_cache: bool = _NO_CACHE_OPTION,
+    rebuild: bool = _REBUILD_OPTION,
+) -> None:
+    """Closing balance of every day with activity.
+
+    Format: analytics balance [YYYY-MM] [--from DATE --to DATE] [-e envelope]
+
+    Examples:
+      analytics balance 2025-06
+      analytics balance --from 2025-01 --to 2025-03 -e Groceries
+    """
+    from budgetwise_cli.domain.money import format_amount
+    from rich.console import Console
+    from rich.table import Table
+
+    first, last = _range(month, start, end)
+    try:
+        with get_session(readonly=True) as db:
+            rows = _engine(db, cache, no_cache, rebuild).running_balance(
+                first, last, envelope
+            )
+    except Exception as e:
+        typer.echo(f"Error: {str(e)}", err=True)
+        raise typer.Exit(1)
+
+    table = Table(title=f"Running balance {first} to {last}")
+    table.add_column("Date")
+    table.add_column("Balance", justify="right", style="green")
+    for day, balance in rows:
+        table.add_row(str(day), format_amount(balance))
+    Console().print(table)
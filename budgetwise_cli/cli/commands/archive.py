@@ -0,0 +1,59 @@
+import typer
+from datetime import date
+from pathlib import Path
+from typing import cast
+from budgetwise_cli.cli.commands.close_month import _validate_year_month
+from budgetwise_cli.infra.db import get_session
+
+
+def archive(
+    before: str = typer.Option(
+        ...,
+        "--before",
+        help="Archive closed months before this one (YYYY-MM)",
+        callback=_validate_year_month,
+    ),
+    to_dir: Path | None = typer.Option(
+        None,
+        "--to-dir",
+        file_okay=False,
+        help="Write one compressed file per month here instead of the archive table",
+    ),
+    fmt: str = typer.Option(
+        "jsonl", "--format", "-f", help="File format: jsonl or csv"
+    ),
+) -> None:
+    """Move raw rows of closed months out of the transactions table.
+
+    Format: archive --before YYYY-MM [--to-dir DIR] [--format jsonl|csv]
+
+    Monthly summaries stay behind, so whole-month reports are unchanged.
+    Rows archived to files can no longer be reported for part of a month.
+
+    Examples:
+      archive --before 2024-01                    # Into transactions_archive
+      archive --before 2024-01 --to-dir archive/  # transactions-2023-12.jsonl.gz ...
+    """
+    from budgetwise_cli.services.budget_service import BudgetService
+    from rich import print as rprint
+
+    year_num, month_num = cast(tuple[int, int], before)
+    if to_dir is not None:
+        to_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        with get_session() as db:
+            batches = BudgetService(db).archive_months(
+                date(year_num, month_num, 1), to_dir, fmt
+            )
+    except Exception as e:
+        typer.echo(f"Error archiving: {str(e)}", err=True)
+        raise typer.Exit(1)
+
+    if not batches:
+        rprint("Nothing to archive")
+    for batch in batches:
+        target = batch.path or "transactions_archive"
+        rprint(
+            f"Archived [bold]{batch.tx_count}[/bold] transactions from "
+            f"{batch.year}-{batch.month:02d} to {target}"
+        )
@@ -0,0 +1,50 @@
+import typer
+from datetime import date
+from budgetwise_cli.cli.commands.report import parse_date
+from budgetwise_cli.infra.db import get_session
+
+
+def balance(
+    envelope: str | None = typer.Argument(None, help="Envelope name (default: all)"),
+    as_of: str | None = typer.Option(
+        None, "--as-of", help="Balance at the end of this day (default: today)"
+    ),
+    check: bool = typer.Option(
+        False, "--check", help="Verify the result against a full ledger scan"
+    ),
+) -> None:
+    """Show envelope balances as of a date.
+
+    Format: balance [envelope] [--as-of YYYY-MM-DD] [--check]
+
+    Examples:
+      balance                          # Every envelope, today
+      balance Groceries --as-of 2025-03-31
+      balance --as-of 2024-12-31 --check
+    """
+    from budgetwise_cli.services.budget_service import BudgetService
+    from budgetwise_cli.domain.money import format_amount
+    from rich.console import Console
+    from rich.table import Table
+
+    day = parse_date(as_of) if as_of else date.today()
+    try:
+        with get_session() as db:
+            service = BudgetService(db)
+            balances = service.balance_as_of(day, envelope)
+            if check:
+                expected = service.balance_as_of(day, envelope, full_scan=True)
+    except Exception as e:
+        typer.echo(f"Error: {str(e)}", err=True)
+        raise typer.Exit(1)
+
+    table = Table(title=f"Balances as of {day}")
+    table.add_column("Envelope", style="bold")
+    table.add_column("Balance", justify="right", style="green")
+    for name, amount in balances.items():
+        table.add_row(name, format_amount(amount))
+    Console().print(table)
+
+    if check and balances != expected:
+        typer.echo("Checkpoint balances disagree with the ledger", err=True)
+        raise typer.Exit(1)
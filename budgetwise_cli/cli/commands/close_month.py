@@ -2,8 +2,6 @@ import typer
 from datetime import date
 from typing import cast
 from budgetwise_cli.infra.db import get_session
-from budgetwise_cli.services.budget_service import BudgetService
-from rich import print as rprint
 
 
 def _validate_year_month(
@@ -34,7 +32,13 @@ def cmd_close_month(
         "-m",
         help="Month to close in YYYY-MM format",
         callback=_validate_year_month,
-    )
+    ),
+    redirect_closed: bool = typer.Option(
+        False,
+        "--redirect-closed",
+        help="Book the opening balances on the first open month if the next "
+        "month is already closed",
+    ),
 ) -> None:
     """Close a month and roll over balances.
 
@@ -44,12 +48,18 @@ def cmd_close_month(
       close-month                 # Close current month
       close-month --month 2025-06 # Close June 2025
       close-month -m 2025-05      # Close May 2025 (short option)
+      close-month -m 2025-04 --redirect-closed
     """
+    from budgetwise_cli.services.budget_service import BudgetService
+    from rich import print as rprint
+
     year_month_tuple = cast(tuple[int, int], year_month)
     year_num, month_num = year_month_tuple
     try:
         with get_session() as db:
-            BudgetService(db).close_month(year_num, month_num)
+            BudgetService(db).close_month(
+                year_num, month_num, redirect_closed=redirect_closed
+            )
 
         rprint(f"Closed month [bold]{year_num}-{month_num:02d}[/bold] successfully")
     except Exception as e:
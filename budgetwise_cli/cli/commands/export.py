@@ -0,0 +1,67 @@
+import sys
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import IO
+
+import typer
+from budgetwise_cli.cli.commands.report import parse_date
+from budgetwise_cli.infra.db import get_session
+from budgetwise_cli.services.statements import EXPORT_CHUNK_SIZE, write_statement
+
+# Large write buffer so output is flushed in few system calls
+WRITE_BUFFER_BYTES = 1 << 20
+
+
+def export(
+    fmt: str = typer.Option("csv", "--format", "-f", help="csv or jsonl"),
+    output: Path | None = typer.Option(
+        None, "--output", "-o", dir_okay=False, help="Output file (default: stdout)"
+    ),
+    start: str | None = typer.Option(None, "--from", help="First day (YYYY-MM-DD)"),
+    end: str | None = typer.Option(
+        None, "--to", help="Last day, inclusive (YYYY-MM-DD)"
+    ),
+    envelope: str | None = typer.Option(None, "--envelope", "-e", help="Envelope name"),
+    chunk_size: int = typer.Option(
+        EXPORT_CHUNK_SIZE, "--chunk-size", help="Rows fetched per round trip"
+    ),
+) -> None:
+    """Stream transactions to CSV or JSONL.
+
+    Format: export [--format csv|jsonl] [--output FILE] [--from DATE] [--to DATE]
+
+    Examples:
+      export -o ledger.csv
+      export --format jsonl --from 2025-01-01 --to 2025-06-30 -o h1.jsonl
+      export --envelope Groceries > groceries.csv
+    """
+    from budgetwise_cli.services.budget_service import BudgetService
+
+    if fmt not in ("csv", "jsonl"):
+        raise typer.BadParameter("Format must be csv or jsonl")
+    first = parse_date(start) if start else None
+    last = parse_date(end) if end else None
+
+    try:
+        started = time.perf_counter()
+        target: IO[str]
+        with (
+            output.open("w", newline="", buffering=WRITE_BUFFER_BYTES)
+            if output
+            else nullcontext(sys.stdout)
+        ) as target, get_session(readonly=True) as db:
+            rows = BudgetService(db).iter_transactions(
+                first, last, envelope, chunk_size=chunk_size
+            )
+            count = write_statement(rows, target, fmt)
+        elapsed = time.perf_counter() - started
+    except Exception as e:
+        typer.echo(f"Error exporting transactions: {str(e)}", err=True)
+        raise typer.Exit(1)
+
+    rate = count / elapsed if elapsed > 0 else 0.0
+    typer.echo(
+        f"Exported {count} transactions in {elapsed:.2f}s ({rate:,.0f} rows/s)",
+        err=True,
+    )
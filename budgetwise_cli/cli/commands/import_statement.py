@@ -0,0 +1,77 @@
+import time
+from pathlib import Path
+
+import typer
+from budgetwise_cli.infra.db import get_session
+from budgetwise_cli.services.statements import (
+    IMPORT_BATCH_SIZE,
+    read_statement,
+    with_content_ids,
+)
+
+
+def import_statement(
+    file: Path = typer.Argument(
+        ..., exists=True, dir_okay=False, help="Statement file (.csv, .ofx, .jsonl)"
+    ),
+    fmt: str | None = typer.Option(
+        None, "--format", "-f", help="csv, ofx or jsonl (default: from file suffix)"
+    ),
+    envelope: str = typer.Option(
+        "Imported",
+        "--envelope",
+        "-e",
+        help="Envelope for rows that do not name one (always used for OFX)",
+    ),
+    batch_size: int = typer.Option(
+        IMPORT_BATCH_SIZE, "--batch-size", help="Rows inserted per statement"
+    ),
+    redirect_closed: bool = typer.Option(
+        False,
+        "--redirect-closed",
+        help="Book rows dated in closed months on the first open month instead",
+    ),
+    no_dedup: bool = typer.Option(
+        False,
+        "--no-dedup",
+        help="Insert rows without a bank id even if an identical row was imported",
+    ),
+) -> None:
+    """Import transactions from a bank statement in one transaction.
+
+    Format: import <file> [--format csv|ofx|jsonl] [--envelope NAME]
+
+    Rows are keyed by the bank's id (OFX FITID, a CSV fitid column) or else
+    by a hash of their content, so importing a statement again or one that
+    overlaps an earlier import skips the rows already stored.
+
+    Examples:
+      import january.csv
+      import checking.ofx --envelope Checking
+      import ledger.jsonl --batch-size 20000
+      import late.csv --redirect-closed
+    """
+    from budgetwise_cli.services.budget_service import BudgetService
+    from rich import print as rprint
+
+    try:
+        started = time.perf_counter()
+        rows = read_statement(file, fmt, envelope)
+        with get_session() as db:
+            inserted, skipped = BudgetService(db).import_transactions(
+                rows if no_dedup else with_content_ids(rows),
+                batch_size=batch_size,
+                redirect_closed=redirect_closed,
+            )
+        elapsed = time.perf_counter() - started
+
+        rate = (inserted + skipped) / elapsed if elapsed > 0 else 0.0
+        rprint(
+            f"Imported [bold]{inserted}[/bold] transactions from "
+            f"[bold]{file.name}[/bold] in {elapsed:.2f}s ({rate:,.0f} rows/s)"
+        )
+        if skipped:
+            rprint(f"Skipped [bold]{skipped}[/bold] duplicates already imported")
+    except Exception as e:
+        typer.echo(f"Error importing statement: {str(e)}", err=True)
+        raise typer.Exit(1)
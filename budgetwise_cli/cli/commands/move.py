@@ -1,8 +1,6 @@
 import typer
 from decimal import Decimal
-from rich import print as rprint
 from budgetwise_cli.infra.db import get_session
-from budgetwise_cli.services.budget_service import BudgetService
 
 
 def move(
@@ -19,6 +17,9 @@ def move(
       move Savings Emergency 500.00
       move Entertainment Bills 25.00
     """
+    from budgetwise_cli.services.budget_service import BudgetService
+    from rich import print as rprint
+
     try:
         decimal_amount = Decimal(amount)
 
@@ -0,0 +1,43 @@
+import typer
+from budgetwise_cli.infra.db import get_session
+
+
+def rebuild_balances(
+    check: bool = typer.Option(
+        False, "--check", help="Only verify the snapshot against the ledger"
+    ),
+) -> None:
+    """Rebuild or verify the monthly balance snapshot table.
+
+    Format: rebuild-balances [--check]
+
+    Examples:
+      rebuild-balances          # Recompute every envelope month from the ledger
+      rebuild-balances --check  # List envelope months that disagree with the ledger
+    """
+    from budgetwise_cli.services.budget_service import BudgetService
+    from rich import print as rprint
+
+    try:
+        with get_session() as db:
+            service = BudgetService(db)
+            if check:
+                mismatches = service.verify_month_balances()
+            else:
+                count = service.rebuild_month_balances()
+    except Exception as e:
+        typer.echo(f"Error rebuilding balances: {str(e)}", err=True)
+        raise typer.Exit(1)
+
+    if not check:
+        rprint(f"Rebuilt [bold]{count}[/bold] envelope month balances")
+        return
+    if not mismatches:
+        rprint("[green]Monthly balances match the ledger[/green]")
+        return
+    for mm in mismatches:
+        rprint(
+            f"[red]{mm.envelope} {mm.year}-{mm.month:02d}[/red]: "
+            f"ledger {mm.expected}, snapshot {mm.actual}"
+        )
+    raise typer.Exit(1)
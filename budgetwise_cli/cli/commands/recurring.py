@@ -0,0 +1,129 @@
+import typer
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from budgetwise_cli.cli.commands.report import parse_bound, parse_date
+from budgetwise_cli.infra.db import get_session
+
+
+def add_schedule(
+    env: str = typer.Argument(..., help="Envelope name"),
+    amount: str = typer.Argument(..., help="Amount of each occurrence"),
+    every: str = typer.Option(
+        "monthly",
+        "--every",
+        help="daily, weekly, biweekly, monthly, quarterly or yearly",
+    ),
+    start: str | None = typer.Option(
+        None, "--start", help="First occurrence (YYYY-MM-DD), default today"
+    ),
+    until: str | None = typer.Option(
+        None, "--until", help="No occurrences after this day (YYYY-MM-DD)"
+    ),
+    note: str = typer.Option("", "--note", "-n", help="Note on every occurrence"),
+    expense: bool = typer.Option(
+        False, "--expense", "-e", help="Mark as expense (amount will be negative)"
+    ),
+) -> None:
+    """Add a recurring transaction schedule.
+
+    Format: recurring add <envelope> <amount> [--every RULE] [--start DATE]
+
+    Monthly, quarterly and yearly schedules fall on the start date's day of
+    the month, or the month's last day when it is shorter.
+
+    Examples:
+      recurring add Rent 1200 --expense --start 2025-01-01 -n "Rent"
+      recurring add Salary 3000 --start 2025-01-28
+      recurring add Gym 30 -e --every monthly --until 2025-12-31
+    """
+    from budgetwise_cli.services.budget_service import BudgetService
+
+    try:
+        value = Decimal(amount)
+    except InvalidOperation:
+        raise typer.BadParameter(f"Invalid amount {amount!r}") from None
+    if expense and value > 0:
+        value = -value
+    first = parse_date(start) if start else date.today()
+    last = parse_date(until) if until else None
+    try:
+        with get_session() as db:
+            schedule_id = (
+                BudgetService(db).add_schedule(env, value, every, first, note, last).id
+            )
+    except Exception as e:
+        typer.echo(f"Error adding schedule: {str(e)}", err=True)
+        raise typer.Exit(1)
+    typer.echo(f"Added schedule {schedule_id}: {every} {value} to {env} from {first}")
+
+
+def list_schedules() -> None:
+    """List recurring transaction schedules.
+
+    Format: recurring list
+    """
+    from budgetwise_cli.services.budget_service import BudgetService
+    from budgetwise_cli.domain.money import format_amount
+    from rich.console import Console
+    from rich.table import Table
+
+    try:
+        with get_session() as db:
+            rows = BudgetService(db).schedules()
+    except Exception as e:
+        typer.echo(f"Error: {str(e)}", err=True)
+        raise typer.Exit(1)
+
+    table = Table(title="Recurring schedules")
+    table.add_column("Id", justify="right")
+    table.add_column("Envelope", style="bold")
+    table.add_column("Every")
+    table.add_column("Amount", justify="right", style="green")
+    table.add_column("From")
+    table.add_column("Until")
+    table.add_column("Note")
+    for schedule_id, name, rule, amount, note, first, last in rows:
+        table.add_row(
+            str(schedule_id),
+            name,
+            rule,
+            format_amount(amount),
+            str(first),
+            str(last or ""),
+            note or "",
+        )
+    Console().print(table)
+
+
+def materialize(
+    through: str = typer.Option(
+        ..., "--through", help="Last month (YYYY-MM) or day to materialize"
+    ),
+) -> None:
+    """Write every due occurrence of the recurring schedules.
+
+    Format: materialize --through YYYY-MM
+
+    Safe to rerun: occurrences already in the ledger are not written again,
+    and occurrences in closed months are skipped.
+
+    Examples:
+      materialize --through 2025-06
+      materialize --through 2025-06-15
+    """
+    from budgetwise_cli.services.budget_service import BudgetService
+
+    last = parse_bound(through, last=True)
+    try:
+        with get_session() as db:
+            result = BudgetService(db).materialize(last)
+    except Exception as e:
+        typer.echo(f"Error materializing schedules: {str(e)}", err=True)
+        raise typer.Exit(1)
+    typer.echo(f"Materialized {result.inserted} transactions through {last}")
+    if result.existing or result.closed:
+        typer.echo(
+            f"Skipped {result.existing} already present, "
+            f"{result.closed} in closed months",
+            err=True,
+        )
@@ -1,11 +1,7 @@
 import typer
+from calendar import monthrange
 from datetime import date, datetime
-from rich.table import Table
-from rich.console import Console
 from budgetwise_cli.infra.db import get_session
-from budgetwise_cli.services.budget_service import BudgetService
-
-console = Console()
 
 
 def parse_date(val: str) -> date:
@@ -15,36 +11,100 @@ def parse_date(val: str) -> date:
         raise typer.BadParameter("Date must be in YYYY-MM-DD format") from None
 
 
+def parse_bound(val: str, last: bool = False) -> date:
+    # YYYY-MM means the first (or last) day of that month
+    try:
+        if len(val) == 7:
+            year_num, month_num = map(int, val.split("-"))
+            day = monthrange(year_num, month_num)[1] if last else 1
+            return date(year_num, month_num, day)
+    except ValueError:
+        raise typer.BadParameter("Use YYYY-MM or YYYY-MM-DD") from None
+    return parse_date(val)
+
+
 def report(
     month: str = typer.Argument(
         date.today().strftime("%Y-%m"), help="Month to report (YYYY-MM)"
-    )
+    ),
+    start: str | None = typer.Option(
+        None, "--from", help="First month or day of a multi-period report"
+    ),
+    end: str | None = typer.Option(
+        None, "--to", help="Last month or day of a multi-period report"
+    ),
+    by: str | None = typer.Option(
+        None, "--by", help="Group a multi-period report by month, quarter or year"
+    ),
+    running: bool = typer.Option(
+        False, "--running", help="Show running totals across periods"
+    ),
+    envelope: str | None = typer.Option(
+        None, "--envelope", "-e", help="Only report this envelope"
+    ),
+    cache_stats: bool = typer.Option(
+        False, "--cache-stats", help="Print report cache statistics to stderr"
+    ),
 ) -> None:
     """Generate a monthly budget report.
 
-    Format: report [YYYY-MM]
+    Format: report [YYYY-MM] [-e envelope] [--cache-stats]
+    Or use: report --from YYYY-MM --to YYYY-MM [--by month|quarter|year]
 
     Examples:
       report            # Current month
       report 2025-06    # June 2025
       report 2024-12    # December 2024
+      report --from 2025-01 --to 2025-12 --by quarter
+      report --from 2025-01 --to 2025-06 --running
+      report 2025-06 -e Groceries --cache-stats
     """
+    from budgetwise_cli.services.budget_service import BudgetService
+    from budgetwise_cli.domain.money import format_amount
+    from rich.console import Console
+    from rich.table import Table
+
+    if start or end or by or running:
+        first = parse_bound(start or month)
+        last = parse_bound(end or start or month, last=True)
+        try:
+            with get_session(readonly=True) as db:
+                pivot = BudgetService(db).pivot_report(
+                    first, last, by or "month", running=running, envelope=envelope
+                )
+        except Exception as e:
+            typer.echo(f"Error: {str(e)}", err=True)
+            raise typer.Exit(1)
+
+        table = Table(title=f"Budget report {first} to {last}")
+        table.add_column("Envelope", style="bold")
+        for period in pivot.periods:
+            table.add_column(period, justify="right", style="green")
+        for name, balances in pivot.balances.items():
+            table.add_row(name, *(format_amount(b) for b in balances))
+        Console().print(table)
+        return
+
     year_num, month_num = map(int, month.split("-"))
     first = date(year_num, month_num, 1)
-    last = date(year_num, month_num, 1).replace(day=28) + date.resolution * 4
+    last = date(year_num, month_num, monthrange(year_num, month_num)[1])
 
     try:
-        with get_session() as db:
-            data = BudgetService(db).report(first, last)
+        with get_session(readonly=True) as db:
+            service = BudgetService(db)
+            data = service.report(first, last, envelope)
 
             table = Table(title=f"Budget report {month}")
             table.add_column("Envelope", style="bold")
             table.add_column("Balance", justify="right", style="green")
             for key, balance in data.items():
                 name = getattr(key, "name", key)
-                table.add_row(name, f"{float(balance):.2f}")
+                table.add_row(name, format_amount(balance))
     except Exception as e:
         typer.echo(f"Error: {str(e)}", err=True)
         raise typer.Exit(1)
 
-    console.print(table)
+    Console().print(table)
+    if cache_stats:
+        stats = service.reports.stats()
+        typer.echo(" ".join(f"{k}={v}" for k, v in stats.items()), err=True)
@@ -0,0 +1,55 @@
+import typer
+from budgetwise_cli.cli.commands.report import parse_date
+from budgetwise_cli.infra.db import get_session
+
+
+def search(
+    query: str = typer.Argument(..., help="Words to find in transaction notes"),
+    envelope: str | None = typer.Option(None, "--envelope", "-e", help="Envelope name"),
+    start: str | None = typer.Option(None, "--from", help="First day (YYYY-MM-DD)"),
+    end: str | None = typer.Option(
+        None, "--to", help="Last day, inclusive (YYYY-MM-DD)"
+    ),
+    limit: int = typer.Option(50, "--limit", "-n", help="Results per page"),
+    before_id: int | None = typer.Option(
+        None, "--before-id", help="Continue after this transaction id"
+    ),
+) -> None:
+    """Search transaction notes, newest first.
+
+    Format: search <query> [-e envelope] [--from DATE] [--to DATE] [--before-id ID]
+
+    Every word must match the start of a word in the note.
+
+    Examples:
+      search coffee
+      search "card pay" -e Groceries --from 2025-01-01
+      search rent --before-id 10423      # Next page
+    """
+    from budgetwise_cli.services.budget_service import BudgetService
+    from budgetwise_cli.domain.money import format_amount
+    from rich.console import Console
+    from rich.table import Table
+
+    first = parse_date(start) if start else None
+    last = parse_date(end) if end else None
+    try:
+        with get_session(readonly=True) as db:
+            rows = BudgetService(db).search(
+                query, envelope, first, last, limit=limit, before_id=before_id
+            )
+    except Exception as e:
+        typer.echo(f"Error searching: {str(e)}", err=True)
+        raise typer.Exit(1)
+
+    table = Table(title=f"Transactions matching {query!r}")
+    table.add_column("Id", justify="right")
+    table.add_column("Date")
+    table.add_column("Envelope", style="bold")
+    table.add_column("Amount", justify="right", style="green")
+    table.add_column("Note")
+    for tx_id, name, _, amount, note, ts in rows:
+        table.add_row(str(tx_id), f"{ts:%Y-%m-%d}", name, format_amount(amount), note)
+    Console().print(table)
+    if len(rows) == limit:
+        typer.echo(f"More results: --before-id {rows[-1].id}", err=True)
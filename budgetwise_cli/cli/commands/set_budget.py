@@ -0,0 +1,52 @@
+import typer
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from budgetwise_cli.infra.db import get_session
+
+
+def set_budget(
+    assignments: list[str] = typer.Argument(
+        None, help="Budgets as NAME=AMOUNT, e.g. Groceries=400"
+    ),
+    file: Path | None = typer.Option(
+        None, "--file", "-f", help="CSV file with name,budget columns"
+    ),
+) -> None:
+    """Set the monthly budget of many envelopes at once.
+
+    Format: set-budget NAME=AMOUNT... [--file budgets.csv]
+
+    Missing envelopes are created. All budgets are written in one statement.
+
+    Examples:
+      set-budget Groceries=400 Rent=1200
+      set-budget --file budgets.csv
+    """
+    from budgetwise_cli.services.budget_service import BudgetService
+
+    budgets: dict[str, Decimal] = {}
+    try:
+        if file is not None:
+            import csv
+
+            with file.open(newline="", encoding="utf-8") as fh:
+                for row in csv.DictReader(fh):
+                    budgets[row["name"].strip()] = Decimal(row["budget"].strip())
+        for item in assignments or []:
+            name, sep, amount = item.rpartition("=")
+            if not sep or not name.strip():
+                raise typer.BadParameter(f"Expected NAME=AMOUNT, got {item!r}")
+            budgets[name.strip()] = Decimal(amount.strip())
+    except (InvalidOperation, KeyError) as e:
+        typer.echo(f"Error reading budgets: {str(e)}", err=True)
+        raise typer.Exit(1)
+    if not budgets:
+        raise typer.BadParameter("Give NAME=AMOUNT pairs or --file")
+
+    try:
+        with get_session() as db:
+            count = BudgetService(db).set_budgets(budgets)
+    except Exception as e:
+        typer.echo(f"Error setting budgets: {str(e)}", err=True)
+        raise typer.Exit(1)
+    typer.echo(f"Set {count} budgets")
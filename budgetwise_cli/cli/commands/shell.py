@@ -0,0 +1,129 @@
+import os
+import shlex
+from pathlib import Path
+from typing import Callable
+
+import typer
+from budgetwise_cli.infra.db import forget_writes, get_session
+
+HISTORY_FILE = Path(os.environ.get("BUDGETWISE_HISTORY", "~/.budgetwise_history"))
+
+# Commands after which the cached envelope names may be stale
+_WRITE_COMMANDS = {
+    "add",
+    "move",
+    "import",
+    "close-month",
+    "set-budget",
+    "recurring",
+    "materialize",
+}
+
+
+def _load_envelope_names() -> list[str]:
+    from sqlalchemy import select
+    from budgetwise_cli.domain import models as m
+
+    with get_session() as db:
+        return list(db.scalars(select(m.Envelope.name).order_by(m.Envelope.name)))
+
+
+def _make_completer(
+    commands: list[str], envelopes: list[str]
+) -> Callable[[str, int], str | None]:
+    import readline
+
+    def complete(text: str, state: int) -> str | None:
+        # First word completes to a command, later words to envelope names
+        words = readline.get_line_buffer()[: readline.get_endidx()].split()
+        first_word = not words or (len(words) == 1 and bool(text))
+        candidates = commands if first_word else envelopes
+        matches = [c for c in candidates if c.startswith(text)]
+        return matches[state] if state < len(matches) else None
+
+    return complete
+
+
+def run_line(app: typer.Typer, line: str) -> int:
+    # Run one shell line through the Typer app in this process
+    try:
+        args = shlex.split(line)
+    except ValueError as e:
+        typer.echo(f"Error: {e}", err=True)
+        return 2
+    try:
+        # Standalone mode lets Typer report errors exactly as the CLI does;
+        # its closing sys.exit() is caught here instead of ending the shell
+        app(args=args, prog_name="budgetwise")
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else int(e.code is not None)
+    return 0
+
+
+def shell() -> None:
+    """Start an interactive shell that keeps one database connection pool.
+
+    Format: shell
+
+    Every command typed at the prompt runs in this process, so the imports
+    and the connection pool are paid for once per session.
+
+    Examples:
+      shell
+      budgetwise> add Groceries 20.00 --expense
+      budgetwise> report 2025-06
+      budgetwise> exit
+    """
+    from budgetwise_cli.cli.app import app
+
+    commands = sorted(
+        [c.name for c in app.registered_commands if c.name]
+        + [g.name for g in app.registered_groups if g.name]
+    )
+    envelopes = _load_envelope_names()
+
+    history = HISTORY_FILE.expanduser()
+    try:
+        import readline
+
+        readline.set_completer(_make_completer(commands + ["exit", "help"], envelopes))
+        readline.set_completer_delims(" \t")
+        readline.parse_and_bind("tab: complete")
+        if history.exists():
+            readline.read_history_file(history)
+    except ImportError:
+        readline = None  # type: ignore[assignment]
+
+    typer.echo("Welcome to BudgetWise Interactive Shell!")
+    typer.echo("Type 'exit' to quit, 'help' for available commands.")
+    try:
+        while True:
+            try:
+                line = input("\nbudgetwise> ").strip()
+            except KeyboardInterrupt:
+                typer.echo("\nUse 'exit' to quit")
+                continue
+            except EOFError:
+                break
+
+            if line.lower() in ("exit", "quit"):
+                break
+            if line.lower() == "help":
+                line = "--help"
+            if not line:
+                continue
+            if line.split()[0] == "shell":
+                typer.echo("Already in the BudgetWise shell")
+                continue
+
+            run_line(app, line)
+            # Read-your-writes pinning lasts one command, as it does in the CLI
+            forget_writes()
+            if line.split()[0] in _WRITE_COMMANDS:
+                envelopes[:] = _load_envelope_names()
+    finally:
+        if readline is not None:
+            try:
+                readline.write_history_file(history)
+            except OSError:
+                pass
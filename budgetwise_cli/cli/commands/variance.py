@@ -0,0 +1,62 @@
+import typer
+from datetime import date
+from budgetwise_cli.cli.commands.report import parse_bound
+from budgetwise_cli.infra.db import get_session
+
+
+def variance(
+    month: str = typer.Argument(
+        date.today().strftime("%Y-%m"), help="Month to compare (YYYY-MM)"
+    ),
+    start: str | None = typer.Option(None, "--from", help="First month or day"),
+    end: str | None = typer.Option(None, "--to", help="Last month or day"),
+    over: bool = typer.Option(False, "--over", help="Only over-budget envelopes"),
+    sort: str = typer.Option(
+        "name", "--sort", help="Order by name, spent, remaining or percent"
+    ),
+) -> None:
+    """Compare spending with each envelope's monthly budget.
+
+    Format: variance [YYYY-MM] [--from YYYY-MM --to YYYY-MM] [--over] [--sort KEY]
+
+    Budgets are per month, so a three-month range compares against three
+    times the budget. Envelopes without spending are listed too.
+
+    Examples:
+      variance                      # Current month
+      variance 2025-06 --over       # Over-budget envelopes in June 2025
+      variance --from 2025-01 --to 2025-03 --sort percent
+    """
+    from budgetwise_cli.services.budget_service import BudgetService
+    from budgetwise_cli.domain.money import format_amount
+    from rich.console import Console
+    from rich.table import Table
+
+    first = parse_bound(start or month)
+    last = parse_bound(end or start or month, last=True)
+    try:
+        with get_session() as db:
+            rows = BudgetService(db).variance(first, last, over_only=over, sort=sort)
+    except Exception as e:
+        typer.echo(f"Error: {str(e)}", err=True)
+        raise typer.Exit(1)
+
+    table = Table(title=f"Budget vs actual {first} to {last}")
+    table.add_column("Envelope", style="bold")
+    table.add_column("Budget", justify="right")
+    table.add_column("Spent", justify="right")
+    table.add_column("Remaining", justify="right")
+    table.add_column("Used", justify="right")
+    for name, budget, spent, remaining, percent in rows:
+        table.add_row(
+            name,
+            format_amount(budget),
+            format_amount(spent),
+            (
+                f"[red]{format_amount(remaining)}[/red]"
+                if remaining < 0
+                else format_amount(remaining)
+            ),
+            "-" if percent is None else f"{percent:.1f}%",
+        )
+    Console().print(table)
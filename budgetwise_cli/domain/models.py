@@ -5,15 +5,19 @@ from datetime import date, datetime
 from decimal import Decimal
 
 from sqlalchemy import (
+    DDL,
     Column,
     Date,
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
     UniqueConstraint,
+    event,
+    text,
 )
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
@@ -62,8 +66,50 @@ class Transaction(Base):
     amount: Mapped[Decimal] = mapped_column(Numeric(12, 2))
     note: Mapped[str | None] = mapped_column(String(128))
     ts: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+    # Set on rows materialized from a recurring schedule, ts is the occurrence
+    schedule_id: Mapped[int | None] = mapped_column(
+        ForeignKey("recurring_schedules.id")
+    )
+    # Bank id or content hash of an imported row, or the key given to add --id;
+    # inserting a row whose external_id exists is a no-op
+    external_id: Mapped[str | None] = mapped_column(String(255))
     envelope: Mapped["Envelope"] = relationship(back_populates="transactions")
 
+    # Both indexes carry amount so range sums never touch the table itself.
+    # Note search uses a GIN index on Postgres and transactions_fts on SQLite.
+    # One row per schedule occurrence and per external id; NULLs never conflict.
+    # AUTOINCREMENT keeps SQLite from reusing the ids of archived rows
+    __table_args__ = (
+        Index("ix_transactions_ts", "ts", "env_id", "amount"),
+        Index("ix_transactions_env_id_ts", "env_id", "ts", "amount"),
+        Index("ux_transactions_schedule_ts", "schedule_id", "ts", unique=True),
+        Index("ux_transactions_external_id", "external_id", unique=True),
+        Index(
+            "ix_transactions_note_tsv",
+            text("to_tsvector('simple', coalesce(note, ''))"),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+        {"sqlite_autoincrement": True},
+    )
+
+
+class RecurringSchedule(Base):
+    # Rent, salary and the like, turned into transactions by `materialize`
+    __tablename__ = "recurring_schedules"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    env_id: Mapped[int] = mapped_column(ForeignKey("envelopes.id"))
+    # One of services.recurring.RULES, anchored on start_date
+    rule: Mapped[str] = mapped_column(String(16))
+    amount: Mapped[Decimal] = mapped_column(Numeric(12, 2))
+    note: Mapped[str | None] = mapped_column(String(128))
+    start_date: Mapped[date] = mapped_column(Date)
+    # Last day an occurrence may fall on, None = open-ended
+    end_date: Mapped[date | None] = mapped_column(Date)
+    created_at: Mapped[date] = mapped_column(Date, default=date.today)
+
+    envelope: Mapped["Envelope"] = relationship()
+
 
 class ClosedMonth(Base):
     __tablename__ = "closed_months"
@@ -73,3 +119,99 @@ class ClosedMonth(Base):
     month = Column(Integer, nullable=False)
 
     __table_args__ = (UniqueConstraint("year", "month", name="uq_closed_month"),)
+
+
+class EnvelopeMonthBalance(Base):
+    # Running per-envelope monthly totals maintained by the write paths
+    __tablename__ = "envelope_month_balances"
+
+    env_id: Mapped[int] = mapped_column(ForeignKey("envelopes.id"), primary_key=True)
+    year: Mapped[int] = mapped_column(primary_key=True)
+    month: Mapped[int] = mapped_column(primary_key=True)
+    balance: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=Decimal("0"))
+    tx_count: Mapped[int] = mapped_column(default=0)
+
+    __table_args__ = (
+        Index("ix_envelope_month_balances_period", "year", "month", "env_id"),
+    )
+
+
+class EnvelopeBalanceCheckpoint(Base):
+    # Cumulative envelope balance at the end of a closed month
+    __tablename__ = "envelope_balance_checkpoints"
+
+    env_id: Mapped[int] = mapped_column(ForeignKey("envelopes.id"), primary_key=True)
+    year: Mapped[int] = mapped_column(primary_key=True)
+    month: Mapped[int] = mapped_column(primary_key=True)
+    balance: Mapped[Decimal] = mapped_column(Numeric(14, 2))
+
+    __table_args__ = (Index("ix_envelope_balance_checkpoints_period", "year", "month"),)
+
+
+class TransactionArchive(Base):
+    # Raw rows of archived months, moved out of transactions by `archive`
+    __tablename__ = "transactions_archive"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    env_id: Mapped[int] = mapped_column(ForeignKey("envelopes.id"))
+    type: Mapped[TransactionType] = mapped_column(Enum(TransactionType))
+    amount: Mapped[Decimal] = mapped_column(Numeric(12, 2))
+    note: Mapped[str | None] = mapped_column(String(128))
+    ts: Mapped[datetime] = mapped_column(DateTime)
+    schedule_id: Mapped[int | None] = mapped_column(
+        ForeignKey("recurring_schedules.id")
+    )
+    # Kept so an archived row still counts as imported when deduplicating
+    external_id: Mapped[str | None] = mapped_column(String(255))
+    envelope: Mapped["Envelope"] = relationship()
+
+    __table_args__ = (
+        Index("ix_transactions_archive_ts", "ts", "env_id", "amount"),
+        Index("ux_transactions_archive_external_id", "external_id", unique=True),
+    )
+
+
+class ArchivedMonth(Base):
+    # Closed month whose raw rows left the transactions table; its
+    # envelope_month_balances rows remain as the month's summary
+    __tablename__ = "archived_months"
+
+    year: Mapped[int] = mapped_column(primary_key=True)
+    month: Mapped[int] = mapped_column(primary_key=True)
+    # Compressed file holding the rows, None when they are in transactions_archive
+    path: Mapped[str | None] = mapped_column(String(255))
+    tx_count: Mapped[int] = mapped_column(default=0)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+
+
+# ---------------------------------------------------------------------------
+# SQLite full-text index over transaction notes, kept in sync by triggers
+# ---------------------------------------------------------------------------
+
+TRANSACTIONS_FTS_DDL = (
+    "CREATE VIRTUAL TABLE transactions_fts USING fts5("
+    "note, content='transactions', content_rowid='id')",
+    "CREATE TRIGGER transactions_fts_ai AFTER INSERT ON transactions BEGIN "
+    "INSERT INTO transactions_fts(rowid, note) VALUES (new.id, new.note); END",
+    "CREATE TRIGGER transactions_fts_ad AFTER DELETE ON transactions BEGIN "
+    "INSERT INTO transactions_fts(transactions_fts, rowid, note) "
+    "VALUES ('delete', old.id, old.note); END",
+    "CREATE TRIGGER transactions_fts_au AFTER UPDATE OF note ON transactions BEGIN "
+    "INSERT INTO transactions_fts(transactions_fts, rowid, note) "
+    "VALUES ('delete', old.id, old.note); "
+    "INSERT INTO transactions_fts(rowid, note) VALUES (new.id, new.note); END",
+)
+
+for _statement in TRANSACTIONS_FTS_DDL:
+    event.listen(
+        Transaction.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="sqlite"),  # type: ignore[no-untyped-call]
+    )
+event.listen(
+    Transaction.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS transactions_fts").execute_if(  # type: ignore[no-untyped-call]
+        dialect="sqlite"
+    ),
+)
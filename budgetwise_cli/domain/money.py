@@ -0,0 +1,38 @@
+from decimal import Decimal, InvalidOperation
+
+# Money is Numeric(12, 2) in the database and Decimal in the service API.
+# Loops that touch many amounts work in integer cents instead, converting
+# exactly at the edges: nothing here ever goes through binary floating point.
+
+
+def to_cents(amount: Decimal | int | str) -> int:
+    # Exact cents of an amount; sub-cent amounts are rejected, not rounded
+    if isinstance(amount, str):
+        try:
+            amount = Decimal(amount)
+        except InvalidOperation:
+            raise ValueError(f"Invalid amount: {amount!r}") from None
+    if isinstance(amount, int):
+        return amount * 100
+    if not amount.is_finite():
+        raise ValueError(f"Invalid amount: {amount}")
+    numerator, denominator = amount.as_integer_ratio()
+    cents, remainder = divmod(numerator * 100, denominator)
+    if remainder:
+        raise ValueError(f"Amount has more than two decimal places: {amount}")
+    return cents
+
+
+def from_cents(cents: int) -> Decimal:
+    # Two-place Decimal for an integer number of cents
+    return Decimal(cents).scaleb(-2)
+
+
+def format_cents(cents: int) -> str:
+    # An exponent of -2 always prints in fixed point
+    return str(from_cents(cents))
+
+
+def format_amount(amount: Decimal) -> str:
+    # Two places, rounded half-even in decimal rather than through a float
+    return f"{amount:.2f}"
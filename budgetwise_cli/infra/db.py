@@ -1,25 +1,274 @@
 from contextlib import contextmanager
-from typing import Iterator
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator, Mapping, NamedTuple, get_args
 import os
 
+if TYPE_CHECKING:
+    from sqlalchemy import Engine
+    from sqlalchemy.orm import sessionmaker, Session
+
 DATABASE_URL = os.environ.get(
     "DATABASE_URL", "postgresql+psycopg://postgres:pass@db:5432/budgetwise"
 )
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+# TOML file with a [database] table; environment variables take precedence
+CONFIG_FILE = Path(os.environ.get("BUDGETWISE_CONFIG", "~/.budgetwise.toml"))
+
+ENV_PREFIX = "BUDGETWISE_"
+
+_BOOLEANS = {"1": True, "true": True, "yes": True, "on": True}
+_BOOLEANS.update({"0": False, "false": False, "no": False, "off": False})
+
+
+class EngineSettings(NamedTuple):
+    # Every field can be set as BUDGETWISE_<FIELD> in the environment or as
+    # <field> under [database] in the config file
+    url: str = DATABASE_URL
+    # Replica for get_session(readonly=True); None reads from the primary
+    read_url: str | None = None
+    # Once a command has committed on the primary, its read-only sessions
+    # stay there too, so it sees its own writes whatever the replica lag
+    read_your_writes: bool = True
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    # Recycling bounds connection age without pre-ping's extra round trip
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = False
+    # psycopg 3: server-side prepare after this many executions, None = never
+    prepare_threshold: int | None = 5
+    # Transaction-pooling PgBouncer: no client pool, no prepared statements
+    pgbouncer: bool = False
+    # SQLite PRAGMAs run on every new connection, None leaves the default
+    sqlite_journal_mode: str | None = "wal"
+    sqlite_synchronous: str | None = "normal"
+    sqlite_cache_size: int | None = -65536
+    sqlite_mmap_size: int | None = 268435456
+    sqlite_busy_timeout: int | None = 5000
+
+
+def load_settings(
+    environ: Mapping[str, str] = os.environ, config_file: Path | None = None
+) -> EngineSettings:
+    values: dict[str, Any] = {}
+    path = (config_file or CONFIG_FILE).expanduser()
+    if path.exists():
+        import tomllib
+
+        with path.open("rb") as fh:
+            values.update(tomllib.load(fh).get("database", {}))
+    if "DATABASE_URL" in environ:
+        values["url"] = environ["DATABASE_URL"]
+    if "READ_DATABASE_URL" in environ:
+        values["read_url"] = environ["READ_DATABASE_URL"]
+    for field in EngineSettings._fields:
+        name = ENV_PREFIX + field.upper()
+        if name in environ:
+            values[field] = environ[name]
+
+    unknown = values.keys() - set(EngineSettings._fields)
+    if unknown:
+        raise ValueError(f"Unknown database settings: {', '.join(sorted(unknown))}")
+    return EngineSettings(
+        **{field: _coerce(field, value) for field, value in values.items()}
+    )
+
+
+def create_engine_from_settings(
+    settings: EngineSettings, readonly: bool = False
+) -> "Engine":
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.engine import make_url
+    from sqlalchemy.pool import NullPool
+
+    url = make_url(settings.url)
+    kwargs: dict[str, Any] = {"pool_pre_ping": settings.pool_pre_ping}
+    connect_args: dict[str, Any] = {}
+
+    if url.get_backend_name() == "sqlite":
+        # SQLite connections are cheap and in-memory databases use a
+        # single-connection pool, so the pool sizing settings do not apply
+        engine = create_engine(url, **kwargs)
+        event.listen(engine, "connect", _sqlite_pragmas(settings, readonly))
+        return engine
+
+    if settings.pgbouncer:
+        kwargs["poolclass"] = NullPool
+    else:
+        kwargs.update(
+            pool_size=settings.pool_size,
+            max_overflow=settings.max_overflow,
+            pool_timeout=settings.pool_timeout,
+            pool_recycle=settings.pool_recycle,
+        )
+    if url.get_driver_name() == "psycopg":
+        connect_args["prepare_threshold"] = (
+            None if settings.pgbouncer else settings.prepare_threshold
+        )
+    return create_engine(url, connect_args=connect_args, **kwargs)
+
+
+# Built on first use so that importing the CLI does not load SQLAlchemy or
+# the database driver; see get_engine()
+_settings: EngineSettings | None = None
+_engine: "Engine | None" = None
+_session_factory: "sessionmaker[Session] | None" = None
+_read_engine: "Engine | None" = None
+_read_session_factory: "sessionmaker[Session] | None" = None
+
+# Set once a session in this process commits writes on the primary
+_WROTE_KEY = "budgetwise.wrote"
+_wrote = False
+
+
+def get_settings() -> EngineSettings:
+    global _settings
+    if _settings is None:
+        _settings = load_settings()
+    return _settings
+
+
+def get_engine() -> "Engine":
+    global _engine
+    if _engine is None:
+        _engine = create_engine_from_settings(get_settings())
+    return _engine
+
+
+def get_sessionmaker() -> "sessionmaker[Session]":
+    global _session_factory
+    if _session_factory is None:
+        from sqlalchemy import event
+        from sqlalchemy.orm import sessionmaker
+
+        _session_factory = sessionmaker(
+            bind=get_engine(), autoflush=False, autocommit=False
+        )
+        event.listen(_session_factory, "after_flush", _mark_flush)
+        event.listen(_session_factory, "do_orm_execute", _mark_execute)
+    return _session_factory
+
+
+def get_read_engine() -> "Engine":
+    # The replica at read_url, or the primary when none is configured
+    global _read_engine
+    settings = get_settings()
+    if settings.read_url is None:
+        return get_engine()
+    if _read_engine is None:
+        _read_engine = create_engine_from_settings(
+            settings._replace(url=settings.read_url), readonly=True
+        )
+    return _read_engine
+
+
+def get_read_sessionmaker() -> "sessionmaker[Session]":
+    global _read_session_factory
+    if get_settings().read_url is None:
+        return get_sessionmaker()
+    if _read_session_factory is None:
+        from sqlalchemy.orm import sessionmaker
+
+        _read_session_factory = sessionmaker(
+            bind=get_read_engine(), autoflush=False, autocommit=False
+        )
+    return _read_session_factory
+
+
+def forget_writes() -> None:
+    # Let read-only sessions use the replica again, e.g. between shell commands
+    global _wrote
+    _wrote = False
+
+
+def __getattr__(name: str) -> Any:
+    # Keep `db.engine` and `db.SessionLocal` working without eager creation
+    if name == "engine":
+        return get_engine()
+    if name == "SessionLocal":
+        return get_sessionmaker()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 @contextmanager
-def get_session() -> Iterator[Session]:
-    db = SessionLocal()
+def get_session(readonly: bool = False) -> Iterator["Session"]:
+    # readonly=True reads from the replica, if any, in a read-only
+    # transaction. Writes always go to the primary.
+    global _wrote
+    if readonly and not (_wrote and get_settings().read_your_writes):
+        db = get_read_sessionmaker()()
+    else:
+        db = get_sessionmaker()()
     try:
+        if readonly and db.get_bind().dialect.name == "postgresql":
+            db.connection(execution_options={"postgresql_readonly": True})
         yield db
         db.commit()
+        if db.info.pop(_WROTE_KEY, False):
+            _wrote = True
     except Exception:
         db.rollback()
         raise
     finally:
         db.close()
+
+
+def _coerce(field: str, value: Any) -> Any:
+    # Environment values arrive as strings; "" or "none" clears optional ones
+    if not isinstance(value, str):
+        return value
+    kind = EngineSettings.__annotations__[field]
+    options = get_args(kind) or (kind,)
+    if type(None) in options and value.lower() in ("", "none"):
+        return None
+    try:
+        if bool in options:
+            flag = value.lower()
+            if flag not in _BOOLEANS:
+                raise ValueError(value)
+            return _BOOLEANS[flag]
+        if float in options:
+            return float(value)
+        if int in options:
+            return int(value)
+    except ValueError:
+        raise ValueError(f"Invalid value for {field}: {value!r}") from None
+    return value
+
+
+def _mark_flush(db: "Session", flush_context: Any) -> None:
+    db.info[_WROTE_KEY] = True
+
+
+def _mark_execute(state: Any) -> None:
+    # Bulk INSERT/UPDATE/DELETE statements bypass the flush
+    if state.is_insert or state.is_update or state.is_delete:
+        state.session.info[_WROTE_KEY] = True
+
+
+def _sqlite_pragmas(settings: EngineSettings, readonly: bool = False) -> Any:
+    pragmas = [
+        (name, value)
+        for name, value in (
+            ("journal_mode", settings.sqlite_journal_mode),
+            ("synchronous", settings.sqlite_synchronous),
+            ("cache_size", settings.sqlite_cache_size),
+            ("mmap_size", settings.sqlite_mmap_size),
+            ("busy_timeout", settings.sqlite_busy_timeout),
+            ("query_only", "on" if readonly else None),
+        )
+        if value is not None
+    ]
+    for name, value in pragmas:
+        if not str(value).lstrip("-").isalnum():
+            raise ValueError(f"Invalid value for sqlite_{name}: {value!r}")
+
+    def on_connect(dbapi_connection: Any, connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    return on_connect
@@ -0,0 +1,68 @@
+"""Archive external id
+
+Revision ID: 0c6e2b9d4a17
+Revises: f5a8c2d4e6b1
+Create Date: 2026-10-19 14:05:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0c6e2b9d4a17"
+down_revision: Union[str, None] = "f5a8c2d4e6b1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == "sqlite":
+        # In place, as transactions.schedule_id was added in b8d4f2a6c9e1
+        op.execute(
+            "ALTER TABLE transactions_archive ADD COLUMN schedule_id INTEGER "
+            "REFERENCES recurring_schedules (id)"
+        )
+    else:
+        op.add_column(
+            "transactions_archive",
+            sa.Column("schedule_id", sa.Integer(), nullable=True),
+        )
+        op.create_foreign_key(
+            "transactions_archive_schedule_id_fkey",
+            "transactions_archive",
+            "recurring_schedules",
+            ["schedule_id"],
+            ["id"],
+        )
+    op.add_column(
+        "transactions_archive",
+        sa.Column("external_id", sa.String(length=255), nullable=True),
+    )
+    op.create_index(
+        "ux_transactions_archive_external_id",
+        "transactions_archive",
+        ["external_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ux_transactions_archive_external_id", table_name="transactions_archive"
+    )
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute("ALTER TABLE transactions_archive DROP COLUMN external_id")
+        op.execute("ALTER TABLE transactions_archive DROP COLUMN schedule_id")
+    else:
+        op.drop_column("transactions_archive", "external_id")
+        op.drop_constraint(
+            "transactions_archive_schedule_id_fkey",
+            "transactions_archive",
+            type_="foreignkey",
+        )
+        op.drop_column("transactions_archive", "schedule_id")
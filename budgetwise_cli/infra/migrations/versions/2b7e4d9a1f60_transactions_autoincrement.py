@@ -0,0 +1,55 @@
+"""Transactions autoincrement
+
+Revision ID: 2b7e4d9a1f60
+Revises: 0c6e2b9d4a17
+Create Date: 2026-10-20 09:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+from budgetwise_cli.domain.models import TRANSACTIONS_FTS_DDL
+
+# revision identifiers, used by Alembic.
+revision: str = "2b7e4d9a1f60"
+down_revision: Union[str, None] = "0c6e2b9d4a17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _rebuild(autoincrement: bool) -> None:
+    # Rebuilding transactions drops its triggers; transactions_fts keys on
+    # the preserved ids, so only the triggers need recreating
+    with op.batch_alter_table(
+        "transactions",
+        recreate="always",
+        table_kwargs={"sqlite_autoincrement": autoincrement},
+    ):
+        pass
+    for statement in TRANSACTIONS_FTS_DDL[1:]:
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Postgres sequences never hand an id out twice; SQLite without
+    # AUTOINCREMENT reuses the ids archive_months moved out of the table
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    _rebuild(True)
+    # Start past every id ever used, archived ones included
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'transactions'")
+    op.execute(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT 'transactions', max(id) "
+        "FROM (SELECT id FROM transactions UNION ALL "
+        "SELECT id FROM transactions_archive) HAVING max(id) IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    _rebuild(False)
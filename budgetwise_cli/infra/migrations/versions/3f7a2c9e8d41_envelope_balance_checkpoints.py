@@ -0,0 +1,51 @@
+"""Envelope balance checkpoints
+
+Revision ID: 3f7a2c9e8d41
+Revises: 9b0e6d2f41a7
+Create Date: 2026-10-18 16:20:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "3f7a2c9e8d41"
+down_revision: Union[str, None] = "9b0e6d2f41a7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing closed months get checkpoints from `budgetwise rebuild-balances`;
+    # balance lookups stay correct without them, only slower
+    op.create_table(
+        "envelope_balance_checkpoints",
+        sa.Column("env_id", sa.Integer(), nullable=False),
+        sa.Column("year", sa.Integer(), nullable=False),
+        sa.Column("month", sa.Integer(), nullable=False),
+        sa.Column("balance", sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["env_id"],
+            ["envelopes.id"],
+        ),
+        sa.PrimaryKeyConstraint("env_id", "year", "month"),
+    )
+    op.create_index(
+        "ix_envelope_balance_checkpoints_period",
+        "envelope_balance_checkpoints",
+        ["year", "month"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_envelope_balance_checkpoints_period",
+        table_name="envelope_balance_checkpoints",
+    )
+    op.drop_table("envelope_balance_checkpoints")
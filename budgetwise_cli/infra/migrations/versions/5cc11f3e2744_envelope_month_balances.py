@@ -0,0 +1,62 @@
+"""Envelope month balances
+
+Revision ID: 5cc11f3e2744
+Revises: a1d5c3e9f7b2
+Create Date: 2026-10-18 15:20:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "5cc11f3e2744"
+down_revision: Union[str, None] = "a1d5c3e9f7b2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    balances = op.create_table(
+        "envelope_month_balances",
+        sa.Column("env_id", sa.Integer(), nullable=False),
+        sa.Column("year", sa.Integer(), nullable=False),
+        sa.Column("month", sa.Integer(), nullable=False),
+        sa.Column("balance", sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column("tx_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["env_id"],
+            ["envelopes.id"],
+        ),
+        sa.PrimaryKeyConstraint("env_id", "year", "month"),
+    )
+
+    # Backfill from the existing ledger
+    transactions = sa.table(
+        "transactions",
+        sa.column("env_id", sa.Integer()),
+        sa.column("amount", sa.Numeric(12, 2)),
+        sa.column("ts", sa.DateTime()),
+    )
+    year = sa.extract("year", transactions.c.ts)
+    month = sa.extract("month", transactions.c.ts)
+    op.execute(
+        balances.insert().from_select(
+            ["env_id", "year", "month", "balance", "tx_count"],
+            sa.select(
+                transactions.c.env_id,
+                year,
+                month,
+                sa.func.sum(transactions.c.amount),
+                sa.func.count(),
+            ).group_by(transactions.c.env_id, year, month),
+        )
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("envelope_month_balances")
@@ -0,0 +1,85 @@
+"""Transfers as moves
+
+Revision ID: 6a1f3c8e2d95
+Revises: 2b7e4d9a1f60
+Create Date: 2026-10-20 11:45:00.000000
+
+Both legs of a `move` used to be booked as EXPENSE and INCOME by sign, so
+variance and top_spending counted transfers as spending. Only provable
+pairs are retyped: adjacent ids with the same timestamp, opposite amounts
+and the "transfer to <dst>" / "transfer from <src>" notes naming each
+other's envelope. Legs whose envelope was renamed since, or whose pair
+was edited or deleted, keep their old type.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "6a1f3c8e2d95"
+down_revision: Union[str, None] = "2b7e4d9a1f60"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("transactions", "transactions_archive")
+
+envelopes = sa.table(
+    "envelopes", sa.column("id", sa.Integer()), sa.column("name", sa.String())
+)
+
+
+def _ledger(name: str) -> sa.TableClause:
+    return sa.table(
+        name,
+        sa.column("id", sa.Integer()),
+        sa.column("env_id", sa.Integer()),
+        sa.column("type", sa.String()),
+        sa.column("amount", sa.Numeric(12, 2)),
+        sa.column("note", sa.String()),
+        sa.column("ts", sa.DateTime()),
+    )
+
+
+def _transfer_ids(name: str) -> sa.CompoundSelect[tuple[int]]:
+    # Ids of both legs of every provable transfer in the table
+    sent, received = _ledger(name).alias("sent"), _ledger(name).alias("received")
+    src, dst = envelopes.alias("src"), envelopes.alias("dst")
+    pairs = (
+        sa.select(sent.c.id.label("sent_id"), received.c.id.label("received_id"))
+        .join(received, received.c.id == sent.c.id + 1)
+        .join(src, src.c.id == sent.c.env_id)
+        .join(dst, dst.c.id == received.c.env_id)
+        .where(
+            sent.c.amount < 0,
+            received.c.amount == -sent.c.amount,
+            received.c.ts == sent.c.ts,
+            sent.c.note == sa.literal("transfer to ") + dst.c.name,
+            received.c.note == sa.literal("transfer from ") + src.c.name,
+        )
+        .subquery()
+    )
+    return sa.union(sa.select(pairs.c.sent_id), sa.select(pairs.c.received_id))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name in TABLES:
+        t = _ledger(name)
+        op.execute(
+            t.update()
+            .where(t.c.id.in_(_transfer_ids(name)), t.c.type != "MOVE")
+            .values(type="MOVE")
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in TABLES:
+        t = _ledger(name)
+        op.execute(
+            t.update()
+            .where(t.c.id.in_(_transfer_ids(name)), t.c.type == "MOVE")
+            .values(type=sa.case((t.c.amount > 0, "INCOME"), else_="EXPENSE"))
+        )
@@ -0,0 +1,49 @@
+"""Transaction note search
+
+Revision ID: 7d2b5e8f1c30
+Revises: c4e1a9b7d5f3
+Create Date: 2026-10-18 17:40:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from budgetwise_cli.domain.models import TRANSACTIONS_FTS_DDL
+
+# revision identifiers, used by Alembic.
+revision: str = "7d2b5e8f1c30"
+down_revision: Union[str, None] = "c4e1a9b7d5f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == "sqlite":
+        for statement in TRANSACTIONS_FTS_DDL:
+            op.execute(statement)
+        # Index the notes already in the ledger
+        op.execute("INSERT INTO transactions_fts(transactions_fts) VALUES ('rebuild')")
+        return
+
+    op.create_index(
+        "ix_transactions_note_tsv",
+        "transactions",
+        [sa.text("to_tsvector('simple', coalesce(note, ''))")],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "sqlite":
+        for trigger in ("ai", "ad", "au"):
+            op.execute(f"DROP TRIGGER IF EXISTS transactions_fts_{trigger}")
+        op.execute("DROP TABLE IF EXISTS transactions_fts")
+        return
+
+    op.drop_index("ix_transactions_note_tsv", table_name="transactions")
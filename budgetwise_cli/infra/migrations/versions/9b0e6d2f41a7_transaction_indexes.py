@@ -0,0 +1,45 @@
+"""Transaction indexes
+
+Revision ID: 9b0e6d2f41a7
+Revises: 5cc11f3e2744
+Create Date: 2026-10-18 15:40:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9b0e6d2f41a7"
+down_revision: Union[str, None] = "5cc11f3e2744"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_transactions_ts", "transactions", ["ts", "env_id", "amount"], unique=False
+    )
+    op.create_index(
+        "ix_transactions_env_id_ts",
+        "transactions",
+        ["env_id", "ts", "amount"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_envelope_month_balances_period",
+        "envelope_month_balances",
+        ["year", "month", "env_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_envelope_month_balances_period", table_name="envelope_month_balances"
+    )
+    op.drop_index("ix_transactions_env_id_ts", table_name="transactions")
+    op.drop_index("ix_transactions_ts", table_name="transactions")
@@ -0,0 +1,70 @@
+"""Baseline tables
+
+Revision ID: a1d5c3e9f7b2
+Revises: d0ee4872c312
+Create Date: 2026-10-19 09:10:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "a1d5c3e9f7b2"
+down_revision: Union[str, None] = "d0ee4872c312"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # d0ee4872c312 was generated against a database that already had these
+    # tables, so it creates nothing; create them here for a fresh database
+    # and leave existing ones alone
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    if "closed_months" not in existing:
+        op.create_table(
+            "closed_months",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("year", sa.Integer(), nullable=False),
+            sa.Column("month", sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("year", "month", name="uq_closed_month"),
+        )
+    if "envelopes" not in existing:
+        op.create_table(
+            "envelopes",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("name", sa.String(length=64), nullable=False),
+            sa.Column("budget", sa.Numeric(precision=12, scale=2), nullable=False),
+            sa.Column("created_at", sa.Date(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index(op.f("ix_envelopes_name"), "envelopes", ["name"], unique=True)
+    if "transactions" not in existing:
+        op.create_table(
+            "transactions",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("env_id", sa.Integer(), nullable=False),
+            sa.Column(
+                "type",
+                sa.Enum("INCOME", "EXPENSE", "MOVE", name="transactiontype"),
+                nullable=False,
+            ),
+            sa.Column("amount", sa.Numeric(precision=12, scale=2), nullable=False),
+            sa.Column("note", sa.String(length=128), nullable=True),
+            sa.Column("ts", sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(
+                ["env_id"],
+                ["envelopes.id"],
+            ),
+            sa.PrimaryKeyConstraint("id"),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The tables may predate this revision, so they are kept
+    pass
@@ -0,0 +1,76 @@
+"""Recurring schedules
+
+Revision ID: b8d4f2a6c9e1
+Revises: 7d2b5e8f1c30
+Create Date: 2026-10-18 18:20:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "b8d4f2a6c9e1"
+down_revision: Union[str, None] = "7d2b5e8f1c30"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "recurring_schedules",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("env_id", sa.Integer(), nullable=False),
+        sa.Column("rule", sa.String(length=16), nullable=False),
+        sa.Column("amount", sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column("note", sa.String(length=128), nullable=True),
+        sa.Column("start_date", sa.Date(), nullable=False),
+        sa.Column("end_date", sa.Date(), nullable=True),
+        sa.Column("created_at", sa.Date(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["env_id"],
+            ["envelopes.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    if op.get_bind().dialect.name == "sqlite":
+        # Added in place rather than in batch mode: rebuilding transactions
+        # would drop the transactions_fts triggers
+        op.execute(
+            "ALTER TABLE transactions ADD COLUMN schedule_id INTEGER "
+            "REFERENCES recurring_schedules (id)"
+        )
+    else:
+        op.add_column(
+            "transactions", sa.Column("schedule_id", sa.Integer(), nullable=True)
+        )
+        op.create_foreign_key(
+            "transactions_schedule_id_fkey",
+            "transactions",
+            "recurring_schedules",
+            ["schedule_id"],
+            ["id"],
+        )
+    op.create_index(
+        "ux_transactions_schedule_ts",
+        "transactions",
+        ["schedule_id", "ts"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ux_transactions_schedule_ts", table_name="transactions")
+    if op.get_bind().dialect.name == "sqlite":
+        # SQLite 3.35+ drops a column in place when nothing indexes it
+        op.execute("ALTER TABLE transactions DROP COLUMN schedule_id")
+    else:
+        op.drop_constraint(
+            "transactions_schedule_id_fkey", "transactions", type_="foreignkey"
+        )
+        op.drop_column("transactions", "schedule_id")
+    op.drop_table("recurring_schedules")
@@ -0,0 +1,69 @@
+"""Transactions archive
+
+Revision ID: c4e1a9b7d5f3
+Revises: 3f7a2c9e8d41
+Create Date: 2026-10-18 17:05:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "c4e1a9b7d5f3"
+down_revision: Union[str, None] = "3f7a2c9e8d41"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Reuse the enum type created for transactions.type
+transaction_type = sa.Enum(
+    "INCOME", "EXPENSE", "MOVE", name="transactiontype"
+).with_variant(
+    postgresql.ENUM(
+        "INCOME", "EXPENSE", "MOVE", name="transactiontype", create_type=False
+    ),
+    "postgresql",
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "transactions_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("env_id", sa.Integer(), nullable=False),
+        sa.Column("type", transaction_type, nullable=False),
+        sa.Column("amount", sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column("note", sa.String(length=128), nullable=True),
+        sa.Column("ts", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["env_id"],
+            ["envelopes.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_transactions_archive_ts",
+        "transactions_archive",
+        ["ts", "env_id", "amount"],
+        unique=False,
+    )
+    op.create_table(
+        "archived_months",
+        sa.Column("year", sa.Integer(), nullable=False),
+        sa.Column("month", sa.Integer(), nullable=False),
+        sa.Column("path", sa.String(length=255), nullable=True),
+        sa.Column("tx_count", sa.Integer(), nullable=False),
+        sa.Column("archived_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("year", "month"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("archived_months")
+    op.drop_index("ix_transactions_archive_ts", table_name="transactions_archive")
+    op.drop_table("transactions_archive")
@@ -0,0 +1,41 @@
+"""Transaction external id
+
+Revision ID: e3f9a1c7b5d2
+Revises: b8d4f2a6c9e1
+Create Date: 2026-10-18 21:40:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "e3f9a1c7b5d2"
+down_revision: Union[str, None] = "b8d4f2a6c9e1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "transactions", sa.Column("external_id", sa.String(length=255), nullable=True)
+    )
+    op.create_index(
+        "ux_transactions_external_id",
+        "transactions",
+        ["external_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ux_transactions_external_id", table_name="transactions")
+    if op.get_bind().dialect.name == "sqlite":
+        # In place, as in b8d4f2a6c9e1, to keep the transactions_fts triggers
+        op.execute("ALTER TABLE transactions DROP COLUMN external_id")
+    else:
+        op.drop_column("transactions", "external_id")
@@ -0,0 +1,117 @@
+"""Close legs as moves
+
+Revision ID: f5a8c2d4e6b1
+Revises: e3f9a1c7b5d2
+Create Date: 2026-10-19 11:20:00.000000
+
+Close legs were booked as INCOME or EXPENSE by sign and told apart by note;
+they are now MOVE transactions. A note alone proves nothing, since users
+can give any row the same note, so only provable pairs are retyped: an
+opening leg at midnight on the first of a month that follows a closed
+month, and a rollover leg of the same envelope and opposite amount
+inserted before it, with nothing but close legs between the two ids.
+Rows that cannot be paired keep their type, including legs whose pair
+was edited, deleted or archived to files, and legs whose id is held by
+both the live and the archive table.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "f5a8c2d4e6b1"
+down_revision: Union[str, None] = "e3f9a1c7b5d2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Notes close_month has always given its rollover and opening legs
+ROLLOVER_NOTE, OPENING_NOTE = "rollover to next month", "opening balance"
+
+TABLES = ("transactions", "transactions_archive")
+
+closed_months = sa.table(
+    "closed_months", sa.column("year", sa.Integer()), sa.column("month", sa.Integer())
+)
+
+
+def _ledger(name: str) -> sa.TableClause:
+    return sa.table(
+        name,
+        sa.column("id", sa.Integer()),
+        sa.column("env_id", sa.Integer()),
+        sa.column("type", sa.String()),
+        sa.column("amount", sa.Numeric(12, 2)),
+        sa.column("note", sa.String()),
+        sa.column("ts", sa.DateTime()),
+    )
+
+
+def _is_opening(ts: datetime, closed: set[tuple[int, int]]) -> bool:
+    # Midnight on the first of the month after a closed month
+    previous = ts.date() - timedelta(days=1)
+    return ts == datetime(ts.year, ts.month, 1) and (
+        (previous.year, previous.month) in closed
+    )
+
+
+def _close_leg_ids() -> dict[str, list[int]]:
+    # Ids of both legs of every provable close, per table
+    bind = op.get_bind()
+    closed = {(y, m) for y, m in bind.execute(sa.select(closed_months))}
+    legs: dict[int, tuple[str, Any]] = {}
+    shared: set[int] = set()
+    for name in TABLES:
+        t = _ledger(name)
+        for row in bind.execute(
+            sa.select(t).where(t.c.note.in_((ROLLOVER_NOTE, OPENING_NOTE)))
+        ):
+            if row.id in legs:
+                shared.add(row.id)
+            legs[row.id] = (name, row)
+
+    ids: dict[str, list[int]] = {name: [] for name in TABLES}
+    # Unpaired rollovers per (envelope, amount), oldest first
+    rollovers: dict[tuple[int, Any], list[int]] = {}
+    for name, row in sorted(legs.values(), key=lambda leg: leg[1].id):
+        if row.id in shared:
+            continue
+        if row.note == ROLLOVER_NOTE:
+            rollovers.setdefault((row.env_id, row.amount), []).append(row.id)
+            continue
+        # The nearest earlier rollover of the same envelope and amount
+        candidates = rollovers.get((row.env_id, -row.amount))
+        if not candidates or not _is_opening(row.ts, closed):
+            continue
+        rollover = candidates[-1]
+        if all(i in legs and i not in shared for i in range(rollover + 1, row.id)):
+            candidates.pop()
+            ids[legs[rollover][0]].append(rollover)
+            ids[name].append(row.id)
+    return ids
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, ids in _close_leg_ids().items():
+        t = _ledger(name)
+        if ids:
+            op.execute(
+                t.update()
+                .where(t.c.id.in_(ids), t.c.type != "MOVE")
+                .values(type="MOVE")
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, ids in _close_leg_ids().items():
+        t = _ledger(name)
+        if ids:
+            op.execute(
+                t.update()
+                .where(t.c.id.in_(ids), t.c.type == "MOVE")
+                .values(type=sa.case((t.c.amount > 0, "INCOME"), else_="EXPENSE"))
+            )
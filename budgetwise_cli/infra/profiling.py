@@ -0,0 +1,192 @@
+import functools
+import inspect
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from sqlalchemy import Engine, event
+
+# Individual statements kept for the "slowest" part of the summary
+SLOWEST = 5
+
+# Longest parameter repr shown for one statement
+PARAMS_MAX_LENGTH = 200
+
+
+class Profiler:
+    # Collects per-statement timings from every Engine through the cursor
+    # execute hooks, plus wall-clock time for startup, the service layer and
+    # everything else the command does (argument parsing, rendering, commit)
+
+    # Only the first profiled command in a process (e.g. in the shell) pays
+    # for interpreter startup and imports
+    _startup_counted = False
+
+    def __init__(self, started: float) -> None:
+        self.command_started = time.perf_counter()
+        self.started = self.command_started if Profiler._startup_counted else started
+        Profiler._startup_counted = True
+        self.statements: dict[str, dict[str, Any]] = {}
+        self.slowest: list[dict[str, Any]] = []
+        self.count = 0
+        self.db_seconds = 0.0
+        self.service_seconds = 0.0
+        self._service_depth = 0
+        self._patched: list[tuple[type, str, Any]] = []
+
+    def enable(self, *service_classes: type) -> None:
+        event.listen(Engine, "before_cursor_execute", self._before_execute)
+        event.listen(Engine, "after_cursor_execute", self._after_execute)
+        for cls in service_classes:
+            self._instrument(cls)
+
+    def disable(self) -> None:
+        event.remove(Engine, "before_cursor_execute", self._before_execute)
+        event.remove(Engine, "after_cursor_execute", self._after_execute)
+        for cls, name, original in reversed(self._patched):
+            setattr(cls, name, original)
+        self._patched.clear()
+
+    def summary(self) -> dict[str, Any]:
+        finished = time.perf_counter()
+        command = finished - self.command_started
+        return {
+            "statements": self.count,
+            "db_seconds": round(self.db_seconds, 6),
+            "phases": {
+                "startup": round(self.command_started - self.started, 6),
+                "service": round(self.service_seconds, 6),
+                "cli": round(command - self.service_seconds, 6),
+                "total": round(finished - self.started, 6),
+            },
+            "by_statement": sorted(
+                ({"statement": sql, **stats} for sql, stats in self.statements.items()),
+                key=lambda s: -s["seconds"],
+            ),
+            "slowest": self.slowest,
+        }
+
+    def write_json(self, path: Path) -> None:
+        path.write_text(json.dumps(self.summary(), indent=2, default=str))
+
+    def format_text(self) -> str:
+        data = self.summary()
+        phases = data["phases"]
+        lines = [
+            f"{data['statements']} statements, "
+            f"{data['db_seconds'] * 1000:.1f} ms in the database",
+            "startup {:.1f} ms, service {:.1f} ms, cli {:.1f} ms, total {:.1f} ms".format(
+                *(phases[k] * 1000 for k in ("startup", "service", "cli", "total"))
+            ),
+        ]
+        if data["slowest"]:
+            lines.append("slowest statements:")
+        for s in data["slowest"]:
+            rows = "?" if s["rows"] is None else s["rows"]
+            lines.append(
+                f"  {s['seconds'] * 1000:8.2f} ms  rows={rows}  {s['statement']}"
+            )
+            lines.append(f"{'':14}params={s['params']}")
+        return "\n".join(lines)
+
+    def _before_execute(
+        self,
+        conn: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        conn.info.setdefault("budgetwise.query_started", []).append(time.perf_counter())
+
+    def _after_execute(
+        self,
+        conn: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        elapsed = time.perf_counter() - conn.info["budgetwise.query_started"].pop()
+        # Drivers report -1 when they do not know, e.g. SQLite for SELECT
+        rows = cursor.rowcount if cursor.rowcount >= 0 else None
+        sql = " ".join(statement.split())
+
+        self.count += 1
+        self.db_seconds += elapsed
+        stats = self.statements.setdefault(
+            sql, {"count": 0, "seconds": 0.0, "rows": None}
+        )
+        stats["count"] += 1
+        stats["seconds"] = round(stats["seconds"] + elapsed, 6)
+        if rows is not None:
+            stats["rows"] = (stats["rows"] or 0) + rows
+
+        if len(self.slowest) < SLOWEST or elapsed > self.slowest[-1]["seconds"]:
+            self.slowest.append(
+                {
+                    "statement": sql,
+                    "seconds": round(elapsed, 6),
+                    "rows": rows,
+                    "params": _format_params(parameters, executemany),
+                }
+            )
+            self.slowest.sort(key=lambda s: -s["seconds"])
+            del self.slowest[SLOWEST:]
+
+    def _instrument(self, cls: type) -> None:
+        # Time public methods, counting only the outermost call so that
+        # add_transaction -> add_transactions is not counted twice
+        for name, original in vars(cls).items():
+            if name.startswith("_") or not inspect.isfunction(original):
+                continue
+            setattr(cls, name, self._timed(original))
+            self._patched.append((cls, name, original))
+
+    def _timed(self, fn: Callable[..., Any]) -> Callable[..., Any]:
+        if inspect.isgeneratorfunction(fn):
+            # Streaming methods: time each step, not the caller's loop body
+            @functools.wraps(fn)
+            def generator(*args: Any, **kwargs: Any) -> Iterator[Any]:
+                it = fn(*args, **kwargs)
+                while True:
+                    with self._service_call():
+                        try:
+                            item = next(it)
+                        except StopIteration:
+                            return
+                    yield item
+
+            return generator
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with self._service_call():
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    @contextmanager
+    def _service_call(self) -> Iterator[None]:
+        self._service_depth += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._service_depth -= 1
+            if not self._service_depth:
+                self.service_seconds += time.perf_counter() - started
+
+
+def _format_params(parameters: Any, executemany: bool) -> str:
+    if executemany and parameters:
+        text = f"{len(parameters)} rows, first {parameters[0]!r}"
+    else:
+        text = repr(parameters)
+    if len(text) > PARAMS_MAX_LENGTH:
+        text = text[: PARAMS_MAX_LENGTH - 3] + "..."
+    return text
@@ -0,0 +1,541 @@
+import hashlib
+import mmap
+import os
+import struct
+from array import array
+from calendar import monthrange
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Literal, NamedTuple, Sequence
+
+from sqlalchemy import BigInteger, Date, Integer, case, cast, func, select, union_all
+from sqlalchemy.orm import Session
+
+from budgetwise_cli.domain import models as m
+from budgetwise_cli.domain.money import from_cents, to_cents
+from budgetwise_cli.services.budget_service import (
+    PERIODS,
+    PivotReport,
+    _archived_to_file,
+    _check_range,
+    _period_label,
+    _period_labels,
+)
+
+try:
+    import numpy as np  # type: ignore[import-not-found, unused-ignore]
+except ImportError:  # optional: pip install budgetwise_cli[analytics]
+    np = None  # type: ignore[assignment, unused-ignore]
+
+EPOCH = date(1970, 1, 1)
+
+# Rows fetched per round trip while loading the ledger
+LOAD_CHUNK_SIZE = 50_000
+
+# Incremental refreshes append a segment to the cache file; past this many
+# the file is rewritten as a single segment
+MAX_SEGMENTS = 16
+
+# magic, database fingerprint, max transaction id, rows, row checksum, segments
+_HEADER = struct.Struct("<8s16sqqqq")
+_HEADER_SIZE = 64
+_MAGIC = b"BWCOLS02"
+# Each segment is its row count followed by the columns in native byte order
+_SEGMENT = struct.Struct("<q")
+_COLUMNS: tuple[tuple[Literal["q", "i", "B"], int], ...] = (
+    ("q", 8),
+    ("i", 4),
+    ("i", 4),
+    ("B", 1),
+)
+_ROW_SIZE = sum(size for _, size in _COLUMNS)
+
+# flags column: the row is a move, i.e. a transfer or a close-month leg
+_MOVE = 1
+
+# Per-row checksums are taken modulo this prime, which keeps every product
+# and the sum of four of them inside a signed 64-bit integer
+_CHECKSUM_MOD = 1_000_000_007
+
+# Largest envelope x period table NumPy counts into without sorting first
+DENSE_GROUPS = 1 << 22
+
+# NumPy sums cents in float64, exact while every partial sum stays below this
+_EXACT_FLOAT = 2**53
+
+
+class _Segment(NamedTuple):
+    # One batch of ledger rows; columns are array.array, a
+    # memoryview of the cache file, or NumPy views of either
+    cents: Any
+    days: Any
+    env: Any
+    flags: Any
+
+
+def _no_period(year: int, month: int) -> int:
+    # Months archived to files count towards period 0 of an ungrouped sum
+    return 0
+
+
+class AnalyticsEngine:
+    # The ledger loaded once into flat columns (integer cents, days since
+    # 1970-01-01, envelope id, flags) for ad-hoc analysis without the ORM.
+    # Queries are vectorized with NumPy when it is installed and fall back to
+    # a single pass over the arrays otherwise. With cache_path the columns
+    # are memory-mapped from that file, and refresh() only fetches rows with
+    # ids above the cached maximum. Rows at or below that id are compared by
+    # count and by a sum of per-row checksums over (id, cents, day, envelope,
+    # flags), so deleting, archiving or editing any of them, including edits
+    # that cancel out in a plain total, triggers a full reload.
+
+    def __init__(self, db: Session, cache_path: Path | None = None) -> None:
+        self.db = db
+        self.cache_path = cache_path
+        self.max_id = 0
+        self.rows = 0
+        self.checksum = 0
+        self._segments: list[_Segment] = []
+        self._names: dict[int, str] = {}
+        self._ids: dict[str, int] = {}
+        # Months archived to files have no raw rows, only monthly totals:
+        # (year, month) -> (path, {env_id: (cents, tx_count)})
+        self._file_months: dict[
+            tuple[int, int], tuple[str | None, dict[int, tuple[int, int]]]
+        ] = {}
+        self._loaded = False
+        self._fingerprint = hashlib.blake2b(
+            db.get_bind().engine.url.render_as_string(hide_password=True).encode(),
+            digest_size=16,
+        ).digest()
+
+    def refresh(self, full: bool = False) -> int:
+        # Bring the columns up to date with the database, returns rows added
+        self._load_envelopes()
+        self._load_file_months()
+        if not self._loaded and self.cache_path is not None and not full:
+            # A missing, foreign or unreadable file is rewritten from scratch
+            full = not self._open_cache()
+        self._loaded = True
+
+        ledger = _ledger()
+        cents = cast(func.round(ledger.c.amount * 100), BigInteger)
+        day = _epoch_day(self.db, ledger.c.ts)
+        flags = case((ledger.c.type == m.TransactionType.MOVE, _MOVE), else_=0)
+        checksum = _row_checksum(ledger.c.id, cents, day, ledger.c.env_id, flags)
+        if self.rows and not full:
+            # Rows deleted, archived away, edited or inserted below max_id
+            rows, total = self.db.execute(
+                select(func.count(), func.coalesce(func.sum(checksum), 0)).where(
+                    ledger.c.id <= self.max_id
+                )
+            ).one()
+            full = (rows, int(total)) != (self.rows, self.checksum)
+        if full:
+            self._segments, self.max_id, self.rows, self.checksum = [], 0, 0, 0
+
+        added = 0
+        columns = _new_columns()
+        stmt = select(ledger.c.id, cents, day, ledger.c.env_id, flags, checksum).where(
+            ledger.c.id > self.max_id
+        )
+        if self.db.get_bind().dialect.name == "postgresql":
+            # Server-side cursor; SQLite reads plain fetchmany() batches
+            stmt = stmt.execution_options(yield_per=LOAD_CHUNK_SIZE)
+        for chunk in self.db.execute(stmt).partitions(LOAD_CHUNK_SIZE):
+            ids, amounts, days, env, flag_values, checksums = zip(*chunk)
+            columns.cents.extend(amounts)
+            columns.days.extend(days)
+            columns.env.extend(env)
+            columns.flags.extend(flag_values)
+            self.max_id = max(self.max_id, max(ids))
+            self.checksum += sum(checksums)
+            added += len(ids)
+        if not added and not full:
+            return 0
+
+        self.rows += added
+        if added:
+            self._segments.append(_as_numpy(columns))
+        if self.cache_path is not None:
+            self._write_cache(columns if added else None, rewrite=full)
+        return added
+
+    def report(
+        self, start: date, end: date, envelope: str | None = None
+    ) -> dict[str, Decimal]:
+        # Same answer as BudgetService.report
+        _check_range(start, end)
+        env_id = self._envelope_id(envelope)
+        if env_id == -1:
+            return {}
+        totals = self._sum(start, end, env_id)
+        return {
+            name: _money(cents)
+            for name, cents in sorted(
+                (self._names[env], cents) for (env, _), (cents, _) in totals.items()
+            )
+        }
+
+    def pivot_report(
+        self, start: date, end: date, by: str = "month", running: bool = False
+    ) -> PivotReport:
+        # Same answer as BudgetService.pivot_report
+        _check_range(start, end)
+        if by not in PERIODS:
+            raise ValueError(f"Period must be one of {', '.join(PERIODS)}")
+        periods = _period_labels(start, end, by)
+        index = {label: i for i, label in enumerate(periods)}
+        lo = _day(start)
+        period_of_day = [
+            index[_period_label(d.year, d.month, by)]
+            for d in (start + timedelta(days=i) for i in range(_day(end) - lo + 1))
+        ]
+        balances: dict[str, list[int]] = {}
+        for (env, period), (cents, _) in self._sum(
+            start,
+            end,
+            periods=period_of_day,
+            file_period=lambda year, month: index[_period_label(year, month, by)],
+        ).items():
+            row = balances.setdefault(self._names[env], [0] * len(periods))
+            row[period] += int(cents)
+        if running:
+            for row in balances.values():
+                for i in range(1, len(row)):
+                    row[i] += row[i - 1]
+        return PivotReport(
+            periods,
+            {
+                name: [from_cents(c) for c in row]
+                for name, row in sorted(balances.items())
+            },
+        )
+
+    def running_balance(
+        self, start: date, end: date, envelope: str | None = None
+    ) -> list[tuple[date, Decimal]]:
+        # Closing balance, over all history, of every day in [start, end] with
+        # activity; for one envelope or all of them together
+        _check_range(start, end)
+        env_id = self._envelope_id(envelope)
+        if env_id == -1:
+            return []
+        opening = sum(
+            cents
+            for cents, _ in self._sum(
+                date.min, start - timedelta(days=1), env_id
+            ).values()
+        )
+        days = _day(end) - _day(start) + 1
+        per_day: dict[int, int] = {}
+        for (_, day), (cents, _) in self._sum(
+            start, end, env_id, periods=range(days), file_period=None
+        ).items():
+            per_day[day] = per_day.get(day, 0) + cents
+
+        balance = opening
+        result = []
+        for day in sorted(per_day):
+            balance += per_day[day]
+            result.append((start + timedelta(days=day), _money(balance)))
+        return result
+
+    def top_spending(self, n: int, start: date, end: date) -> list[tuple[str, Decimal]]:
+        # Envelopes with the largest outflows, as BudgetService.variance counts
+        # them: expenses only, transfers and close-month legs left out
+        _check_range(start, end)
+        if n <= 0:
+            raise ValueError("N must be positive")
+        spent = [
+            (-cents, self._names[env])
+            for (env, _), (cents, _) in self._sum(start, end, spending=True).items()
+        ]
+        spent.sort(key=lambda row: (-row[0], row[1]))
+        return [(name, _money(cents)) for cents, name in spent[:n]]
+
+    def _sum(
+        self,
+        start: date,
+        end: date,
+        env_id: int | None = None,
+        spending: bool = False,
+        periods: Sequence[int] | None = None,
+        file_period: Callable[[int, int], int] | None = _no_period,
+    ) -> dict[tuple[int, int], tuple[int, int]]:
+        # (env_id, period) -> (cents, rows) over [start, end] across segments,
+        # plus the monthly totals of months archived to files
+        if not self._loaded:
+            self.refresh()
+        lo, hi = _day(start), _day(end)
+        totals: dict[tuple[int, int], tuple[int, int]] = {}
+        for segment in self._segments:
+            for key, (cents, count) in _group(
+                segment, lo, hi, env_id, spending, periods
+            ).items():
+                total = totals.get(key)
+                totals[key] = (
+                    (cents, count)
+                    if total is None
+                    else (total[0] + cents, total[1] + count)
+                )
+
+        for (year, month), (path, months) in self._file_months.items():
+            first = date(year, month, 1)
+            last = date(year, month, monthrange(year, month)[1])
+            if last < start or first > end:
+                continue
+            # Only their monthly totals are left: whole months of balances
+            if spending or file_period is None or not (start <= first and last <= end):
+                raise _archived_to_file((year, month), path)
+            period = file_period(year, month)
+            for env, (cents, count) in months.items():
+                if env_id is not None and env != env_id:
+                    continue
+                total = totals.get((env, period), (0, 0))
+                totals[(env, period)] = (total[0] + cents, total[1] + count)
+        return totals
+
+    def _envelope_id(self, envelope: str | None) -> int | None:
+        # None for every envelope, -1 for a name that does not exist
+        if not self._loaded:
+            self.refresh()
+        if envelope is None:
+            return None
+        return self._ids.get(envelope, -1)
+
+    def _load_envelopes(self) -> None:
+        self._names = dict(
+            self.db.execute(select(m.Envelope.id, m.Envelope.name)).all()
+        )
+        self._ids = {name: env for env, name in self._names.items()}
+
+    def _load_file_months(self) -> None:
+        a, b = m.ArchivedMonth, m.EnvelopeMonthBalance
+        self._file_months = {}
+        for year, month, path, env, balance, count in self.db.execute(
+            select(a.year, a.month, a.path, b.env_id, b.balance, b.tx_count)
+            .join(b, (a.year == b.year) & (a.month == b.month))
+            .where(a.path.is_not(None), b.tx_count > 0)
+        ):
+            months = self._file_months.setdefault((year, month), (path, {}))[1]
+            months[env] = (to_cents(balance), count)
+
+    def _open_cache(self) -> bool:
+        assert self.cache_path is not None
+        try:
+            with self.cache_path.open("rb") as fh:
+                data = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, fingerprint, max_id, rows, checksum, segments = _HEADER.unpack_from(
+                data
+            )
+        except (FileNotFoundError, ValueError, struct.error):
+            # Missing, empty or truncated file
+            return False
+        if magic != _MAGIC or fingerprint != self._fingerprint:
+            return False
+
+        view = memoryview(data)
+        offset = _HEADER_SIZE
+        loaded = []
+        for _ in range(segments):
+            (n,) = _SEGMENT.unpack_from(data, offset)
+            offset += _SEGMENT.size
+            columns = []
+            for code, size in _COLUMNS:
+                columns.append(view[offset : offset + n * size].cast(code))
+                offset += n * size
+            offset = _aligned(offset)
+            loaded.append(_as_numpy(_Segment(*columns)))
+        self._segments, self.max_id, self.rows = loaded, max_id, rows
+        self.checksum = checksum
+        return True
+
+    def _write_cache(self, columns: _Segment | None, rewrite: bool) -> None:
+        assert self.cache_path is not None
+        path = self.cache_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if rewrite or len(self._segments) > MAX_SEGMENTS:
+            # Whole file, written aside and renamed so readers never see half
+            merged = _merge(self._segments)
+            self._segments = [_as_numpy(merged)] if self.rows else []
+            tmp = path.with_name(path.name + ".tmp")
+            with tmp.open("wb") as fh:
+                fh.write(self._header().ljust(_HEADER_SIZE, b"\0"))
+                if self.rows:
+                    fh.write(_segment_bytes(merged))
+            os.replace(tmp, path)
+            return
+
+        assert columns is not None
+        with path.open("r+b") as fh:
+            # Anything after the last complete segment is a torn append
+            *_, segments = _HEADER.unpack(fh.read(_HEADER.size))
+            fh.seek(_HEADER_SIZE)
+            for _ in range(segments):
+                (n,) = _SEGMENT.unpack(fh.read(_SEGMENT.size))
+                fh.seek(_aligned(fh.tell() + n * _ROW_SIZE))
+            fh.truncate()
+            fh.write(_segment_bytes(columns))
+            fh.flush()
+            os.fsync(fh.fileno())
+            fh.seek(0)
+            fh.write(self._header())
+
+    def _header(self) -> bytes:
+        return _HEADER.pack(
+            _MAGIC,
+            self._fingerprint,
+            self.max_id,
+            self.rows,
+            self.checksum,
+            len(self._segments),
+        )
+
+
+def _ledger() -> Any:
+    # Every raw row in the database, including months archived to the table
+    t, a = m.Transaction.__table__, m.TransactionArchive.__table__
+    columns = ("id", "env_id", "type", "amount", "ts")
+    return union_all(
+        select(*(t.c[c] for c in columns)), select(*(a.c[c] for c in columns))
+    ).subquery("ledger")
+
+
+def _row_checksum(row_id: Any, cents: Any, day: Any, env: Any, flags: Any) -> Any:
+    # Each value is weighted by a different function of the row id, so moving
+    # an amount, an envelope or a date from one row to another changes the sum
+    row_id = cast(row_id, BigInteger)
+
+    def term(value: Any, scale: int, offset: int) -> Any:
+        return (value % _CHECKSUM_MOD) * ((row_id * scale) % _CHECKSUM_MOD + offset)
+
+    return (
+        term(cents, 1, 1) + term(env, 7, 3) + term(day, 13, 5) + term(flags, 17, 11)
+    ) % _CHECKSUM_MOD
+
+
+def _epoch_day(db: Session, ts: Any) -> Any:
+    if db.get_bind().dialect.name == "postgresql":
+        return cast(cast(ts, Date) - cast(EPOCH.isoformat(), Date), Integer)
+    return cast(func.julianday(func.date(ts)) - 2440587.5, Integer)
+
+
+def _day(value: date) -> int:
+    return value.toordinal() - EPOCH.toordinal()
+
+
+def _money(cents: int) -> Decimal:
+    # Also takes numpy integers, which Decimal() does not
+    return from_cents(int(cents))
+
+
+def _aligned(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _new_columns() -> _Segment:
+    return _Segment(*(array(code) for code, _ in _COLUMNS))
+
+
+def _merge(segments: list[_Segment]) -> _Segment:
+    merged = _new_columns()
+    for segment in segments:
+        for target, column in zip(merged, segment):
+            target.frombytes(bytes(column))
+    return merged
+
+
+def _segment_bytes(columns: _Segment) -> bytes:
+    n = len(columns.cents)
+    body = b"".join(bytes(column) for column in columns)
+    return (_SEGMENT.pack(n) + body).ljust(_aligned(_SEGMENT.size + len(body)), b"\0")
+
+
+def _as_numpy(segment: _Segment) -> _Segment:
+    # Zero-copy NumPy views over the arrays or the mapped file
+    if np is None:
+        return segment
+    return _Segment(
+        *(
+            np.frombuffer(column, dtype=code)
+            for column, (code, _) in zip(segment, _COLUMNS)
+        )
+    )
+
+
+def _group(
+    segment: _Segment,
+    lo: int,
+    hi: int,
+    env_id: int | None,
+    spending: bool,
+    periods: Sequence[int] | None,
+) -> dict[tuple[int, int], tuple[int, int]]:
+    # (env_id, period) -> (cents, rows) for the rows dated lo..hi; period is
+    # periods[day - lo], or 0 without periods
+    if np is not None:
+        return _group_numpy(segment, lo, hi, env_id, spending, periods)
+
+    totals: dict[tuple[int, int], list[int]] = {}
+    for cents, day, env, flags in zip(*segment):
+        if day < lo or day > hi:
+            continue
+        if env_id is not None and env != env_id:
+            continue
+        if spending and (cents >= 0 or flags & _MOVE):
+            continue
+        key = (env, 0 if periods is None else periods[day - lo])
+        total = totals.get(key)
+        if total is None:
+            totals[key] = [cents, 1]
+        else:
+            total[0] += cents
+            total[1] += 1
+    return {key: (cents, count) for key, (cents, count) in totals.items()}
+
+
+def _group_numpy(
+    segment: _Segment,
+    lo: int,
+    hi: int,
+    env_id: int | None,
+    spending: bool,
+    periods: Sequence[int] | None,
+) -> dict[tuple[int, int], tuple[int, int]]:
+    mask = (segment.days >= lo) & (segment.days <= hi)
+    if env_id is not None:
+        mask &= segment.env == env_id
+    if spending:
+        mask &= (segment.cents < 0) & ((segment.flags & _MOVE) == 0)
+    cents = segment.cents[mask]
+    if not len(cents):
+        return {}
+
+    env = segment.env[mask].astype(np.int64)
+    if periods is None:
+        period = np.zeros_like(env)
+    else:
+        period = np.asarray(periods, dtype=np.int64)[segment.days[mask] - lo]
+    width = int(period.max()) + 1
+    keys = env * width + period
+    size = int(keys.max()) + 1
+    if size <= DENSE_GROUPS:
+        # Envelope ids are small and dense: count into a table directly
+        groups, keys = keys, None
+    else:
+        keys, groups = np.unique(keys, return_inverse=True)
+        size = len(keys)
+    counts = np.bincount(groups, minlength=size)
+    if int(np.abs(cents).sum()) < _EXACT_FLOAT:
+        sums = np.rint(np.bincount(groups, weights=cents, minlength=size))
+    else:
+        sums = np.zeros(size, dtype=np.int64)
+        np.add.at(sums, groups, cents)
+    present = np.flatnonzero(counts)
+    present_keys = present if keys is None else keys[present]
+    return {
+        (int(key) // width, int(key) % width): (int(total), int(count))
+        for key, total, count in zip(present_keys, sums[present], counts[present])
+    }
@@ -1,18 +1,139 @@
+import gzip
+import operator
+import re
 from calendar import monthrange
-from datetime import timedelta, date, datetime, timezone
+from datetime import timedelta, date, datetime, time, timezone
 from decimal import Decimal
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterable, Iterator, NamedTuple
 
-from sqlalchemy import func, select
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    Integer,
+    Numeric,
+    Row,
+    Select,
+    String,
+    Table,
+    and_,
+    bindparam,
+    case,
+    cast,
+    column,
+    delete,
+    extract,
+    func,
+    insert,
+    literal,
+    literal_column,
+    select,
+    table,
+    tuple_,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from budgetwise_cli.domain import models as m
+from budgetwise_cli.domain.money import from_cents, to_cents
+from budgetwise_cli.services.closed_periods import ClosedPeriods
+from budgetwise_cli.services.envelope_cache import EnvelopeCache
+from budgetwise_cli.services.recurring import check_rule, occurrences
+from budgetwise_cli.services.report_cache import ReportCache
+from budgetwise_cli.services.statements import (
+    EXPORT_CHUNK_SIZE,
+    IMPORT_BATCH_SIZE,
+    write_statement,
+)
+
+# (envelope name, amount, note, timestamp or None for "now"), optionally
+# followed by an external id; a record whose id is stored already is skipped
+TransactionRecord = (
+    tuple[str, Decimal, str, datetime | None]
+    | tuple[str, Decimal, str, datetime | None, str | None]
+)
+
+# (id, envelope name, type, amount, note, timestamp) as exports and searches
+# return them
+LedgerRow = Row[int, str, m.TransactionType, Decimal, str | None, datetime]
+
+# (id, envelope name, rule, amount, note, start date, end date) of a schedule
+ScheduleRow = Row[int, str, str, Decimal, str | None, date, date | None]
+
+
+PERIODS = ("month", "quarter", "year")
+
+SEARCH_PAGE_SIZE = 50
+
+VARIANCE_SORTS = ("name", "spent", "remaining", "percent")
+
+# Notes of the two legs close_month books. Both are MOVE transactions:
+# they move money between months, they are not income or spending
+ROLLOVER_NOTE = "rollover to next month"
+OPENING_NOTE = "opening balance"
+
+
+class PivotReport(NamedTuple):
+    periods: list[str]
+    balances: dict[str, list[Decimal]]
+
+
+class ArchivedBatch(NamedTuple):
+    year: int
+    month: int
+    tx_count: int
+    path: str | None
+
+
+class VarianceRow(NamedTuple):
+    envelope: str
+    budget: Decimal
+    spent: Decimal
+    remaining: Decimal
+    percent_used: Decimal | None
+
+
+class Imported(NamedTuple):
+    inserted: int
+    # Rows whose external_id was already in the ledger
+    skipped: int
+
+
+class Materialized(NamedTuple):
+    inserted: int
+    # Occurrences already in the ledger from an earlier run
+    existing: int
+    # Occurrences falling in closed months, never written
+    closed: int
+
+
+class BalanceMismatch(NamedTuple):
+    envelope: str
+    year: int
+    month: int
+    expected: Decimal
+    actual: Decimal
 
 
 class BudgetService:
     # Budgeting operations related to envelopes and transactions
 
-    def __init__(self, db: Session) -> None:
+    def __init__(
+        self,
+        db: Session,
+        envelope_cache: EnvelopeCache | None = None,
+        report_cache: ReportCache | None = None,
+        closed_periods: ClosedPeriods | None = None,
+    ) -> None:
         self.db = db
+        engine = db.get_bind().engine
+        self.envelopes = envelope_cache or EnvelopeCache.for_bind(engine)
+        self.reports = report_cache or ReportCache.for_bind(engine)
+        self.closed = closed_periods or ClosedPeriods.for_bind(engine)
 
     def add_transaction(
         self,
@@ -20,48 +141,284 @@ class BudgetService:
         amount: Decimal,
         note: str = "",
         ts: datetime | None = None,
-    ) -> m.Transaction:
-        # Create Envelope if it doesn't exist and Insert a new transaction
-        env = self._get_or_create_envelope(envelope_name)
-        tx_type = m.TransactionType.INCOME if amount > 0 else m.TransactionType.EXPENSE
-        tx = m.Transaction(
-            type=tx_type,
-            amount=amount,
-            note=note,
-            ts=ts or datetime.now(timezone.utc),
-            envelope=env,
+        external_id: str | None = None,
+    ) -> m.Transaction | m.TransactionArchive:
+        # Create Envelope if it doesn't exist and Insert a new transaction.
+        # Retrying with the same external_id returns the stored transaction,
+        # an archive row once its month has been archived.
+        added = self.add_transactions([(envelope_name, amount, note, ts, external_id)])
+        if added:
+            return added[0]
+        stored = self.db.scalars(
+            select(m.Transaction).where(m.Transaction.external_id == external_id)
+        ).one_or_none()
+        if stored is not None:
+            return stored
+        return self.db.scalars(
+            select(m.TransactionArchive).where(
+                m.TransactionArchive.external_id == external_id
+            )
+        ).one()
+
+    def add_transactions(
+        self,
+        records: Iterable[TransactionRecord],
+        redirect_closed: bool = False,
+        kind: m.TransactionType | None = None,
+    ) -> list[m.Transaction]:
+        # Insert (envelope, amount, note, ts) records with one envelope lookup,
+        # one multi-row INSERT .. RETURNING and no per-row flush. Records whose
+        # external id is stored already are skipped and not returned. The type
+        # follows each amount's sign unless kind is given.
+        batch = list(records)
+        if not batch:
+            return []
+        env_ids = self._resolve_envelopes({r[0] for r in batch})
+        rows, cents = self._transaction_rows(batch, env_ids, redirect_closed, kind)
+        if not rows:
+            return []
+        if not any(row["external_id"] is not None for row in rows):
+            txs = self.db.scalars(insert(m.Transaction).returning(m.Transaction), rows)
+            self._apply_month_deltas(_month_deltas(rows, cents))
+            return sorted(txs.all(), key=lambda tx: tx.id)
+
+        stmt = (
+            self._upsert(m.Transaction)  # type: ignore[arg-type]
+            .on_conflict_do_nothing(index_elements=["external_id"])
+            .returning(m.Transaction)
         )
-        self.db.add(tx)
-        self.db.flush()
-        return tx
+        result = sorted(self.db.scalars(stmt, rows).all(), key=lambda tx: tx.id)
+        deltas: dict[tuple[int, int, int], list[int]] = {}
+        for tx in result:
+            _add_delta(deltas, tx.env_id, tx.ts, to_cents(tx.amount))
+        self._apply_month_deltas(deltas)
+        return result
 
-    # Transfer money between envelopes if budget changes are needed
+    def import_transactions(
+        self,
+        rows: Iterable[TransactionRecord],
+        batch_size: int = IMPORT_BATCH_SIZE,
+        redirect_closed: bool = False,
+    ) -> Imported:
+        # Insert statement rows in multi-row batches. Rows with an external id
+        # cost one unique index probe each and are skipped when already stored.
+        if batch_size <= 0:
+            raise ValueError("Batch size must be positive")
+
+        env_ids: dict[str, int] = {}
+        read = inserted = 0
+        transactions: Table = m.Transaction.__table__  # type: ignore[assignment]
+        it = iter(rows)
+        while batch := list(islice(it, batch_size)):
+            read += len(batch)
+            # Resolve only the envelope names this batch introduces
+            env_ids.update(
+                self._resolve_envelopes({r[0] for r in batch} - env_ids.keys())
+            )
+            params, cents = self._transaction_rows(batch, env_ids, redirect_closed)
+            if not params:
+                continue
+            if any(row["external_id"] is not None for row in params):
+                inserted += self._insert_new(
+                    self._upsert(transactions).on_conflict_do_nothing(
+                        index_elements=["external_id"]
+                    ),
+                    params,
+                )
+                continue
+            # No RETURNING here so the driver can use a plain executemany
+            self.db.execute(insert(m.Transaction), params)
+            self._apply_month_deltas(_month_deltas(params, cents))
+            inserted += len(params)
+        return Imported(inserted, read - inserted)
+
+    # Transfer money between envelopes if budget changes are needed. Both
+    # legs are moves, so neither counts as spending or income
     def move(self, src: str, dst: str, amount: Decimal) -> None:
         if amount <= 0:
             raise ValueError("Amount must be positive")
-        self.add_transaction(src, -amount, f"transfer to {dst}")
-        self.add_transaction(dst, amount, f"transfer from {src}")
+        self.add_transactions(
+            [
+                (src, -amount, f"transfer to {dst}", None),
+                (dst, amount, f"transfer from {src}", None),
+            ],
+            kind=m.TransactionType.MOVE,
+        )
 
     # Date reporting and monthly management
-    def report(self, start: date, end: date) -> dict[str, Decimal]:
-        if not isinstance(start, date) or not isinstance(end, date):
-            raise ValueError("Start and end must be date objects")
-        if start > end:
-            raise ValueError(f"Start date {start} cannot be after end date {end}")
+    def report(
+        self, start: date, end: date, envelope: str | None = None
+    ) -> dict[str, Decimal]:
+        _check_range(start, end)
+
+        key = (start, end, envelope)
+        cached = self.reports.get(self.db, key)
+        if cached is not None:
+            return cached
+
+        if _is_whole_months(start, end):
+            result = self._report_from_month_balances(start, end, envelope)
+        else:
+            # Get balances for each envelope within the date range, end inclusive
+            ledger = self._raw_ledger(start, end)
+            stmt = (
+                select(m.Envelope.name, func.sum(ledger.c.amount))
+                .join(ledger, ledger.c.env_id == m.Envelope.id)
+                .where(*_ts_between(start, end, ledger.c.ts))
+                .group_by(m.Envelope.name)
+                .order_by(m.Envelope.name)
+            )
+            if envelope is not None:
+                stmt = stmt.where(m.Envelope.name == envelope)
+            result = {
+                name: balance or Decimal("0") for name, balance in self.db.execute(stmt)
+            }
+        self.reports.put(self.db, key, result)
+        return result
 
-        # Get balances for each envelope within the date range
+    def pivot_report(
+        self,
+        start: date,
+        end: date,
+        by: str = "month",
+        running: bool = False,
+        envelope: str | None = None,
+    ) -> PivotReport:
+        # Envelope x period matrix from one query grouped by envelope and month
+        _check_range(start, end)
+        if by not in PERIODS:
+            raise ValueError(f"Period must be one of {', '.join(PERIODS)}")
+
+        if _is_whole_months(start, end):
+            b = m.EnvelopeMonthBalance
+            stmt = (
+                select(m.Envelope.name, b.year, b.month, _cents(b.balance))
+                .join(b, b.env_id == m.Envelope.id)
+                .where(
+                    tuple_(b.year, b.month) >= (start.year, start.month),
+                    tuple_(b.year, b.month) <= (end.year, end.month),
+                    b.tx_count > 0,
+                )
+            )
+        else:
+            ledger = self._raw_ledger(start, end)
+            year = extract("year", ledger.c.ts)
+            month = extract("month", ledger.c.ts)
+            stmt = (
+                select(m.Envelope.name, year, month, _cents(func.sum(ledger.c.amount)))
+                .join(ledger, ledger.c.env_id == m.Envelope.id)
+                .where(*_ts_between(start, end, ledger.c.ts))
+                .group_by(m.Envelope.name, year, month)
+            )
+        if envelope is not None:
+            stmt = stmt.where(m.Envelope.name == envelope)
+
+        periods = _period_labels(start, end, by)
+        column = {label: i for i, label in enumerate(periods)}
+        cents: dict[str, list[int]] = {}
+        for name, year_num, month_num, total in self.db.execute(stmt):
+            row = cents.setdefault(name, [0] * len(periods))
+            row[column[_period_label(int(year_num), int(month_num), by)]] += total or 0
+
+        if running:
+            for row in cents.values():
+                for i in range(1, len(row)):
+                    row[i] += row[i - 1]
+        return PivotReport(
+            periods,
+            {name: [from_cents(c) for c in row] for name, row in sorted(cents.items())},
+        )
+
+    def iter_transactions(
+        self,
+        start: date | None = None,
+        end: date | None = None,
+        envelope: str | None = None,
+        chunk_size: int = EXPORT_CHUNK_SIZE,
+    ) -> Iterator[LedgerRow]:
+        # Stream ledger rows in id order without materialising the result
+        if chunk_size <= 0:
+            raise ValueError("Chunk size must be positive")
+        # Months archived to files are skipped, their rows live in those files
+        t = self._ledger(self._archived(start or date.min, end or date.max))
         stmt = (
-            select(m.Envelope.name, func.sum(m.Transaction.amount))
-            .join(m.Transaction)
-            .where(m.Transaction.ts.between(start, end))
-            .group_by(m.Envelope.name)
-            .order_by(m.Envelope.name)
+            select(t.c.id, m.Envelope.name, t.c.type, t.c.amount, t.c.note, t.c.ts)
+            .join(m.Envelope, t.c.env_id == m.Envelope.id)
+            .order_by(t.c.id)
         )
-        return {
-            name: balance or Decimal("0") for name, balance in self.db.execute(stmt)
-        }
+        if start is not None or end is not None:
+            stmt = stmt.where(*_ts_between(start or date.min, end or date.max, t.c.ts))
+        if envelope is not None:
+            stmt = stmt.where(m.Envelope.name == envelope)
+
+        if self.db.get_bind().dialect.name == "postgresql":
+            # Server-side cursor, fetched chunk_size rows at a time
+            yield from self.db.execute(stmt.execution_options(yield_per=chunk_size))
+            return
 
-    def close_month(self, year: int, month: int) -> None:
+        # Keyset paging keeps each SQLite read short and memory flat
+        last_id = 0
+        while rows := self.db.execute(
+            stmt.where(t.c.id > last_id).limit(chunk_size)
+        ).all():
+            yield from rows
+            last_id = rows[-1].id
+
+    def search(
+        self,
+        query: str,
+        envelope: str | None = None,
+        start: date | None = None,
+        end: date | None = None,
+        limit: int = SEARCH_PAGE_SIZE,
+        before_id: int | None = None,
+    ) -> list[LedgerRow]:
+        # Newest first page of transactions whose note matches every word of
+        # query as a prefix; pass the last id as before_id for the next page
+        words = re.findall(r"\w+", query.lower())
+        if not words:
+            raise ValueError("Search query must contain at least one word")
+        if limit <= 0:
+            raise ValueError("Limit must be positive")
+
+        t = m.Transaction
+        if self.db.get_bind().dialect.name == "postgresql":
+            # Same expression as the ix_transactions_note_tsv GIN index
+            matches = func.to_tsvector(
+                literal_column("'simple'"), func.coalesce(t.note, literal_column("''"))
+            ).op("@@")(
+                func.to_tsquery(
+                    literal_column("'simple'"), " & ".join(f"{w}:*" for w in words)
+                )
+            )
+            key: Any = t.id
+            stmt = select(t.id, m.Envelope.name, t.type, t.amount, t.note, t.ts).join(
+                m.Envelope
+            )
+        else:
+            fts = table("transactions_fts", column("rowid"))
+            matches = literal_column("transactions_fts").op("MATCH")(
+                " ".join(f'"{w}"*' for w in words)
+            )
+            # Ordering and paging on the FTS rowid lets FTS5 walk its index
+            key = fts.c.rowid
+            stmt = (
+                select(t.id, m.Envelope.name, t.type, t.amount, t.note, t.ts)
+                .select_from(fts)
+                .join(t, t.id == fts.c.rowid)
+                .join(m.Envelope)
+            )
+
+        stmt = stmt.where(matches).order_by(key.desc()).limit(limit)
+        if before_id is not None:
+            stmt = stmt.where(key < before_id)
+        if envelope is not None:
+            stmt = stmt.where(m.Envelope.name == envelope)
+        if start is not None or end is not None:
+            stmt = stmt.where(*_ts_between(start or date.min, end or date.max))
+        return list(self.db.execute(stmt).all())
+
+    def close_month(self, year: int, month: int, redirect_closed: bool = False) -> None:
         # Check if the month is already closed
         closed_month = (
             self.db.query(m.ClosedMonth).filter_by(year=year, month=month).first()
@@ -70,31 +427,906 @@ class BudgetService:
         if closed_month:
             raise ValueError(f"Month {year}-{month} has already been closed")
 
-        # roll over balances to the next month
-        first = date(year, month, 1)
+        # The rollover leg is booked on the last second of the month being
+        # closed, never in some later month that may be closed already. The
+        # opening leg is booked on the first of the next month, which is as
+        # immutable as any other once closed
         last = date(year, month, monthrange(year, month)[1])
-        balances = self.report(first, last)
+        rollover_ts = datetime.combine(last, time(23, 59, 59))
+        opening_ts = datetime.combine(last + timedelta(days=1), datetime.min.time())
+        periods = self.closed.periods(self.db)
+        if (opening_ts.year, opening_ts.month) in periods:
+            if not redirect_closed:
+                raise ValueError(
+                    f"Month {opening_ts.year}-{opening_ts.month:02d} is closed; "
+                    "cannot add transactions to it"
+                )
+            opening_ts = _first_open_month(opening_ts, periods)
 
-        # Record this month as closed
+        # Record the month first so the unique constraint stops a concurrent
+        # closer before it can roll the same balances a second time
         self.db.add(m.ClosedMonth(year=year, month=month))
+        try:
+            self.db.flush()
+        except IntegrityError:
+            raise ValueError(f"Month {year}-{month} has already been closed") from None
 
-        for env, bal in balances.items():
-            if bal == 0:
-                continue
-            self.add_transaction(env, -bal, "rollover to next month")
-            next_month = (last.replace(day=1) + timedelta(days=32)).replace(day=1)
-            self.add_transaction(
-                env,
-                bal,
-                "opening balance",
-                ts=datetime.combine(next_month, datetime.min.time()),
+        # roll over balances to the next month, set-based from the snapshot
+        self.reports.stage_writes(
+            self.db, {(year, month), (opening_ts.year, opening_ts.month)}
+        )
+        self.closed.stage(self.db, (year, month))
+
+        b = m.EnvelopeMonthBalance
+        closing = func.round(b.balance, 2)
+        closed = (b.year == year, b.month == month, closing != 0)
+        legs = (
+            (-closing, ROLLOVER_NOTE, rollover_ts),
+            (closing, OPENING_NOTE, opening_ts),
+        )
+
+        transactions: Table = m.Transaction.__table__  # type: ignore[assignment]
+        for amount, note, ts in legs:
+            self.db.execute(
+                insert(transactions).from_select(
+                    ["env_id", "type", "amount", "note", "ts"],
+                    select(
+                        b.env_id,
+                        literal(m.TransactionType.MOVE, transactions.c.type.type),
+                        amount,
+                        literal(note, String()),
+                        literal(ts, DateTime()),
+                    ).where(*closed),
+                )
+            )
+
+        # Fold both legs like any other write so checkpoints of months closed
+        # after the leg months shift with them
+        deltas: dict[tuple[int, int, int], list[int]] = {}
+        for env_id, cents in self.db.execute(
+            select(b.env_id, _cents(closing)).where(*closed)
+        ):
+            _add_delta(deltas, env_id, opening_ts, cents)
+            _add_delta(deltas, env_id, rollover_ts, -cents)
+        self._apply_month_deltas(deltas)
+
+        self._write_checkpoint(year, month)
+
+    # Monthly balance snapshots
+    def rebuild_month_balances(self) -> int:
+        # Recompute envelope_month_balances from the raw ledger, keeping the
+        # rows of months archived to files since nothing else records them
+        balances: Table = m.EnvelopeMonthBalance.__table__  # type: ignore[assignment]
+        self.db.execute(
+            delete(balances).where(
+                tuple_(balances.c.year, balances.c.month).not_in(
+                    _file_archived_months()
+                )
+            )
+        )
+        ledger = self._ledger(self._archived(date.min, date.max))
+        result = self.db.execute(
+            insert(balances).from_select(
+                ["env_id", "year", "month", "balance", "tx_count"],
+                _ledger_month_totals(ledger),
+            )
+        )
+
+        self.db.execute(delete(m.EnvelopeBalanceCheckpoint))
+        for closed in self.db.scalars(select(m.ClosedMonth)):
+            self._write_checkpoint(closed.year, closed.month)  # type: ignore[arg-type]
+        self.reports.stage_reset(self.db)
+        return result.rowcount  # type: ignore[attr-defined, no-any-return]
+
+    def verify_month_balances(self) -> list[BalanceMismatch]:
+        # Compare the snapshot table with a full scan of the ledger; months
+        # archived to files have no raw rows left to compare against
+        ledger = self._ledger(self._archived(date.min, date.max))
+        expected = {
+            (env_id, int(year), int(month)): balance
+            for env_id, year, month, balance, _ in self.db.execute(
+                _ledger_month_totals(ledger)
+            )
+        }
+        b = m.EnvelopeMonthBalance
+        actual = {
+            (row.env_id, row.year, row.month): row.balance
+            for row in self.db.scalars(
+                select(b).where(
+                    b.tx_count > 0,
+                    tuple_(b.year, b.month).not_in(_file_archived_months()),
+                )
+            )
+        }
+        names = dict(self.db.execute(select(m.Envelope.id, m.Envelope.name)).all())
+        zero = Decimal("0")
+        return [
+            BalanceMismatch(
+                names.get(key[0], str(key[0])),
+                key[1],
+                key[2],
+                expected.get(key, zero),
+                actual.get(key, zero),
+            )
+            for key in sorted(expected.keys() | actual.keys())
+            if expected.get(key) != actual.get(key)
+        ]
+
+    # Budget versus actual
+    def variance(
+        self,
+        start: date,
+        end: date,
+        over_only: bool = False,
+        sort: str = "name",
+    ) -> list[VarianceRow]:
+        # Budget, spending and what is left for every envelope, including ones
+        # with no activity, from one LEFT JOIN aggregate. Envelope.budget is
+        # monthly, so the period budget is budget x months touched by the range
+        _check_range(start, end)
+        if sort not in VARIANCE_SORTS:
+            raise ValueError(f"Sort must be one of {', '.join(VARIANCE_SORTS)}")
+
+        months = len(_period_labels(start, end, "month"))
+        ledger = self._raw_ledger(start, end)
+        e = m.Envelope
+        budget = (e.budget * months).label("budget")
+        spent = func.coalesce(-func.sum(ledger.c.amount), 0).label("spent")
+        remaining = (budget - spent).label("remaining")
+        percent = case(
+            (budget > 0, cast(func.round(spent * 100 / budget, 1), Numeric(10, 1))),
+            else_=None,
+        ).label("percent_used")
+
+        stmt = (
+            select(e.name, budget, spent, remaining, percent)
+            .outerjoin(
+                ledger,
+                and_(
+                    ledger.c.env_id == e.id,
+                    *_ts_between(start, end, ledger.c.ts),
+                    ledger.c.amount < 0,
+                    ledger.c.type != m.TransactionType.MOVE,
+                ),
+            )
+            .group_by(e.id, e.name, e.budget)
+        )
+        if over_only:
+            stmt = stmt.having(spent > budget)
+        order = {
+            "name": e.name,
+            "spent": spent.desc(),
+            "remaining": remaining,
+            "percent": percent.desc(),
+        }[sort]
+        stmt = stmt.order_by(order) if sort == "name" else stmt.order_by(order, e.name)
+        return [VarianceRow(*row) for row in self.db.execute(stmt)]
+
+    def set_budgets(self, budgets: dict[str, Decimal]) -> int:
+        # Set many monthly budgets with one UPDATE, choosing each row's budget
+        # with a CASE on its id; creates envelopes that do not exist yet and
+        # returns the count
+        if any(amount < 0 for amount in budgets.values()):
+            raise ValueError("Budgets cannot be negative")
+        if not budgets:
+            return 0
+        env_ids = self._resolve_envelopes(set(budgets))
+        envelopes: Table = m.Envelope.__table__  # type: ignore[assignment]
+        by_id = {env_ids[name]: amount for name, amount in budgets.items()}
+        self.db.execute(
+            update(envelopes)
+            .where(envelopes.c.id.in_(by_id))
+            .values(
+                budget=case(
+                    {
+                        env_id: literal(amount, envelopes.c.budget.type)
+                        for env_id, amount in by_id.items()
+                    },
+                    value=envelopes.c.id,
+                )
             )
+        )
+        return len(budgets)
 
-    # Helper for adding transactions
+    # Recurring schedules
+    def add_schedule(
+        self,
+        envelope_name: str,
+        amount: Decimal,
+        rule: str,
+        start: date,
+        note: str = "",
+        end: date | None = None,
+    ) -> m.RecurringSchedule:
+        check_rule(rule)
+        if to_cents(amount) == 0:
+            raise ValueError("Amount cannot be zero")
+        if end is not None and end < start:
+            raise ValueError("End date must not be before the start date")
+        schedule = m.RecurringSchedule(
+            env_id=self._resolve_envelopes({envelope_name})[envelope_name],
+            rule=rule,
+            amount=amount,
+            note=note,
+            start_date=start,
+            end_date=end,
+        )
+        self.db.add(schedule)
+        self.db.flush()
+        return schedule
+
+    def schedules(self) -> list[ScheduleRow]:
+        s = m.RecurringSchedule
+        return list(
+            self.db.execute(
+                select(
+                    s.id,
+                    m.Envelope.name,
+                    s.rule,
+                    s.amount,
+                    s.note,
+                    s.start_date,
+                    s.end_date,
+                )
+                .join(m.Envelope)
+                .order_by(s.id)
+            ).all()
+        )
+
+    def materialize(self, through: date) -> Materialized:
+        # Expand every schedule's occurrences up to through in memory and
+        # write them with one bulk INSERT .. ON CONFLICT DO NOTHING. The unique
+        # (schedule_id, ts) index makes reruns idempotent, and its max per
+        # schedule tells where each one left off, so a rerun neither expands
+        # nor sends the occurrences it already wrote. An occurrence deleted
+        # from before that point stays deleted
+        s = m.RecurringSchedule
+        t = m.Transaction
+        done = dict(
+            self.db.execute(
+                select(t.schedule_id, func.max(t.ts))
+                .where(t.schedule_id.is_not(None))
+                .group_by(t.schedule_id)
+            ).all()
+        )
+        closed = self.closed.periods(self.db)
+        rows: list[dict[str, Any]] = []
+        in_closed = 0
+        for schedule_id, env_id, rule, amount, note, start, end in self.db.execute(
+            select(
+                s.id, s.env_id, s.rule, s.amount, s.note, s.start_date, s.end_date
+            ).where(s.start_date <= through)
+        ):
+            kind = m.TransactionType.INCOME if amount > 0 else m.TransactionType.EXPENSE
+            after = done.get(schedule_id)
+            for day in occurrences(rule, start, through, end):
+                ts = datetime(day.year, day.month, day.day)
+                if after is not None and ts <= after:
+                    continue
+                if (day.year, day.month) in closed:
+                    in_closed += 1
+                    continue
+                rows.append(
+                    {
+                        "env_id": env_id,
+                        "type": kind,
+                        "amount": amount,
+                        "note": note,
+                        "ts": ts,
+                        "schedule_id": schedule_id,
+                    }
+                )
+        if not rows:
+            return Materialized(0, 0, in_closed)
+
+        transactions: Table = t.__table__  # type: ignore[assignment]
+        inserted = self._insert_new(
+            self._upsert(transactions).on_conflict_do_nothing(
+                index_elements=["schedule_id", "ts"]
+            ),
+            rows,
+        )
+        return Materialized(inserted, len(rows) - inserted, in_closed)
+
+    # Archival of closed months
+    def archive_months(
+        self, before: date, directory: Path | None = None, fmt: str = "jsonl"
+    ) -> list[ArchivedBatch]:
+        # Move the raw rows of closed months before `before` out of the hot
+        # transactions table, into transactions_archive or one gzip file per
+        # month in directory. The months' envelope_month_balances rows stay
+        # behind as their summary, so whole-month reports do not change
+        if directory is not None and fmt not in ("csv", "jsonl"):
+            raise ValueError(f"Unsupported archive format {fmt}")
+
+        t = m.Transaction
+        cutoff = before.replace(day=1)
+        year = extract("year", t.ts)
+        month = extract("month", t.ts)
+        months = sorted(
+            (int(y), int(mo))
+            for y, mo in self.db.execute(
+                select(year, month)
+                .where(*_ts_between(date.min, cutoff - timedelta(days=1)))
+                .group_by(year, month)
+            )
+        )
+        closed = self.closed.periods(self.db)
+        for y, mo in months:
+            if (y, mo) not in closed:
+                raise ValueError(
+                    f"Month {y}-{mo:02d} is not closed; only closed months "
+                    "can be archived"
+                )
+
+        archived = self._archived(date.min, cutoff)
+        ledger = self._ledger(archived)
+        transactions: Table = t.__table__  # type: ignore[assignment]
+        archive: Table = m.TransactionArchive.__table__  # type: ignore[assignment]
+        columns = [
+            "id",
+            "env_id",
+            "type",
+            "amount",
+            "note",
+            "ts",
+            "schedule_id",
+            "external_id",
+        ]
+        batches = []
+        for y, mo in months:
+            if (y, mo) in archived and (archived[y, mo] is None) != (directory is None):
+                raise ValueError(f"Month {y}-{mo:02d} is already archived elsewhere")
+            # The summary is all that remains afterwards, so it must be exact
+            if not self._month_matches_ledger(ledger, y, mo):
+                raise ValueError(
+                    f"Monthly balances for {y}-{mo:02d} do not match the ledger; "
+                    "run rebuild-balances first"
+                )
+
+            in_month = _ts_between(date(y, mo, 1), date(y, mo, monthrange(y, mo)[1]))
+            path = None
+            if directory is None:
+                count = self.db.execute(
+                    insert(archive).from_select(
+                        columns,
+                        select(*(transactions.c[c] for c in columns)).where(*in_month),
+                    )
+                ).rowcount  # type: ignore[attr-defined]
+            else:
+                target = directory / f"transactions-{y}-{mo:02d}.{fmt}.gz"
+                if target.exists():
+                    raise ValueError(f"{target} already exists")
+                rows = self.db.execute(
+                    select(t.id, m.Envelope.name, t.type, t.amount, t.note, t.ts)
+                    .join(m.Envelope)
+                    .where(*in_month)
+                    .order_by(t.id)
+                )
+                with gzip.open(target, "wt", newline="") as fh:
+                    count = write_statement(rows, fh, fmt)
+                path = str(target)
+            self.db.execute(delete(t).where(*in_month))
+
+            record = self.db.get(m.ArchivedMonth, (y, mo))
+            if record is None:
+                self.db.add(
+                    m.ArchivedMonth(year=y, month=mo, path=path, tx_count=count)
+                )
+            else:
+                record.tx_count += count
+            batches.append(ArchivedBatch(y, mo, count, path))
+        self.db.flush()
+        return batches
+
+    # Point-in-time balances
+    def balance_as_of(
+        self, as_of: date, envelope: str | None = None, full_scan: bool = False
+    ) -> dict[str, Decimal]:
+        # Cumulative balances at the end of as_of: the latest checkpoint before
+        # as_of's month, plus snapshot months since, plus raw rows this month
+        if full_scan:
+            return self._balance_from_ledger(as_of, envelope)
+
+        b = m.EnvelopeMonthBalance
+        cp = m.EnvelopeBalanceCheckpoint
+        period = (as_of.year, as_of.month)
+        # On a month's last day the snapshot covers the whole month
+        whole = as_of.day == monthrange(*period)[1]
+        through = operator.le if whole else operator.lt
+        named = select(m.Envelope.id).where(m.Envelope.name == envelope)
+
+        def scope(column: Any) -> tuple[Any, ...]:
+            return () if envelope is None else (column.in_(named),)
+
+        latest = self.db.execute(
+            select(cp.year, cp.month)
+            .where(through(tuple_(cp.year, cp.month), period))
+            .order_by(cp.year.desc(), cp.month.desc())
+            .limit(1)
+        ).first()
+
+        parts = []
+        if not whole:
+            first = as_of.replace(day=1)
+            t = self._raw_ledger(first, as_of)
+            parts.append(
+                select(t.c.env_id, _cents(func.sum(t.c.amount)))
+                .where(*_ts_between(first, as_of, t.c.ts), *scope(t.c.env_id))
+                .group_by(t.c.env_id)
+            )
+        months = select(b.env_id, _cents(func.sum(b.balance))).where(
+            through(tuple_(b.year, b.month), period), *scope(b.env_id)
+        )
+        if latest is not None:
+            parts.append(
+                select(cp.env_id, _cents(cp.balance)).where(
+                    cp.year == latest.year,
+                    cp.month == latest.month,
+                    *scope(cp.env_id),
+                )
+            )
+            months = months.where(tuple_(b.year, b.month) > tuple(latest))
+        parts.append(months.group_by(b.env_id))
+
+        totals: dict[int, int] = {}
+        for part in parts:
+            for env_id, cents in self.db.execute(part):
+                totals[env_id] = totals.get(env_id, 0) + (cents or 0)
+
+        names = self.db.execute(
+            select(m.Envelope.id, m.Envelope.name)
+            .where(m.Envelope.id.in_(totals.keys()))
+            .order_by(m.Envelope.name)
+        )
+        return {name: from_cents(totals[env_id]) for env_id, name in names}
+
+    def rename_envelope(self, old: str, new: str) -> m.Envelope:
+        env = self.db.scalars(
+            select(m.Envelope).where(m.Envelope.name == old)
+        ).one_or_none()
+        if env is None:
+            raise ValueError(f"Envelope {old} does not exist")
+        env.name = new
+        self.db.flush()
+        self.envelopes.invalidate(old, new, db=self.db)
+        self.reports.stage_reset(self.db)
+        return env
+
+    # Helpers for adding transactions
     def _get_or_create_envelope(self, name: str) -> m.Envelope:
-        env = self.db.scalar(select(m.Envelope).where(m.Envelope.name == name).limit(1))
-        if not env:
-            env = m.Envelope(name=name, budget=Decimal("0"))
-            self.db.add(env)
-            self.db.flush()
+        env = self.db.get(m.Envelope, self._resolve_envelopes({name})[name])
+        assert env is not None
         return env
+
+    def _resolve_envelopes(self, names: set[str]) -> dict[str, int]:
+        # Map envelope names to ids. Names the cache misses are inserted in one
+        # batched INSERT .. ON CONFLICT DO NOTHING RETURNING, so a concurrent
+        # writer creating the same envelope never trips the unique index; only
+        # names that already existed need the follow-up SELECT
+        if not names:
+            return {}
+        found, missing = self.envelopes.lookup(self.db, names)
+        if not missing:
+            return found
+
+        envelopes: Table = m.Envelope.__table__  # type: ignore[assignment]
+        stmt = (
+            self._upsert(envelopes)
+            .on_conflict_do_nothing(index_elements=["name"])
+            .returning(envelopes.c.name, envelopes.c.id)
+        )
+        today = date.today()
+        loaded = dict(
+            self.db.execute(
+                stmt,
+                [
+                    {"name": n, "budget": Decimal("0"), "created_at": today}
+                    for n in sorted(missing)
+                ],
+            ).all()
+        )
+        if existing := missing - loaded.keys():
+            loaded.update(
+                self.db.execute(
+                    select(m.Envelope.name, m.Envelope.id).where(
+                        m.Envelope.name.in_(existing)
+                    )
+                ).all()
+            )
+        self.envelopes.stage(self.db, loaded)
+        found.update(loaded)
+        return found
+
+    def _balance_from_ledger(
+        self, as_of: date, envelope: str | None
+    ) -> dict[str, Decimal]:
+        # Reference answer for balance_as_of: every transaction up to as_of,
+        # with the summary rows standing in for months archived to files
+        archived = self._archived(date.min, as_of)
+        ledger = self._ledger(archived)
+        parts = [
+            select(m.Envelope.name, _cents(func.sum(ledger.c.amount)))
+            .join(ledger, ledger.c.env_id == m.Envelope.id)
+            .where(*_ts_between(date.min, as_of, ledger.c.ts))
+            .group_by(m.Envelope.name)
+        ]
+        files = [period for period, path in archived.items() if path]
+        if files:
+            period = (as_of.year, as_of.month)
+            if period in files and as_of.day != monthrange(*period)[1]:
+                raise _archived_to_file(period, archived[period])
+            b = m.EnvelopeMonthBalance
+            parts.append(
+                select(m.Envelope.name, _cents(func.sum(b.balance)))
+                .join(b, b.env_id == m.Envelope.id)
+                .where(tuple_(b.year, b.month).in_(files))
+                .group_by(m.Envelope.name)
+            )
+
+        totals: dict[str, int] = {}
+        for part in parts:
+            if envelope is not None:
+                part = part.where(m.Envelope.name == envelope)
+            for name, cents in self.db.execute(part):
+                totals[name] = totals.get(name, 0) + (cents or 0)
+        return {name: from_cents(cents) for name, cents in sorted(totals.items())}
+
+    def _archived(self, start: date, end: date) -> dict[tuple[int, int], str | None]:
+        # Archived months touched by [start, end], mapped to their file if any
+        a = m.ArchivedMonth
+        rows = self.db.execute(
+            select(a.year, a.month, a.path)
+            .where(
+                tuple_(a.year, a.month) >= (start.year, start.month),
+                tuple_(a.year, a.month) <= (end.year, end.month),
+            )
+            .order_by(a.year, a.month)
+        )
+        return {(year, month): path for year, month, path in rows}
+
+    def _ledger(self, archived: dict[tuple[int, int], str | None]) -> Any:
+        # Raw rows: transactions alone, or together with transactions_archive
+        # when the range reaches months archived to the table
+        t: Table = m.Transaction.__table__  # type: ignore[assignment]
+        if not any(path is None for path in archived.values()):
+            return t
+        a: Table = m.TransactionArchive.__table__  # type: ignore[assignment]
+        columns = ("id", "env_id", "type", "amount", "note", "ts")
+        return union_all(
+            select(*(t.c[c] for c in columns)), select(*(a.c[c] for c in columns))
+        ).subquery("ledger")
+
+    def _raw_ledger(self, start: date, end: date) -> Any:
+        # _ledger for a range that needs every raw row in it
+        archived = self._archived(start, end)
+        for period, path in archived.items():
+            if path is not None:
+                raise _archived_to_file(period, path)
+        return self._ledger(archived)
+
+    def _month_matches_ledger(self, ledger: Any, year: int, month: int) -> bool:
+        first = date(year, month, 1)
+        last = date(year, month, monthrange(year, month)[1])
+        raw = self.db.execute(
+            select(ledger.c.env_id, func.sum(ledger.c.amount))
+            .where(*_ts_between(first, last, ledger.c.ts))
+            .group_by(ledger.c.env_id)
+        ).all()
+        b = m.EnvelopeMonthBalance
+        summary = self.db.execute(
+            select(b.env_id, b.balance).where(
+                b.year == year, b.month == month, b.tx_count > 0
+            )
+        ).all()
+        return dict(raw) == dict(summary)
+
+    def _write_checkpoint(self, year: int, month: int) -> None:
+        # Checkpoint every envelope's cumulative balance at the end of a month:
+        # the nearest earlier checkpoint plus the months after it. Both parts
+        # are index ranges; (0, 0) stands in when there is no earlier one.
+        b = m.EnvelopeMonthBalance
+        cp = m.EnvelopeBalanceCheckpoint
+        period = (year, month)
+        last_year, last_month = self.db.execute(
+            select(cp.year, cp.month)
+            .where(tuple_(cp.year, cp.month) < period)
+            .order_by(cp.year.desc(), cp.month.desc())
+            .limit(1)
+        ).first() or (0, 0)
+        parts = union_all(
+            select(cp.env_id, cp.balance).where(
+                cp.year == last_year, cp.month == last_month
+            ),
+            select(b.env_id, b.balance).where(
+                tuple_(b.year, b.month) > (last_year, last_month),
+                tuple_(b.year, b.month) <= period,
+            ),
+        ).subquery()
+        checkpoints: Table = cp.__table__  # type: ignore[assignment]
+        self.db.execute(
+            insert(checkpoints).from_select(
+                ["env_id", "year", "month", "balance"],
+                select(
+                    parts.c.env_id,
+                    literal(year, Integer()),
+                    literal(month, Integer()),
+                    func.sum(parts.c.balance),
+                ).group_by(parts.c.env_id),
+            )
+        )
+
+    def _report_from_month_balances(
+        self, start: date, end: date, envelope: str | None = None
+    ) -> dict[str, Decimal]:
+        # O(envelopes x months) read of the snapshot table
+        b = m.EnvelopeMonthBalance
+        stmt = (
+            select(m.Envelope.name, func.sum(b.balance))
+            .join(b, b.env_id == m.Envelope.id)
+            .where(
+                tuple_(b.year, b.month) >= (start.year, start.month),
+                tuple_(b.year, b.month) <= (end.year, end.month),
+            )
+            .group_by(m.Envelope.name)
+            .having(func.sum(b.tx_count) > 0)
+            .order_by(m.Envelope.name)
+        )
+        if envelope is not None:
+            stmt = stmt.where(m.Envelope.name == envelope)
+        return {
+            name: balance or Decimal("0") for name, balance in self.db.execute(stmt)
+        }
+
+    def _apply_month_deltas(
+        self, deltas: dict[tuple[int, int, int], list[int]]
+    ) -> None:
+        # Fold (env_id, year, month) -> [cents, count] of inserted rows into
+        # envelope_month_balances with one upsert
+        if not deltas:
+            return
+        self.reports.stage_writes(self.db, {key[1:] for key in deltas})
+
+        stmt = _accumulate_balances(
+            self._upsert(m.EnvelopeMonthBalance.__table__)  # type: ignore[arg-type]
+        )
+        self.db.execute(
+            stmt,
+            [
+                {
+                    "env_id": env_id,
+                    "year": year,
+                    "month": month,
+                    "balance": from_cents(cents),
+                    "tx_count": count,
+                }
+                for (env_id, year, month), (cents, count) in deltas.items()
+            ],
+        )
+
+        # Backdated rows also shift every checkpoint taken after them; there
+        # are none to shift when every delta is later than the last closed month
+        latest = self.closed.latest(self.db)
+        if latest is None or latest < min(key[1:] for key in deltas):
+            return
+        cp: Table = m.EnvelopeBalanceCheckpoint.__table__  # type: ignore[assignment]
+        self.db.execute(
+            update(cp)
+            .where(
+                cp.c.env_id == bindparam("d_env_id"),
+                tuple_(cp.c.year, cp.c.month)
+                >= tuple_(bindparam("d_year"), bindparam("d_month")),
+            )
+            .values(balance=cp.c.balance + bindparam("d_amount")),
+            [
+                {
+                    "d_env_id": env_id,
+                    "d_year": year,
+                    "d_month": month,
+                    "d_amount": from_cents(cents),
+                }
+                for (env_id, year, month), (cents, _) in deltas.items()
+            ],
+        )
+
+    def _insert_new(self, stmt: Any, rows: list[dict[str, Any]]) -> int:
+        # Run an INSERT .. ON CONFLICT DO NOTHING into transactions and fold
+        # only the rows it inserted into the month balances
+        t = stmt.table
+        deltas: dict[tuple[int, int, int], list[int]] = {}
+        count = 0
+        for env_id, ts, cents in self.db.execute(
+            stmt.returning(t.c.env_id, t.c.ts, _cents(t.c.amount)), rows
+        ):
+            _add_delta(deltas, env_id, ts, cents)
+            count += 1
+        self._apply_month_deltas(deltas)
+        return count
+
+    def _stored_external_ids(self, ids: set[str]) -> set[str]:
+        # The ids already in the ledger, including rows archived to the table
+        if not ids:
+            return set()
+        t, a = m.Transaction, m.TransactionArchive
+        return set(
+            self.db.scalars(
+                union_all(
+                    select(t.external_id).where(t.external_id.in_(ids)),
+                    select(a.external_id).where(a.external_id.in_(ids)),
+                )
+            )
+        )
+
+    def _upsert(self, table: Table) -> Any:
+        # INSERT supporting ON CONFLICT for the dialects we run on
+        if self.db.get_bind().dialect.name == "postgresql":
+            return postgresql.insert(table)
+        return sqlite.insert(table)
+
+    def _transaction_rows(
+        self,
+        records: list[TransactionRecord],
+        env_ids: dict[str, int],
+        redirect_closed: bool = False,
+        kind: m.TransactionType | None = None,
+    ) -> tuple[list[dict[str, Any]], list[int]]:
+        # Insert parameters plus each row's amount in cents. Converting here
+        # rejects sub-cent amounts, which SQLite would otherwise store as is
+        now = datetime.now(timezone.utc)
+        cents = [to_cents(record[1]) for record in records]
+        rows: list[dict[str, Any]] = [
+            {
+                "env_id": env_ids[name],
+                "type": kind
+                or (m.TransactionType.INCOME if c > 0 else m.TransactionType.EXPENSE),
+                "amount": amount,
+                "note": note,
+                "ts": ts or now,
+                "external_id": external_id[0] if external_id else None,
+            }
+            for (name, amount, note, ts, *external_id), c in zip(records, cents)
+        ]
+
+        # Rows imported before are dropped first, so re-importing a statement
+        # that overlaps a closed month does not trip the guard below
+        stored = self._stored_external_ids(
+            {row["external_id"] for row in rows} - {None}
+        )
+        if stored:
+            kept = [
+                (row, c)
+                for row, c in zip(rows, cents)
+                if row["external_id"] not in stored
+            ]
+            rows, cents = [row for row, _ in kept], [c for _, c in kept]
+
+        # Closed months are immutable: reject the batch, or move rows to the
+        # start of the first open month after theirs
+        closed = self.closed.periods(self.db)
+        if closed:
+            for row in rows:
+                ts = row["ts"]
+                if (ts.year, ts.month) in closed:
+                    if not redirect_closed:
+                        raise ValueError(
+                            f"Month {ts.year}-{ts.month:02d} is closed; "
+                            "cannot add transactions to it"
+                        )
+                    row["ts"] = _first_open_month(ts, closed)
+        return rows, cents
+
+
+def _check_range(start: date, end: date) -> None:
+    if not isinstance(start, date) or not isinstance(end, date):
+        raise ValueError("Start and end must be date objects")
+    if start > end:
+        raise ValueError(f"Start date {start} cannot be after end date {end}")
+
+
+def _period_label(year: int, month: int, by: str) -> str:
+    if by == "year":
+        return f"{year}"
+    if by == "quarter":
+        return f"{year}-Q{(month - 1) // 3 + 1}"
+    return f"{year}-{month:02d}"
+
+
+def _period_labels(start: date, end: date, by: str) -> list[str]:
+    # Every period touched by [start, end] in order, including empty ones
+    labels: list[str] = []
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        label = _period_label(year, month, by)
+        if not labels or labels[-1] != label:
+            labels.append(label)
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return labels
+
+
+def _is_whole_months(start: date, end: date) -> bool:
+    return start.day == 1 and end.day == monthrange(end.year, end.month)[1]
+
+
+def _ledger_month_totals(ledger: Any = None) -> Select[Any]:
+    # Per envelope and month totals of the raw rows, leaving out months
+    # archived to files whose only record is their envelope_month_balances rows
+    t = ledger if ledger is not None else m.Transaction.__table__
+    year = extract("year", t.c.ts)
+    month = extract("month", t.c.ts)
+    return (
+        select(t.c.env_id, year, month, func.sum(t.c.amount), func.count())
+        .where(tuple_(year, month).not_in(_file_archived_months()))
+        .group_by(t.c.env_id, year, month)
+    )
+
+
+def _cents(amount: Any) -> Any:
+    # Money expression as integer cents, so results reach Python as ints
+    # rather than through the Decimal result processor
+    return cast(func.round(amount * 100), BigInteger)
+
+
+def _add_delta(
+    deltas: dict[tuple[int, int, int], list[int]], env_id: int, ts: datetime, cents: int
+) -> None:
+    key = (env_id, ts.year, ts.month)
+    delta = deltas.get(key)
+    if delta is None:
+        deltas[key] = [cents, 1]
+    else:
+        delta[0] += cents
+        delta[1] += 1
+
+
+def _month_deltas(
+    rows: list[dict[str, Any]], cents: list[int]
+) -> dict[tuple[int, int, int], list[int]]:
+    deltas: dict[tuple[int, int, int], list[int]] = {}
+    for row, c in zip(rows, cents):
+        _add_delta(deltas, row["env_id"], row["ts"], c)
+    return deltas
+
+
+def _file_archived_months() -> Select[int, int]:
+    a = m.ArchivedMonth
+    return select(a.year, a.month).where(a.path.is_not(None))
+
+
+def _accumulate_balances(stmt: Any) -> Any:
+    # ON CONFLICT clause that adds the inserted delta to an existing month
+    return stmt.on_conflict_do_update(
+        index_elements=["env_id", "year", "month"],
+        set_={
+            "balance": stmt.table.c.balance + stmt.excluded.balance,
+            "tx_count": stmt.table.c.tx_count + stmt.excluded.tx_count,
+        },
+    )
+
+
+def _archived_to_file(period: tuple[int, int], path: str | None) -> ValueError:
+    year, month = period
+    return ValueError(
+        f"Raw rows for {year}-{month:02d} were archived to {path}; "
+        "only whole months can be reported for it"
+    )
+
+
+def _first_open_month(ts: datetime, closed: frozenset[tuple[int, int]]) -> datetime:
+    year, month = ts.year, ts.month
+    while (year, month) in closed:
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return ts.replace(
+        year=year, month=month, day=1, hour=0, minute=0, second=0, microsecond=0
+    )
+
+
+def _ts_between(start: date, end: date, ts: Any = None) -> tuple[Any, Any]:
+    # Whole-day range: start at midnight up to, not including, the day after end
+    if ts is None:
+        ts = m.Transaction.ts
+    upper = (
+        datetime.max
+        if end == date.max
+        else datetime.combine(end + timedelta(days=1), datetime.min.time())
+    )
+    return (ts >= datetime.combine(start, datetime.min.time()), ts < upper)
@@ -0,0 +1,94 @@
+import threading
+import weakref
+
+from sqlalchemy import Engine, event, select
+from sqlalchemy.orm import Session
+
+from budgetwise_cli.domain import models as m
+
+_PENDING_KEY = "budgetwise.pending_closed_months"
+
+Period = tuple[int, int]
+
+_caches: "weakref.WeakKeyDictionary[Engine, ClosedPeriods]" = (
+    weakref.WeakKeyDictionary()
+)
+_caches_lock = threading.Lock()
+
+
+class ClosedPeriods:
+    # Closed (year, month) periods shared by every session bound to one engine,
+    # loaded with one query on first use. A month closed inside a session is
+    # closed for that session at once and for the others once it commits.
+    # Months closed by another process are only seen after clear().
+
+    def __init__(self) -> None:
+        self._periods: frozenset[Period] | None = None
+        self._latest: Period | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_bind(cls, bind: Engine) -> "ClosedPeriods":
+        with _caches_lock:
+            cache = _caches.get(bind)
+            if cache is None:
+                cache = _caches[bind] = cls()
+            return cache
+
+    def periods(self, db: Session) -> frozenset[Period]:
+        # Take this once per batch; membership tests on it are O(1)
+        if self._periods is None:
+            self.load(db)
+        assert self._periods is not None
+        pending: set[Period] | None = db.info.get(_PENDING_KEY)
+        return self._periods | pending if pending else self._periods
+
+    def latest(self, db: Session) -> Period | None:
+        # The most recent closed period, None when nothing is closed
+        if self._periods is None:
+            self.load(db)
+        pending: set[Period] | None = db.info.get(_PENDING_KEY)
+        candidates = [p for p in (self._latest, *(pending or ())) if p is not None]
+        return max(candidates, default=None)
+
+    def committed(self) -> frozenset[Period]:
+        # Periods known to be closed and committed, without querying
+        return self._periods or frozenset()
+
+    def load(self, db: Session) -> None:
+        closed = m.ClosedMonth.__table__.c
+        periods = frozenset(
+            (int(year), int(month))
+            for year, month in db.execute(select(closed.year, closed.month))
+        )
+        with self._lock:
+            self._periods = periods
+            self._latest = max(periods, default=None)
+
+    def stage(self, db: Session, period: Period) -> None:
+        pending = db.info.get(_PENDING_KEY)
+        if pending is None:
+            pending = db.info[_PENDING_KEY] = set()
+            event.listen(db, "after_commit", self._publish_pending)
+            event.listen(db, "after_soft_rollback", self._discard_pending)
+        pending.add(period)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._periods = None
+            self._latest = None
+
+    def _publish_pending(self, db: Session) -> None:
+        pending = db.info.get(_PENDING_KEY)
+        if not pending:
+            return
+        with self._lock:
+            if self._periods is not None:
+                self._periods = self._periods | pending
+                self._latest = max(self._periods)
+        pending.clear()
+
+    def _discard_pending(self, db: Session, previous_transaction: object) -> None:
+        pending = db.info.get(_PENDING_KEY)
+        if pending and not db.in_transaction():
+            pending.clear()
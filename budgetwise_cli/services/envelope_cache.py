@@ -0,0 +1,129 @@
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Iterable
+
+from sqlalchemy import Engine, event, select
+from sqlalchemy.orm import Session
+
+from budgetwise_cli.domain import models as m
+
+DEFAULT_MAX_SIZE = 1024
+
+_PENDING_KEY = "budgetwise.pending_envelopes"
+
+_caches: "weakref.WeakKeyDictionary[Engine, EnvelopeCache]" = (
+    weakref.WeakKeyDictionary()
+)
+_caches_lock = threading.Lock()
+
+
+class EnvelopeCache:
+    # Bounded name -> id map shared by every session bound to one engine.
+    # Ids of envelopes created inside a session only become visible to other
+    # sessions once that session commits, so a rollback never leaks an id.
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE) -> None:
+        if max_size <= 0:
+            raise ValueError("Cache size must be positive")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._ids: OrderedDict[str, int] = OrderedDict()
+        self._warm = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_bind(cls, bind: Engine) -> "EnvelopeCache":
+        with _caches_lock:
+            cache = _caches.get(bind)
+            if cache is None:
+                cache = _caches[bind] = cls()
+            return cache
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._ids),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def warm(self, db: Session) -> None:
+        # Load up to max_size envelopes in one query
+        rows = db.execute(
+            select(m.Envelope.name, m.Envelope.id)
+            .order_by(m.Envelope.id)
+            .limit(self.max_size)
+        ).all()
+        with self._lock:
+            for name, env_id in rows:
+                self._store(name, env_id)
+            self._warm = True
+
+    def lookup(
+        self, db: Session, names: Iterable[str]
+    ) -> tuple[dict[str, int], set[str]]:
+        # Split names into cached ids and the names that still need a query
+        if not self._warm:
+            self.warm(db)
+        pending: dict[str, int] = db.info.get(_PENDING_KEY, {})
+        found: dict[str, int] = {}
+        missing: set[str] = set()
+        with self._lock:
+            for name in names:
+                env_id = pending.get(name, self._ids.get(name))
+                if env_id is None:
+                    self.misses += 1
+                    missing.add(name)
+                else:
+                    self.hits += 1
+                    found[name] = env_id
+                    if name in self._ids:
+                        self._ids.move_to_end(name)
+        return found, missing
+
+    def remember(self, ids: dict[str, int]) -> None:
+        # Record ids of envelopes that are already committed
+        with self._lock:
+            for name, env_id in ids.items():
+                self._store(name, env_id)
+
+    def stage(self, db: Session, ids: dict[str, int]) -> None:
+        # Record ids seen inside an open transaction; published on commit
+        pending = db.info.get(_PENDING_KEY)
+        if pending is None:
+            pending = db.info[_PENDING_KEY] = {}
+            event.listen(db, "after_commit", self._publish_pending)
+            event.listen(db, "after_soft_rollback", self._discard_pending)
+        pending.update(ids)
+
+    def invalidate(self, *names: str, db: Session | None = None) -> None:
+        pending = db.info.get(_PENDING_KEY, {}) if db is not None else {}
+        with self._lock:
+            for name in names:
+                self._ids.pop(name, None)
+                pending.pop(name, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ids.clear()
+            self._warm = False
+
+    def _store(self, name: str, env_id: int) -> None:
+        self._ids[name] = env_id
+        self._ids.move_to_end(name)
+        while len(self._ids) > self.max_size:
+            self._ids.popitem(last=False)
+
+    def _publish_pending(self, db: Session) -> None:
+        pending = db.info.get(_PENDING_KEY)
+        if pending:
+            self.remember(pending)
+            pending.clear()
+
+    def _discard_pending(self, db: Session, previous_transaction: object) -> None:
+        pending = db.info.get(_PENDING_KEY)
+        if pending:
+            pending.clear()
@@ -0,0 +1,44 @@
+from calendar import monthrange
+from datetime import date, timedelta
+from typing import Iterator
+
+# rule -> (unit, step); month steps keep the start date's day of month,
+# clamped to shorter months (Jan 31, Feb 29, Mar 31, ...)
+RULES: dict[str, tuple[str, int]] = {
+    "daily": ("day", 1),
+    "weekly": ("day", 7),
+    "biweekly": ("day", 14),
+    "monthly": ("month", 1),
+    "quarterly": ("month", 3),
+    "yearly": ("month", 12),
+}
+
+
+def check_rule(rule: str) -> str:
+    if rule not in RULES:
+        raise ValueError(f"Rule must be one of {', '.join(RULES)}")
+    return rule
+
+
+def occurrences(
+    rule: str, start: date, through: date, end: date | None = None
+) -> Iterator[date]:
+    # Every occurrence from start up to and including through (and end)
+    unit, step = RULES[check_rule(rule)]
+    last = through if end is None else min(through, end)
+    if unit == "day":
+        day, delta = start, timedelta(days=step)
+        while day <= last:
+            yield day
+            day += delta
+        return
+
+    months = start.year * 12 + start.month - 1
+    while True:
+        year, month = divmod(months, 12)
+        month += 1
+        day = date(year, month, min(start.day, monthrange(year, month)[1]))
+        if day > last:
+            return
+        yield day
+        months += step
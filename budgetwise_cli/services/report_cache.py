@@ -0,0 +1,167 @@
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from datetime import date
+from decimal import Decimal
+from typing import Iterable
+
+from sqlalchemy import Engine, event
+from sqlalchemy.orm import Session
+
+from budgetwise_cli.services.closed_periods import ClosedPeriods, Period
+
+DEFAULT_MAX_SIZE = 256
+
+# Seconds an entry touching an open month is served before it is recomputed,
+# bounding how long writes made by other processes stay invisible
+OPEN_ENTRY_TTL = 30.0
+
+_WRITES_KEY = "budgetwise.report_writes"
+_LISTENING_KEY = "budgetwise.report_cache_listening"
+
+# (start, end, envelope filter or None)
+ReportKey = tuple[date, date, str | None]
+
+_caches: "weakref.WeakKeyDictionary[Engine, ReportCache]" = weakref.WeakKeyDictionary()
+_caches_lock = threading.Lock()
+
+
+class _PendingWrites:
+    # What one session changed, applied to the shared cache on commit
+    def __init__(self) -> None:
+        self.periods: set[Period] = set()
+        self.reset = False
+
+
+class ReportCache:
+    # report() results shared by every session bound to one engine.
+    # Entries that lie entirely inside closed months never change and are only
+    # evicted by size; entries touching an open month are dropped whenever a
+    # session that wrote to the ledger commits, and expire after open_ttl.
+    # A session with uncommitted writes bypasses the cache in both directions.
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_MAX_SIZE,
+        open_ttl: float = OPEN_ENTRY_TTL,
+        closed: ClosedPeriods | None = None,
+    ) -> None:
+        if max_size <= 0:
+            raise ValueError("Cache size must be positive")
+        self.closed = closed or ClosedPeriods()
+        self.max_size = max_size
+        self.open_ttl = open_ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._closed_entries: OrderedDict[ReportKey, dict[str, Decimal]] = OrderedDict()
+        self._open_entries: OrderedDict[ReportKey, tuple[float, dict[str, Decimal]]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_bind(cls, bind: Engine) -> "ReportCache":
+        with _caches_lock:
+            cache = _caches.get(bind)
+            if cache is None:
+                cache = _caches[bind] = cls(closed=ClosedPeriods.for_bind(bind))
+            return cache
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "closed_entries": len(self._closed_entries),
+                "open_entries": len(self._open_entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+    def get(self, db: Session, key: ReportKey) -> dict[str, Decimal] | None:
+        if _WRITES_KEY in db.info:
+            return None
+        with self._lock:
+            value = self._closed_entries.get(key)
+            if value is not None:
+                self._closed_entries.move_to_end(key)
+            else:
+                entry = self._open_entries.get(key)
+                if entry is not None and entry[0] > time.monotonic():
+                    value = entry[1]
+                    self._open_entries.move_to_end(key)
+                elif entry is not None:
+                    del self._open_entries[key]
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return dict(value)
+
+    def put(self, db: Session, key: ReportKey, value: dict[str, Decimal]) -> None:
+        if _WRITES_KEY in db.info:
+            return
+        closed = self._is_closed(db, key[0], key[1])
+        with self._lock:
+            if closed:
+                self._closed_entries[key] = dict(value)
+                self._closed_entries.move_to_end(key)
+                while len(self._closed_entries) > self.max_size:
+                    self._closed_entries.popitem(last=False)
+            else:
+                expires = time.monotonic() + self.open_ttl
+                self._open_entries[key] = (expires, dict(value))
+                self._open_entries.move_to_end(key)
+                while len(self._open_entries) > self.max_size:
+                    self._open_entries.popitem(last=False)
+
+    def stage_writes(self, db: Session, periods: Iterable[Period]) -> None:
+        # Ledger rows were written for these (year, month) periods
+        self._pending(db).periods.update(periods)
+
+    def stage_reset(self, db: Session) -> None:
+        # Drop every entry on commit, e.g. after a rebuild or a rename
+        self._pending(db).reset = True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._closed_entries.clear()
+            self._open_entries.clear()
+
+    def _is_closed(self, db: Session, start: date, end: date) -> bool:
+        closed = self.closed.periods(db)
+        year, month = start.year, start.month
+        while (year, month) <= (end.year, end.month):
+            if (year, month) not in closed:
+                return False
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return True
+
+    def _pending(self, db: Session) -> _PendingWrites:
+        pending: _PendingWrites | None = db.info.get(_WRITES_KEY)
+        if pending is None:
+            pending = db.info[_WRITES_KEY] = _PendingWrites()
+        if not db.info.get(_LISTENING_KEY):
+            db.info[_LISTENING_KEY] = True
+            event.listen(db, "after_commit", self._publish_pending)
+            event.listen(db, "after_soft_rollback", self._discard_pending)
+        return pending
+
+    def _publish_pending(self, db: Session) -> None:
+        pending: _PendingWrites | None = db.info.pop(_WRITES_KEY, None)
+        if pending is None:
+            return
+        with self._lock:
+            self.invalidations += 1
+            self._open_entries.clear()
+            # Only close-month itself can still write into a closed month
+            if pending.reset or pending.periods & self.closed.committed():
+                self._closed_entries.clear()
+
+    def _discard_pending(self, db: Session, previous_transaction: object) -> None:
+        if db.in_transaction():
+            # Only a savepoint rolled back; the outer writes are still pending
+            return
+        db.info.pop(_WRITES_KEY, None)
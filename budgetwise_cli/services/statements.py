@@ -0,0 +1,259 @@
+import csv
+import hashlib
+import json
+import re
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import IO, Any, Iterable, Iterator, NamedTuple, Sequence
+
+from budgetwise_cli.domain.money import to_cents
+
+# Column aliases accepted in CSV headers (compared case-insensitively)
+_CSV_COLUMNS = {
+    "envelope": ("envelope", "category"),
+    "amount": ("amount",),
+    "note": ("note", "description", "memo", "payee"),
+    "ts": ("ts", "date", "posted"),
+    "external_id": ("external_id", "fitid", "transaction_id"),
+}
+
+_OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<\r\n]*)")
+
+NOTE_MAX_LENGTH = 128
+
+IMPORT_BATCH_SIZE = 5000
+
+EXPORT_CHUNK_SIZE = 10000
+
+# Export columns; a CSV or JSONL export can be fed back to `import`
+EXPORT_COLUMNS = ("id", "ts", "envelope", "type", "amount", "note")
+
+
+class StatementRow(NamedTuple):
+    envelope: str
+    amount: Decimal
+    note: str
+    ts: datetime
+    # The bank's id for the row (OFX FITID), or a content hash; see with_content_ids
+    external_id: str | None = None
+
+
+FORMATS = ("csv", "ofx", "jsonl")
+
+
+def detect_format(path: Path) -> str:
+    suffix = path.suffix.lower().lstrip(".")
+    if suffix in ("qfx", "ofx"):
+        return "ofx"
+    if suffix in ("jsonl", "ndjson"):
+        return "jsonl"
+    if suffix == "csv":
+        return "csv"
+    raise ValueError(f"Cannot detect statement format of {path.name}, use --format")
+
+
+def read_statement(
+    path: Path, fmt: str | None = None, default_envelope: str = "Imported"
+) -> Iterator[StatementRow]:
+    # Stream rows from a bank statement without loading the whole file
+    fmt = fmt or detect_format(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format {fmt}, expected one of {FORMATS}")
+
+    with path.open(newline="", encoding="utf-8-sig") as fh:
+        if fmt == "csv":
+            yield from _read_csv(fh, default_envelope)
+        elif fmt == "ofx":
+            yield from _read_ofx(fh, default_envelope)
+        else:
+            yield from _read_jsonl(fh, default_envelope)
+
+
+def write_statement(rows: Iterable[Sequence[Any]], fh: IO[str], fmt: str) -> int:
+    # Write (id, envelope, type, amount, note, ts) rows, returns the row count
+    if fmt not in ("csv", "jsonl"):
+        raise ValueError(f"Unsupported export format {fmt}, expected csv or jsonl")
+
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(fh)
+        writer.writerow(EXPORT_COLUMNS)
+        for tx_id, envelope, tx_type, amount, note, ts in rows:
+            writer.writerow(
+                (
+                    tx_id,
+                    ts.isoformat(),
+                    envelope,
+                    getattr(tx_type, "value", tx_type),
+                    amount,
+                    note or "",
+                )
+            )
+            count += 1
+        return count
+
+    for tx_id, envelope, tx_type, amount, note, ts in rows:
+        fh.write(
+            json.dumps(
+                {
+                    "id": tx_id,
+                    "ts": ts.isoformat(),
+                    "envelope": envelope,
+                    "type": getattr(tx_type, "value", tx_type),
+                    "amount": str(amount),
+                    "note": note or "",
+                }
+            )
+        )
+        fh.write("\n")
+        count += 1
+    return count
+
+
+def parse_amount(raw: str) -> Decimal:
+    try:
+        return Decimal(raw.strip().replace(",", "").replace("$", ""))
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount: {raw!r}") from None
+
+
+def parse_timestamp(raw: str) -> datetime:
+    raw = raw.strip()
+    try:
+        return datetime.fromisoformat(raw)
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(raw, "%m/%d/%Y")
+    except ValueError:
+        raise ValueError(f"Invalid date: {raw!r}") from None
+
+
+def with_content_ids(rows: Iterable[StatementRow]) -> Iterator[StatementRow]:
+    # Give rows without a bank id a hash of their content, so re-running an
+    # import or importing overlapping statements skips rows already stored.
+    # Identical rows in one file are told apart by how many came before them.
+    seen: dict[bytes, int] = {}
+    for row in rows:
+        if row.external_id is not None:
+            yield row
+            continue
+        content = "\x1f".join(
+            (row.envelope, str(to_cents(row.amount)), row.ts.isoformat(), row.note)
+        )
+        key = hashlib.blake2b(content.encode(), digest_size=16).digest()
+        n = seen.get(key, 0)
+        seen[key] = n + 1
+        yield row._replace(external_id=f"{key.hex()}:{n}")
+
+
+def _row(
+    envelope: str,
+    amount: Decimal,
+    note: str,
+    ts: datetime,
+    external_id: str | None = None,
+) -> StatementRow:
+    return StatementRow(envelope, amount, note[:NOTE_MAX_LENGTH], ts, external_id)
+
+
+def _read_csv(fh: IO[str], default_envelope: str) -> Iterator[StatementRow]:
+    reader = csv.reader(fh)
+    header = [h.strip().lower() for h in next(reader, [])]
+
+    columns: dict[str, int] = {}
+    for field, aliases in _CSV_COLUMNS.items():
+        for alias in aliases:
+            if alias in header:
+                columns[field] = header.index(alias)
+                break
+    missing = {"amount", "ts"} - columns.keys()
+    if missing:
+        raise ValueError(
+            f"CSV header is missing column(s): {', '.join(sorted(missing))}"
+        )
+
+    env_col = columns.get("envelope")
+    note_col = columns.get("note")
+    id_col = columns.get("external_id")
+    for line_no, record in enumerate(reader, start=2):
+        if not record:
+            continue
+        try:
+            envelope = record[env_col].strip() if env_col is not None else ""
+            note = record[note_col].strip() if note_col is not None else ""
+            external_id = record[id_col].strip() if id_col is not None else ""
+            yield _row(
+                envelope or default_envelope,
+                parse_amount(record[columns["amount"]]),
+                note,
+                parse_timestamp(record[columns["ts"]]),
+                external_id or None,
+            )
+        except (IndexError, ValueError) as e:
+            raise ValueError(f"line {line_no}: {e}") from None
+
+
+def _parse_ofx_date(raw: str) -> datetime:
+    # OFX dates look like 20240105120000.000[-5:EST]; only the digits matter
+    digits = re.match(r"\d+", raw.strip())
+    if not digits or len(digits.group()) < 8:
+        raise ValueError(f"Invalid OFX date: {raw!r}")
+    value = digits.group()
+    return datetime.strptime(value[:14].ljust(14, "0"), "%Y%m%d%H%M%S")
+
+
+def _read_ofx(fh: IO[str], default_envelope: str) -> Iterator[StatementRow]:
+    current: dict[str, str] | None = None
+    account = ""
+    for line in fh:
+        for closing, tag, value in _OFX_TAG.findall(line):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if not closing:
+                    current = {}
+                    continue
+                if current is not None:
+                    yield _ofx_row(current, default_envelope, account)
+                current = None
+            elif current is not None and not closing:
+                current[tag] = value.strip()
+            elif tag == "ACCTID" and not closing:
+                account = value.strip()
+
+
+def _ofx_row(
+    fields: dict[str, str], default_envelope: str, account: str = ""
+) -> StatementRow:
+    # A FITID is only unique within its account, so it is stored under the
+    # statement's ACCTID, or the envelope when the statement has none
+    try:
+        note = fields.get("NAME") or fields.get("MEMO") or ""
+        fitid = fields.get("FITID")
+        return _row(
+            default_envelope,
+            parse_amount(fields["TRNAMT"]),
+            note,
+            _parse_ofx_date(fields["DTPOSTED"]),
+            f"{account or default_envelope}:{fitid}" if fitid else None,
+        )
+    except KeyError as e:
+        raise ValueError(f"OFX transaction is missing {e.args[0]}") from None
+
+
+def _read_jsonl(fh: IO[str], default_envelope: str) -> Iterator[StatementRow]:
+    for line_no, line in enumerate(fh, start=1):
+        if not line.strip():
+            continue
+        try:
+            obj = json.loads(line)
+            yield _row(
+                obj.get("envelope") or default_envelope,
+                parse_amount(str(obj["amount"])),
+                obj.get("note") or "",
+                parse_timestamp(obj.get("ts") or obj["date"]),
+                str(obj["external_id"]) if obj.get("external_id") else None,
+            )
+        except (KeyError, ValueError) as e:
+            raise ValueError(f"line {line_no}: {e}") from None
@@ -129,24 +129,8 @@ def run_command(cmd: str) -> subprocess.CompletedProcess[bytes]:
 
 
 def interactive_shell() -> None:
-    print("Welcome to BudgetWise Interactive Shell!")
-    print("Type 'exit' to quit, 'help' for available commands.")
-
-    while True:
-        try:
-            cmd = input("\nbudgetwise> ")
-            cmd = cmd.strip()
-
-            if cmd.lower() == "exit":
-                break
-            elif cmd.lower() == "help":
-                run_command("--help")
-            elif cmd:
-                run_command(cmd)
-        except KeyboardInterrupt:
-            print("\nUse 'exit' to quit")
-        except Exception as e:
-            print(f"Error: {e}")
+    # One container exec for the whole session; commands run in-process there
+    run_command("shell")
 
 
 if __name__ == "__main__":
@@ -14,11 +14,13 @@ setup(
         "rich>=13.7",
     ],
     extras_require={
+        # Vectorized queries for `analytics`, which works without it too
+        "analytics": ["numpy>=1.24"],
         "dev": [
             "pytest>=8.2",
             "black",
             "ruff",
             "mypy",
-        ]
+        ],
     },
 )
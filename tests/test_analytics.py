@@ -0,0 +1,179 @@
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from sqlalchemy import case, create_engine, delete, select, update
+from sqlalchemy.orm import Session
+
+from budgetwise_cli.domain import models as m
+from budgetwise_cli.domain.models import Base
+from budgetwise_cli.services import analytics
+from budgetwise_cli.services.analytics import AnalyticsEngine
+from budgetwise_cli.services.budget_service import BudgetService
+
+BACKENDS = [
+    "python",
+    pytest.param(
+        "numpy",
+        marks=pytest.mark.skipif(analytics.np is None, reason="numpy not installed"),
+    ),
+]
+
+WHOLE_LEDGER = (date(2023, 1, 1), date(2024, 12, 31))
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    if request.param == "python":
+        monkeypatch.setattr(analytics, "np", None)
+    return str(request.param)
+
+
+@pytest.fixture
+def ledger(tmp_path: Path) -> Iterator[Session]:
+    # A file database, so the column cache has a stable identity
+    engine = create_engine(f"sqlite:///{tmp_path / 'ledger.db'}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        service = BudgetService(db)
+        records = [
+            (name, Decimal(amount), note, datetime(2024, month, day, 9))
+            for month in (1, 2, 3, 4)
+            for name, amount, note, day in (
+                ("Salary", "1500.00", "pay", 1),
+                ("Rent", "-700.00", "rent", 2),
+                ("Food", "-33.33", "shop", 9),
+                ("Food", "-12.01", "cafe", 20 + month),
+                ("Food", "4.50", "refund", 28),
+            )
+        ]
+        service.add_transactions(records)
+        service.add_transaction("Idle", Decimal("10.00"), "", datetime(2024, 3, 31))
+        service.add_transactions(
+            [
+                ("Food", Decimal("-900.00"), "transfer to Rent", datetime(2024, 3, 5)),
+                ("Rent", Decimal("900.00"), "transfer from Food", datetime(2024, 3, 5)),
+            ],
+            kind=m.TransactionType.MOVE,
+        )
+        db.commit()
+        service.close_month(2024, 1)
+        service.close_month(2024, 2)
+        db.commit()
+        yield db
+    engine.dispose()
+
+
+# test every query matches the SQL service exactly
+def test_matches_budget_service(backend: str, ledger: Session) -> None:
+    service = BudgetService(ledger)
+    engine = AnalyticsEngine(ledger)
+
+    for start, end in [
+        WHOLE_LEDGER,
+        (date(2024, 2, 1), date(2024, 2, 29)),
+        (date(2024, 1, 5), date(2024, 3, 21)),
+        (date(2024, 6, 1), date(2024, 6, 30)),
+    ]:
+        assert engine.report(start, end) == service.report(start, end)
+        assert engine.report(start, end, "Food") == service.report(start, end, "Food")
+    assert engine.report(*WHOLE_LEDGER, "Nope") == {}
+
+    for by in ("month", "quarter", "year"):
+        for running in (False, True):
+            assert engine.pivot_report(
+                date(2023, 12, 1), date(2024, 4, 30), by, running
+            ) == service.pivot_report(date(2023, 12, 1), date(2024, 4, 30), by, running)
+
+    days = engine.running_balance(date(2024, 2, 1), date(2024, 2, 29), "Food")
+    # The opening leg of January's close, then the month's own rows
+    assert [d for d, _ in days][:4] == [date(2024, 2, d) for d in (1, 9, 22, 28)]
+    for day, balance in days:
+        assert balance == service.balance_as_of(day, "Food")["Food"]
+    total = engine.running_balance(date(2024, 3, 1), date(2024, 3, 31))
+    assert total[-1][1] == sum(service.balance_as_of(date(2024, 3, 31)).values())
+
+    # Spending leaves out refunds, transfers and close-month legs, like variance()
+    spent = service.variance(*WHOLE_LEDGER, sort="spent")
+    assert engine.top_spending(2, *WHOLE_LEDGER) == [
+        (row.envelope, row.spent) for row in spent[:2]
+    ]
+
+
+# test the cache file is reused and refreshed incrementally by max id
+def test_cache_refresh(backend: str, ledger: Session, tmp_path: Path) -> None:
+    service = BudgetService(ledger)
+    cache = tmp_path / "ledger.cols"
+    first = AnalyticsEngine(ledger, cache)
+    loaded = first.refresh()
+    assert loaded == first.rows > 0
+
+    service.add_transaction("Food", Decimal("-1.25"), "", datetime(2024, 4, 30))
+    ledger.commit()
+    reopened = AnalyticsEngine(ledger, cache)
+    assert reopened.refresh() == 1
+    assert reopened.rows == loaded + 1
+    assert reopened.report(*WHOLE_LEDGER) == service.report(*WHOLE_LEDGER)
+    assert AnalyticsEngine(ledger, cache).refresh() == 0
+
+    # Removing a row below the cached max id forces a full reload
+    ledger.execute(delete(m.Transaction).where(m.Transaction.id == 1))
+    service.rebuild_month_balances()
+    ledger.commit()
+    engine = AnalyticsEngine(ledger, cache)
+    assert engine.refresh() == loaded
+    assert engine.report(*WHOLE_LEDGER) == service.report(*WHOLE_LEDGER)
+
+
+# test edits that keep the row count and cents total still force a reload
+def test_cache_refresh_detects_edits(
+    backend: str, ledger: Session, tmp_path: Path
+) -> None:
+    service = BudgetService(ledger)
+    cache = tmp_path / "ledger.cols"
+    loaded = AnalyticsEngine(ledger, cache).refresh()
+    t = m.Transaction
+    food, rent = ledger.scalars(select(t).where(t.id.in_([3, 2])).order_by(t.id.desc()))
+    by_name = {e.name: e.id for e in ledger.scalars(select(m.Envelope))}
+
+    for edit in (
+        # amounts swapped between two rows
+        lambda: ledger.execute(
+            update(t)
+            .where(t.id.in_([food.id, rent.id]))
+            .values(amount=case((t.id == food.id, rent.amount), else_=food.amount))
+        ),
+        # a row moved to another envelope
+        lambda: ledger.execute(
+            update(t).where(t.id == food.id).values(env_id=by_name["Idle"])
+        ),
+        # a row moved to another day
+        lambda: ledger.execute(
+            update(t).where(t.id == food.id).values(ts=datetime(2024, 1, 3, 9))
+        ),
+    ):
+        edit()
+        service.rebuild_month_balances()
+        ledger.commit()
+        engine = AnalyticsEngine(ledger, cache)
+        assert engine.refresh() == loaded
+        assert engine.report(*WHOLE_LEDGER) == service.report(*WHOLE_LEDGER)
+
+
+# test months archived to files count as whole months only, as in report()
+def test_file_archived_months(backend: str, ledger: Session, tmp_path: Path) -> None:
+    service = BudgetService(ledger)
+    service.archive_months(date(2024, 2, 1), directory=tmp_path)
+    ledger.commit()
+    engine = AnalyticsEngine(ledger)
+
+    assert engine.report(*WHOLE_LEDGER) == service.report(*WHOLE_LEDGER)
+    assert engine.pivot_report(*WHOLE_LEDGER, by="quarter") == service.pivot_report(
+        *WHOLE_LEDGER, by="quarter"
+    )
+    with pytest.raises(ValueError, match="archived to"):
+        engine.report(date(2024, 1, 10), date(2024, 2, 10))
+    with pytest.raises(ValueError, match="archived to"):
+        engine.top_spending(3, *WHOLE_LEDGER)
@@ -1,10 +1,14 @@
+import gzip
 import pytest
 from datetime import date, datetime, timezone
 from decimal import Decimal
+from pathlib import Path
+from sqlalchemy import delete, event, select
 from sqlalchemy.orm import Session
 
 from budgetwise_cli.domain import models as m
 from budgetwise_cli.services.budget_service import BudgetService
+from budgetwise_cli.services.statements import StatementRow
 
 
 # test adding an expense to an envelope
@@ -38,7 +42,7 @@ def test_move_between_envelopes(budget_service: BudgetService, db: Session) -> N
         db.query(m.Transaction)
         .filter(
             m.Transaction.envelope.has(m.Envelope.name == "Groceries"),
-            m.Transaction.type == m.TransactionType.EXPENSE,
+            m.Transaction.type == m.TransactionType.MOVE,
         )
         .one()
     )
@@ -47,7 +51,7 @@ def test_move_between_envelopes(budget_service: BudgetService, db: Session) -> N
         db.query(m.Transaction)
         .filter(
             m.Transaction.envelope.has(m.Envelope.name == "Salary"),
-            m.Transaction.type == m.TransactionType.INCOME,
+            m.Transaction.type == m.TransactionType.MOVE,
         )
         .one()
     )
@@ -172,3 +176,755 @@ def test_create_new_envelope(budget_service: BudgetService, db: Session) -> None
 
     assert env.name == "New Category"
     assert env.budget == Decimal("0")
+
+
+# test bulk importing statement rows across several batches
+def test_import_transactions(budget_service: BudgetService, db: Session) -> None:
+    rows = [
+        StatementRow(
+            "Groceries" if i % 2 else "Salary",
+            Decimal("-1.25") if i % 2 else Decimal("10.00"),
+            f"row {i}",
+            datetime(2024, 6, 1 + i % 28),
+        )
+        for i in range(25)
+    ]
+    imported = budget_service.import_transactions(rows, batch_size=10)
+    db.commit()
+
+    assert imported == (25, 0)
+    assert db.query(m.Envelope).count() == 2
+    report = budget_service.report(date(2024, 6, 1), date(2024, 6, 30))
+    assert report["Groceries"] == Decimal("-15.00")
+    assert report["Salary"] == Decimal("130.00")
+
+
+def test_import_reuses_existing_envelopes(
+    budget_service: BudgetService, db: Session
+) -> None:
+    budget_service.add_transaction("Rent", Decimal("-500.00"))
+    budget_service.import_transactions(
+        [StatementRow("Rent", Decimal("-500.00"), "", datetime(2024, 6, 1))]
+    )
+    db.commit()
+
+    assert db.query(m.Envelope).filter_by(name="Rent").count() == 1
+    assert db.query(m.Transaction).count() == 2
+
+
+# test re-imports and retried adds skip rows whose external id is stored
+def test_external_id_dedup(budget_service: BudgetService, db: Session) -> None:
+    rows = [
+        StatementRow("Food", Decimal("-4.50"), "cafe", datetime(2024, 6, d), f"b{d}")
+        for d in range(1, 11)
+    ]
+    assert budget_service.import_transactions(rows[:6], batch_size=4) == (6, 0)
+    # An overlapping statement, with a repeated row inside one batch
+    overlap = rows[3:] + [rows[9]]
+    assert budget_service.import_transactions(overlap, batch_size=4) == (4, 4)
+    db.commit()
+
+    june = (date(2024, 6, 1), date(2024, 6, 30))
+    assert budget_service.report(*june) == {"Food": Decimal("-45.00")}
+    assert budget_service.verify_month_balances() == []
+
+    first = budget_service.add_transaction("Food", Decimal("-1.00"), "", None, "k1")
+    again = budget_service.add_transaction("Food", Decimal("-1.00"), "", None, "k1")
+    assert again.id == first.id
+    added = budget_service.add_transactions(
+        [
+            ("Food", Decimal("-2.00"), "", None, "k1"),
+            ("Food", Decimal("-2.00"), "", None),
+        ]
+    )
+    assert [tx.external_id for tx in added] == [None]
+    db.commit()
+    assert db.query(m.Transaction).count() == 12
+    assert budget_service.verify_month_balances() == []
+
+
+# test stored ids are skipped before the closed-month check, also once archived
+def test_external_id_dedup_closed_months(
+    budget_service: BudgetService, db: Session
+) -> None:
+    jan = [
+        StatementRow("Food", Decimal("-3.00"), "", datetime(2024, 1, d), f"j{d}")
+        for d in (5, 6)
+    ]
+    budget_service.import_transactions(jan)
+    budget_service.close_month(2024, 1)
+    db.commit()
+
+    feb = StatementRow("Food", Decimal("-1.00"), "", datetime(2024, 2, 2), "f2")
+    assert budget_service.import_transactions(jan + [feb]) == (1, 2)
+    db.commit()
+    with pytest.raises(ValueError, match="Month 2024-01 is closed"):
+        budget_service.import_transactions([jan[0]._replace(external_id="j7")])
+    db.rollback()
+
+    budget_service.archive_months(date(2024, 2, 1))
+    db.commit()
+    archived = [
+        external_id
+        for external_id in db.scalars(select(m.TransactionArchive.external_id))
+        if external_id is not None
+    ]
+    assert sorted(archived) == ["j5", "j6"]
+    stored = budget_service.add_transaction("Food", Decimal("-3.00"), "", None, "j5")
+    assert isinstance(stored, m.TransactionArchive)
+    assert stored.envelope.name == "Food"
+    assert budget_service.import_transactions(jan, redirect_closed=True) == (0, 2)
+    db.commit()
+    assert db.query(m.Transaction).filter_by(note="").count() == 1
+    assert budget_service.verify_month_balances() == []
+
+
+# test batch inserting transactions with a single bulk statement
+def test_add_transactions_batch(budget_service: BudgetService, db: Session) -> None:
+    ts = datetime(2024, 7, 1)
+    txs = budget_service.add_transactions(
+        [
+            ("Groceries", Decimal("-12.50"), "Market", ts),
+            ("Salary", Decimal("900.00"), "Pay", ts),
+            ("Groceries", Decimal("-7.50"), "Bakery", None),
+        ]
+    )
+    db.commit()
+
+    assert [tx.note for tx in txs] == ["Market", "Pay", "Bakery"]
+    assert [tx.type for tx in txs] == [
+        m.TransactionType.EXPENSE,
+        m.TransactionType.INCOME,
+        m.TransactionType.EXPENSE,
+    ]
+    assert txs[0].envelope is txs[2].envelope
+    assert db.query(m.Envelope).count() == 2
+    assert budget_service.add_transactions([]) == []
+
+
+# test envelope ids are served from the cache after the first lookup
+def test_envelope_cache_hits(budget_service: BudgetService, db: Session) -> None:
+    budget_service.add_transaction("Groceries", Decimal("-1.00"))
+    db.commit()
+    before = budget_service.envelopes.stats()
+
+    budget_service.add_transaction("Groceries", Decimal("-2.00"))
+    budget_service.move("Groceries", "Groceries", Decimal("1.00"))
+
+    after = budget_service.envelopes.stats()
+    assert after["hits"] == before["hits"] + 2
+    assert after["misses"] == before["misses"]
+
+
+def test_envelope_cache_ignores_rolled_back_envelopes(
+    budget_service: BudgetService, db: Session
+) -> None:
+    budget_service.add_transaction("Temp", Decimal("5.00"))
+    db.rollback()
+
+    tx = budget_service.add_transaction("Temp", Decimal("5.00"))
+    db.commit()
+    assert db.get(m.Envelope, tx.env_id) is not None
+
+
+def test_rename_envelope_invalidates_cache(
+    budget_service: BudgetService, db: Session
+) -> None:
+    old = budget_service.add_transaction("Fun", Decimal("-3.00")).env_id
+    budget_service.rename_envelope("Fun", "Leisure")
+    db.commit()
+
+    assert budget_service.add_transaction("Leisure", Decimal("-1.00")).env_id == old
+    assert budget_service.add_transaction("Fun", Decimal("-1.00")).env_id != old
+
+    with pytest.raises(ValueError, match="does not exist"):
+        budget_service.rename_envelope("Missing", "Other")
+    assert (
+        db.scalars(select(m.Envelope).where(m.Envelope.name == "Missing")).all() == []
+    )
+
+
+# test the monthly snapshot matches a raw scan of the ledger
+def test_month_balances_track_writes(
+    budget_service: BudgetService, db: Session
+) -> None:
+    budget_service.add_transaction(
+        "Groceries", Decimal("-10.00"), ts=datetime(2024, 1, 31, 18)
+    )
+    budget_service.add_transaction(
+        "Groceries", Decimal("-5.00"), ts=datetime(2024, 2, 1)
+    )
+    budget_service.import_transactions(
+        [StatementRow("Salary", Decimal("100.00"), "", datetime(2024, 1, 15))] * 3
+    )
+    budget_service.close_month(2024, 1)
+    db.commit()
+
+    assert budget_service.verify_month_balances() == []
+    # whole-month range is served from the snapshot, partial range from the ledger;
+    # closing rolls January's balance out on its last second
+    assert budget_service.report(date(2024, 1, 1), date(2024, 1, 31)) == {
+        "Groceries": Decimal("0.00"),
+        "Salary": Decimal("0.00"),
+    }
+    assert budget_service.report(date(2024, 1, 2), date(2024, 1, 31)) == {
+        "Groceries": Decimal("0.00"),
+        "Salary": Decimal("0.00"),
+    }
+    assert budget_service.report(date(2024, 1, 2), date(2024, 1, 30)) == {
+        "Salary": Decimal("300.00"),
+    }
+    assert budget_service.report(date(2024, 2, 1), date(2024, 2, 29)) == {
+        "Groceries": Decimal("-15.00"),
+        "Salary": Decimal("300.00"),
+    }
+
+
+def test_rebuild_month_balances(budget_service: BudgetService, db: Session) -> None:
+    budget_service.add_transaction("Rent", Decimal("-800.00"), ts=datetime(2024, 3, 1))
+    db.query(m.EnvelopeMonthBalance).update({"balance": Decimal("1.00")})
+    db.commit()
+
+    [mismatch] = budget_service.verify_month_balances()
+    assert mismatch == ("Rent", 2024, 3, Decimal("-800.00"), Decimal("1.00"))
+
+    assert budget_service.rebuild_month_balances() == 1
+    assert budget_service.verify_month_balances() == []
+
+
+# test the set-based rollover writes the same rows as the old per-envelope loop
+def test_close_month_rollover_rows(budget_service: BudgetService, db: Session) -> None:
+    jan = datetime(2024, 1, 10)
+    budget_service.add_transactions(
+        [
+            ("Groceries", Decimal("-40.00"), "", jan),
+            ("Salary", Decimal("0.10"), "", jan),
+            ("Salary", Decimal("0.20"), "", jan),
+            ("Even", Decimal("5.00"), "", jan),
+            ("Even", Decimal("-5.00"), "", jan),
+        ]
+    )
+    db.commit()
+
+    budget_service.close_month(2024, 1)
+    db.commit()
+
+    rows = {
+        (tx.envelope.name, tx.note, tx.type, tx.amount)
+        for tx in db.query(m.Transaction).filter(m.Transaction.note != "")
+    }
+    move = m.TransactionType.MOVE
+    assert rows == {
+        ("Groceries", "rollover to next month", move, Decimal("40.00")),
+        ("Groceries", "opening balance", move, Decimal("-40.00")),
+        ("Salary", "rollover to next month", move, Decimal("-0.30")),
+        ("Salary", "opening balance", move, Decimal("0.30")),
+    }
+    opening = db.query(m.Transaction).filter_by(note="opening balance").first()
+    assert opening is not None and opening.ts == datetime(2024, 2, 1)
+    assert budget_service.verify_month_balances() == []
+
+
+# test streaming the ledger in keyset pages with filters
+def test_iter_transactions(budget_service: BudgetService, db: Session) -> None:
+    budget_service.add_transactions(
+        [
+            ("Rent" if i % 3 else "Food", Decimal(i), "", datetime(2024, 5, 1 + i))
+            for i in range(20)
+        ]
+    )
+    db.commit()
+
+    rows = list(budget_service.iter_transactions(chunk_size=3))
+    assert [r.id for r in rows] == sorted(r.id for r in rows)
+    assert len(rows) == 20
+
+    rows = list(
+        budget_service.iter_transactions(
+            date(2024, 5, 3), date(2024, 5, 10), envelope="Food", chunk_size=2
+        )
+    )
+    assert [r.ts.day for r in rows] == [4, 7, 10]
+
+
+# test the multi-period pivot agrees between the snapshot and the raw ledger
+def test_pivot_report(budget_service: BudgetService, db: Session) -> None:
+    budget_service.add_transactions(
+        [
+            ("Rent", Decimal("-800.00"), "", datetime(2024, month, 1))
+            for month in (1, 2, 4)
+        ]
+        + [("Salary", Decimal("2000.00"), "", datetime(2024, 5, 31, 17))]
+    )
+    db.commit()
+
+    by_month = budget_service.pivot_report(date(2024, 1, 1), date(2024, 6, 30))
+    assert by_month.periods == [f"2024-{m:02d}" for m in range(1, 7)]
+    assert by_month.balances["Rent"][:4] == [
+        Decimal("-800.00"),
+        Decimal("-800.00"),
+        Decimal("0"),
+        Decimal("-800.00"),
+    ]
+
+    raw = budget_service.pivot_report(date(2024, 1, 1), date(2024, 6, 29))
+    assert raw.balances == by_month.balances
+    for end in (date(2024, 6, 29), date(2024, 6, 30)):
+        rent = budget_service.pivot_report(date(2024, 1, 1), end, envelope="Rent")
+        assert rent.balances == {"Rent": by_month.balances["Rent"]}
+
+    quarters = budget_service.pivot_report(
+        date(2024, 1, 1), date(2024, 6, 30), by="quarter", running=True
+    )
+    assert quarters.periods == ["2024-Q1", "2024-Q2"]
+    assert quarters.balances == {
+        "Rent": [Decimal("-1600.00"), Decimal("-2400.00")],
+        "Salary": [Decimal("0"), Decimal("2000.00")],
+    }
+
+    with pytest.raises(ValueError):
+        budget_service.pivot_report(date(2024, 1, 1), date(2024, 6, 30), by="week")
+
+
+# test checkpoint + delta balances match a full scan of the ledger
+def test_balance_as_of_checkpoints(budget_service: BudgetService, db: Session) -> None:
+    for month in range(1, 7):
+        budget_service.add_transactions(
+            [
+                ("Salary", Decimal("1000.00"), "", datetime(2024, month, 1)),
+                ("Rent", Decimal("-600.00"), "", datetime(2024, month, 15)),
+            ]
+        )
+    budget_service.close_month(2024, 2)
+    budget_service.close_month(2024, 4)
+    # backdated into a checkpointed month
+    budget_service.add_transaction("Rent", Decimal("-5.00"), ts=datetime(2024, 1, 20))
+    db.commit()
+
+    assert db.query(m.EnvelopeBalanceCheckpoint).count() == 4
+    for as_of in (
+        date(2024, 1, 31),
+        date(2024, 3, 10),
+        date(2024, 5, 15),
+        date(2024, 6, 30),
+    ):
+        assert budget_service.balance_as_of(as_of) == budget_service.balance_as_of(
+            as_of, full_scan=True
+        )
+    rent = budget_service.balance_as_of(date(2024, 5, 14), "Rent")
+    assert list(rent) == ["Rent"]
+    assert rent == budget_service.balance_as_of(
+        date(2024, 5, 14), "Rent", full_scan=True
+    )
+    assert budget_service.balance_as_of(date(2024, 5, 14), "Missing") == {}
+
+
+# test closing a month before a later closed one shifts the later checkpoint
+def test_close_earlier_month_shifts_checkpoints(
+    budget_service: BudgetService, db: Session
+) -> None:
+    budget_service.add_transaction("Food", Decimal("100.00"), ts=datetime(2024, 1, 10))
+    budget_service.close_month(2024, 3)
+    # opening leg lands in February, before the March checkpoint
+    budget_service.close_month(2024, 1)
+    db.commit()
+
+    for as_of in (date(2024, 1, 31), date(2024, 3, 31), date(2024, 4, 30)):
+        assert budget_service.balance_as_of(as_of) == budget_service.balance_as_of(
+            as_of, full_scan=True
+        )
+    # the rollover leg leaves January as the opening leg enters February
+    assert budget_service.balance_as_of(date(2024, 1, 31)) == {"Food": Decimal("0.00")}
+    assert budget_service.balance_as_of(date(2024, 3, 31)) == {
+        "Food": Decimal("100.00")
+    }
+
+
+# test the opening leg never lands in a month that is already closed
+def test_close_month_before_closed_month(
+    budget_service: BudgetService, db: Session
+) -> None:
+    budget_service.add_transaction("Food", Decimal("100.00"), ts=datetime(2024, 2, 10))
+    budget_service.close_month(2024, 3)
+    db.commit()
+
+    with pytest.raises(ValueError, match="Month 2024-03 is closed"):
+        budget_service.close_month(2024, 2)
+    db.rollback()
+
+    budget_service.close_month(2024, 2, redirect_closed=True)
+    db.commit()
+    opening = db.query(m.Transaction).filter_by(note="opening balance").one()
+    assert opening.ts == datetime(2024, 4, 1)
+    assert budget_service.balance_as_of(
+        date(2024, 3, 31)
+    ) == budget_service.balance_as_of(date(2024, 3, 31), full_scan=True)
+
+
+# test the rollover leg stays in the month being closed, even when now is closed
+def test_close_month_after_current_month(
+    budget_service: BudgetService, db: Session
+) -> None:
+    today = date.today()
+    current = (date(today.year, today.month, 1), today)
+    budget_service.add_transaction("Food", Decimal("100.00"), ts=datetime(2024, 1, 10))
+    budget_service.close_month(today.year, today.month)
+    db.commit()
+    assert budget_service.report(*current) == {}
+
+    budget_service.close_month(2024, 1)
+    db.commit()
+    rollover = db.query(m.Transaction).filter_by(note="rollover to next month").one()
+    assert rollover.ts == datetime(2024, 1, 31, 23, 59, 59)
+    budget_service.reports.clear()
+    assert budget_service.report(*current) == {}
+    assert budget_service.verify_month_balances() == []
+
+
+# test closed-month reports stay cached while open-month ones are invalidated
+def test_report_cache(budget_service: BudgetService, db: Session) -> None:
+    for month in (1, 2):
+        budget_service.add_transaction(
+            "Food", Decimal("-10.00"), ts=datetime(2024, month, 5)
+        )
+    budget_service.close_month(2024, 1)
+    db.commit()
+
+    january = (date(2024, 1, 1), date(2024, 1, 31))
+    february = (date(2024, 2, 1), date(2024, 2, 29))
+    # January's balance rolls out of it into February
+    assert budget_service.report(*january) == {"Food": Decimal("0.00")}
+    # February also holds January's opening balance
+    assert budget_service.report(*february) == {"Food": Decimal("-20.00")}
+    assert budget_service.report(*february, envelope="Rent") == {}
+    assert budget_service.reports.stats()["closed_entries"] == 1
+    assert budget_service.reports.stats()["open_entries"] == 2
+
+    budget_service.report(*january)
+    budget_service.report(*february)
+    assert budget_service.reports.stats()["hits"] == 2
+
+    # Uncommitted writes bypass the cache, committed ones drop open entries
+    budget_service.add_transaction("Food", Decimal("-5.00"), ts=datetime(2024, 2, 9))
+    assert budget_service.report(*february) == {"Food": Decimal("-25.00")}
+    db.commit()
+    stats = budget_service.reports.stats()
+    assert (stats["closed_entries"], stats["open_entries"]) == (1, 0)
+    assert budget_service.report(*february) == {"Food": Decimal("-25.00")}
+
+    # Closed months reject backdated writes, so their entries stay valid
+    with pytest.raises(ValueError, match="2024-01 is closed"):
+        budget_service.add_transaction(
+            "Food", Decimal("-1.00"), ts=datetime(2024, 1, 9)
+        )
+    db.rollback()
+    assert budget_service.reports.stats()["closed_entries"] == 1
+
+
+def _ledger_for_archive(budget_service: BudgetService, db: Session) -> None:
+    for month in (1, 2, 3):
+        for day in (3, 17):
+            budget_service.add_transactions(
+                [
+                    ("Food", Decimal("-12.50"), "", datetime(2024, month, day)),
+                    ("Pay", Decimal("100.00"), "", datetime(2024, month, day)),
+                ]
+            )
+    budget_service.close_month(2024, 1)
+    budget_service.close_month(2024, 2)
+    db.commit()
+
+
+# test archiving into the archive table leaves every report unchanged
+def test_archive_to_table(budget_service: BudgetService, db: Session) -> None:
+    _ledger_for_archive(budget_service, db)
+    ranges = [
+        (date(2024, 1, 1), date(2024, 3, 31)),
+        (date(2024, 1, 10), date(2024, 2, 20)),
+        (date(2024, 2, 1), date(2024, 2, 29)),
+    ]
+    before = [budget_service.report(*r) for r in ranges]
+    pivot = budget_service.pivot_report(date(2024, 1, 5), date(2024, 3, 31))
+
+    with pytest.raises(ValueError, match="2024-03 is not closed"):
+        budget_service.archive_months(date(2024, 4, 1))
+    batches = budget_service.archive_months(date(2024, 3, 1))
+    db.commit()
+
+    assert [(b.year, b.month, b.tx_count) for b in batches] == [
+        (2024, 1, 6),  # includes the rollover legs
+        (2024, 2, 8),  # includes January's opening balances
+    ]
+    hot = db.scalars(select(m.Transaction.ts)).all()
+    assert min(hot) >= datetime(2024, 3, 1)
+    assert db.query(m.TransactionArchive).count() == 14
+    budget_service.reports.clear()
+    assert [budget_service.report(*r) for r in ranges] == before
+    assert budget_service.pivot_report(date(2024, 1, 5), date(2024, 3, 31)) == pivot
+    assert len(list(budget_service.iter_transactions())) == len(hot) + 14
+    assert budget_service.verify_month_balances() == []
+    assert budget_service.balance_as_of(date(2024, 2, 10)) == (
+        budget_service.balance_as_of(date(2024, 2, 10), full_scan=True)
+    )
+
+
+# test ids freed by archiving are never handed out again
+def test_archive_keeps_ids_unique(budget_service: BudgetService, db: Session) -> None:
+    budget_service.add_transaction("Rent", Decimal("50.00"), ts=datetime(2024, 2, 1))
+    budget_service.add_transaction("Food", Decimal("10.00"), ts=datetime(2024, 1, 5))
+    budget_service.add_transaction("Food", Decimal("-10.00"), ts=datetime(2024, 1, 6))
+    budget_service.close_month(2024, 1)
+    budget_service.archive_months(date(2024, 2, 1))
+    tx = budget_service.add_transaction(
+        "Food", Decimal("-5.00"), ts=datetime(2024, 3, 1)
+    )
+    db.commit()
+
+    archived = db.scalars(select(m.TransactionArchive.id)).all()
+    assert tx.id > max(archived)
+    rows = list(budget_service.iter_transactions(chunk_size=1))
+    assert len(rows) == 4
+    assert len({r.id for r in rows}) == 4
+
+
+# test archiving to files keeps the monthly summaries
+def test_archive_to_files(
+    budget_service: BudgetService, db: Session, tmp_path: Path
+) -> None:
+    _ledger_for_archive(budget_service, db)
+    january = (date(2024, 1, 1), date(2024, 1, 31))
+    expected = budget_service.report(*january)
+
+    batches = budget_service.archive_months(date(2024, 2, 1), tmp_path, "csv")
+    db.commit()
+    assert [b.path for b in batches] == [str(tmp_path / "transactions-2024-01.csv.gz")]
+    with gzip.open(tmp_path / "transactions-2024-01.csv.gz", "rt") as fh:
+        assert len(fh.read().splitlines()) == 1 + batches[0].tx_count
+
+    budget_service.reports.clear()
+    assert budget_service.report(*january) == expected
+    with pytest.raises(ValueError, match="archived to"):
+        budget_service.report(date(2024, 1, 2), date(2024, 1, 9))
+
+    # The file-archived month survives a rebuild and is skipped by verify
+    budget_service.rebuild_month_balances()
+    db.commit()
+    budget_service.reports.clear()
+    assert budget_service.report(*january) == expected
+    assert budget_service.verify_month_balances() == []
+    for as_of in (date(2024, 1, 31), date(2024, 3, 20)):
+        assert budget_service.balance_as_of(as_of) == (
+            budget_service.balance_as_of(as_of, full_scan=True)
+        )
+
+
+# test writes into closed months are rejected or redirected on every write path
+def test_closed_month_guard(budget_service: BudgetService, db: Session) -> None:
+    budget_service.add_transaction("Food", Decimal("-5.00"), ts=datetime(2024, 1, 5))
+    db.commit()
+    budget_service.close_month(2024, 1)
+    # Closed for this session before the commit
+    with pytest.raises(ValueError, match="2024-01 is closed"):
+        budget_service.add_transaction(
+            "Food", Decimal("-1.00"), ts=datetime(2024, 1, 9)
+        )
+    db.rollback()
+
+    budget_service.close_month(2024, 1)
+    budget_service.close_month(2024, 2)
+    db.commit()
+    assert budget_service.closed.periods(db) == {(2024, 1), (2024, 2)}
+
+    rows = [("Food", Decimal("-1.00"), "", datetime(2024, 1, 20 + i)) for i in range(3)]
+    with pytest.raises(ValueError, match="2024-01 is closed"):
+        budget_service.import_transactions(rows, batch_size=2)
+    db.rollback()
+
+    assert budget_service.import_transactions(rows, redirect_closed=True) == (3, 0)
+    redirected = budget_service.add_transactions(
+        [("Rent", Decimal("-9.00"), "", datetime(2024, 2, 11, 15))],
+        redirect_closed=True,
+    )
+    db.commit()
+    assert redirected[0].ts == datetime(2024, 3, 1)
+    march = db.scalars(
+        select(m.Transaction.ts).where(m.Transaction.ts >= datetime(2024, 3, 1))
+    ).all()
+    assert march.count(datetime(2024, 3, 1)) == 5  # opening, 3 imported, 1 added
+    assert budget_service.verify_month_balances() == []
+
+
+# test note search with filters and keyset pages
+def test_search_notes(budget_service: BudgetService, db: Session) -> None:
+    notes = ["Coffee shop", "coffee beans", "rent", "Coffee shop again", None]
+    budget_service.add_transactions(
+        [
+            (
+                "Food" if day != 4 else "Treats",
+                Decimal("-3.00"),
+                note,
+                datetime(2024, 1, day),
+            )
+            for day, note in enumerate(notes, start=1)
+        ]
+    )
+    db.commit()
+
+    assert [r.note for r in budget_service.search("COFF")] == [
+        "Coffee shop again",
+        "coffee beans",
+        "Coffee shop",
+    ]
+    assert [r.id for r in budget_service.search("coffee sh")] == [4, 1]
+    assert [r.id for r in budget_service.search("coffee", envelope="Food")] == [2, 1]
+    assert [r.id for r in budget_service.search("coffee", start=date(2024, 1, 2))] == [
+        4,
+        2,
+    ]
+
+    first = budget_service.search("coffee", limit=2)
+    rest = budget_service.search("coffee", limit=2, before_id=first[-1].id)
+    assert [r.id for r in first + rest] == [4, 2, 1]
+
+    # The index follows updates and deletes made outside the service
+    tx = db.get(m.Transaction, 3)
+    assert tx is not None
+    tx.note = "coffee refund"
+    db.delete(db.get(m.Transaction, 4))
+    db.flush()
+    assert [r.id for r in budget_service.search("coffee")] == [3, 2, 1]
+
+    with pytest.raises(ValueError):
+        budget_service.search("  %% ")
+
+
+# test budget vs actual lists idle envelopes and sorts and filters in SQL
+def test_variance(budget_service: BudgetService, db: Session) -> None:
+    budget_service.set_budgets(
+        {"Food": Decimal("100.00"), "Fun": Decimal("10.00"), "Idle": Decimal("50")}
+    )
+    budget_service.add_transactions(
+        [
+            ("Food", Decimal("-110.00"), "groceries", datetime(2024, 1, 3)),
+            ("Food", Decimal("40.00"), "refund", datetime(2024, 1, 4)),
+            ("Fun", Decimal("-5.00"), None, datetime(2024, 1, 9)),
+            # a real expense that happens to share a close leg's note
+            ("Fun", Decimal("-2.00"), "opening balance", datetime(2024, 1, 10)),
+            ("Fun", Decimal("-8.00"), "cinema", datetime(2024, 2, 1)),
+        ]
+    )
+    db.commit()
+    budget_service.close_month(2024, 1)
+    db.commit()
+
+    january = budget_service.variance(date(2024, 1, 1), date(2024, 1, 31))
+    assert [tuple(r) for r in january] == [
+        (
+            "Food",
+            Decimal("100.00"),
+            Decimal("110.00"),
+            Decimal("-10.00"),
+            Decimal("110.0"),
+        ),
+        ("Fun", Decimal("10.00"), Decimal("7.00"), Decimal("3.00"), Decimal("70.0")),
+        ("Idle", Decimal("50.00"), Decimal("0"), Decimal("50.00"), Decimal("0.0")),
+    ]
+    over = budget_service.variance(date(2024, 1, 1), date(2024, 1, 31), over_only=True)
+    assert [r.envelope for r in over] == ["Food"]
+
+    # Monthly budgets scale with the range; close-month legs are not spending
+    both = budget_service.variance(
+        date(2024, 1, 1), date(2024, 2, 29), sort="remaining"
+    )
+    assert [(r.envelope, r.budget, r.spent) for r in both] == [
+        ("Fun", Decimal("20.00"), Decimal("15.00")),
+        ("Food", Decimal("200.00"), Decimal("110.00")),
+        ("Idle", Decimal("100.00"), Decimal("0")),
+    ]
+    with pytest.raises(ValueError):
+        budget_service.variance(date(2024, 1, 1), date(2024, 1, 31), sort="size")
+
+    # Transfers between envelopes are not spending either
+    budget_service.move("Food", "Fun", Decimal("60.00"))
+    db.commit()
+    today = date.today()
+    moved = budget_service.variance(date(today.year, today.month, 1), today)
+    assert [(r.envelope, r.spent) for r in moved] == [
+        ("Food", Decimal("0")),
+        ("Fun", Decimal("0")),
+        ("Idle", Decimal("0")),
+    ]
+
+
+# test set_budgets updates many envelopes in one statement
+def test_set_budgets(budget_service: BudgetService, db: Session) -> None:
+    budget_service.add_transaction("Food", Decimal("-1.00"))
+    db.commit()
+
+    statements: list[tuple[str, bool]] = []
+    engine = db.get_bind()
+
+    def on_execute(conn, cursor, statement, params, context, many) -> None:  # type: ignore[no-untyped-def]
+        statements.append((statement, many))
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        budget = {f"Env {i}": Decimal(i) for i in range(50)}
+        assert budget_service.set_budgets({"Food": Decimal("25"), **budget}) == 51
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+    db.commit()
+
+    updates = [many for s, many in statements if s.lstrip().startswith("UPDATE")]
+    assert updates == [False]
+    assert db.scalar(select(m.Envelope.budget).where(m.Envelope.name == "Food")) == 25
+    assert db.scalar(select(m.Envelope.budget).where(m.Envelope.name == "Env 49")) == 49
+    with pytest.raises(ValueError):
+        budget_service.set_budgets({"Food": Decimal("-1")})
+
+
+# test recurring schedules materialize once per occurrence
+def test_materialize_schedules(budget_service: BudgetService, db: Session) -> None:
+    rent = budget_service.add_schedule(
+        "Rent", Decimal("-900.00"), "monthly", date(2024, 1, 31), "rent"
+    )
+    budget_service.add_schedule(
+        "Salary", Decimal("1000.00"), "biweekly", date(2024, 1, 5), end=date(2024, 2, 9)
+    )
+    budget_service.add_schedule("Later", Decimal("-1.00"), "yearly", date(2025, 1, 1))
+    db.commit()
+
+    assert budget_service.materialize(date(2024, 3, 31)) == (6, 0, 0)
+    db.commit()
+    rent_days = db.scalars(
+        select(m.Transaction.ts)
+        .where(m.Transaction.schedule_id == rent.id)
+        .order_by(m.Transaction.ts)
+    ).all()
+    assert [ts.date() for ts in rent_days] == [
+        date(2024, 1, 31),
+        date(2024, 2, 29),
+        date(2024, 3, 31),
+    ]
+    assert budget_service.report(date(2024, 2, 1), date(2024, 2, 29)) == {
+        "Rent": Decimal("-900.00"),
+        "Salary": Decimal("1000.00"),
+    }
+
+    # Reruns write nothing, and a deleted occurrence is not brought back
+    assert budget_service.materialize(date(2024, 3, 31)) == (0, 0, 0)
+    db.execute(delete(m.Transaction).where(m.Transaction.ts == datetime(2024, 2, 29)))
+    budget_service.rebuild_month_balances()
+    db.commit()
+    assert budget_service.materialize(date(2024, 3, 31)) == (0, 0, 0)
+
+    # Occurrences in closed months are skipped, not redirected
+    budget_service.add_schedule("Gym", Decimal("-30.00"), "monthly", date(2024, 1, 15))
+    budget_service.close_month(2024, 1)
+    db.commit()
+    assert budget_service.materialize(date(2024, 4, 30)) == (4, 0, 1)
+    db.commit()
+    assert budget_service.verify_month_balances() == []
+
+    with pytest.raises(ValueError):
+        budget_service.add_schedule("Rent", Decimal("-1"), "hourly", date(2024, 1, 1))
@@ -0,0 +1,50 @@
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from pathlib import Path
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from budgetwise_cli.domain import models as m
+from budgetwise_cli.domain.models import Base
+from budgetwise_cli.services.budget_service import BudgetService
+
+WRITERS = 8
+ADDS_PER_WRITER = 25
+ENVELOPES = [f"Shared {i}" for i in range(5)]
+
+
+def _writer(url: str, writer: int) -> None:
+    # Each writer is a separate engine, like a separate `add` process
+    engine = create_engine(url, connect_args={"timeout": 30})
+    try:
+        for i in range(ADDS_PER_WRITER):
+            with Session(engine) as db:
+                BudgetService(db).add_transaction(
+                    ENVELOPES[(writer + i) % len(ENVELOPES)],
+                    Decimal("-1.00"),
+                    f"writer {writer}",
+                )
+                db.commit()
+    finally:
+        engine.dispose()
+
+
+# test parallel writers creating the same envelopes never fail
+def test_parallel_writers_create_envelopes(tmp_path: Path) -> None:
+    url = f"sqlite:///{tmp_path / 'ledger.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+
+    with ThreadPoolExecutor(max_workers=WRITERS) as pool:
+        futures = [pool.submit(_writer, url, w) for w in range(WRITERS)]
+        for future in futures:
+            future.result()
+
+    with Session(engine) as db:
+        names = db.scalars(select(m.Envelope.name).order_by(m.Envelope.name)).all()
+        assert names == ENVELOPES
+        total = db.scalar(select(func.count()).select_from(m.Transaction))
+        assert total == WRITERS * ADDS_PER_WRITER
+        assert BudgetService(db).verify_month_balances() == []
+    engine.dispose()
@@ -0,0 +1,133 @@
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.exc import OperationalError
+
+from budgetwise_cli.domain import models as m
+from budgetwise_cli.infra import db
+from budgetwise_cli.infra.db import (
+    EngineSettings,
+    create_engine_from_settings,
+    get_session,
+    load_settings,
+)
+
+
+# test the config file is read and environment variables override it
+def test_load_settings(tmp_path: Path) -> None:
+    config = tmp_path / "budgetwise.toml"
+    config.write_text(
+        "[database]\n"
+        'url = "sqlite:///from-file.db"\n'
+        "pool_size = 2\n"
+        "pool_pre_ping = true\n"
+    )
+    settings = load_settings(
+        {
+            "BUDGETWISE_POOL_SIZE": "20",
+            "BUDGETWISE_PREPARE_THRESHOLD": "none",
+            "BUDGETWISE_PGBOUNCER": "yes",
+            "READ_DATABASE_URL": "sqlite:///replica.db",
+        },
+        config,
+    )
+    assert settings.url == "sqlite:///from-file.db"
+    assert settings.pool_size == 20
+    assert settings.pool_pre_ping is True
+    assert settings.prepare_threshold is None
+    assert settings.pgbouncer is True
+    assert settings.read_url == "sqlite:///replica.db"
+    assert settings.read_your_writes is True
+
+    with pytest.raises(ValueError):
+        load_settings({"BUDGETWISE_POOL_SIZE": "many"}, tmp_path / "missing.toml")
+    config.write_text("[database]\npool_sise = 2\n")
+    with pytest.raises(ValueError):
+        load_settings({}, config)
+
+
+# test SQLite PRAGMAs are applied to every new connection
+def test_sqlite_pragmas(tmp_path: Path) -> None:
+    settings = EngineSettings(
+        url=f"sqlite:///{tmp_path / 'ledger.db'}", sqlite_mmap_size=None
+    )
+    engine = create_engine_from_settings(settings)
+    with engine.connect() as conn:
+
+        def pragma(name: str) -> object:
+            return conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+        assert pragma("journal_mode") == "wal"
+        assert pragma("synchronous") == 1  # NORMAL
+        assert pragma("cache_size") == settings.sqlite_cache_size
+        assert pragma("busy_timeout") == settings.sqlite_busy_timeout
+        assert pragma("mmap_size") == 0
+    engine.dispose()
+
+    with pytest.raises(ValueError):
+        create_engine_from_settings(settings._replace(sqlite_synchronous="off; --"))
+
+
+@pytest.fixture
+def replica(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    # A primary and a "replica" file told apart by one envelope each
+    settings = EngineSettings(
+        url=f"sqlite:///{tmp_path / 'primary.db'}",
+        read_url=f"sqlite:///{tmp_path / 'replica.db'}",
+    )
+    for url, name in ((settings.url, "Primary"), (settings.read_url, "Replica")):
+        engine = create_engine_from_settings(settings._replace(url=url))
+        m.Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(insert(m.Envelope), [{"name": name}])
+        engine.dispose()
+    for name in (
+        "_engine",
+        "_session_factory",
+        "_read_engine",
+        "_read_session_factory",
+    ):
+        monkeypatch.setattr(db, name, None)
+    monkeypatch.setattr(db, "_settings", settings)
+    monkeypatch.setattr(db, "_wrote", False)
+    yield
+    for engine in (db._engine, db._read_engine):
+        if engine is not None:
+            engine.dispose()
+
+
+def _envelopes(readonly: bool) -> list[str]:
+    with get_session(readonly=readonly) as session:
+        return list(session.scalars(select(m.Envelope.name).order_by(m.Envelope.name)))
+
+
+# test read-only sessions use the replica until the command writes
+def test_read_replica_routing(replica: None, monkeypatch: pytest.MonkeyPatch) -> None:
+    assert _envelopes(readonly=True) == ["Replica"]
+    assert _envelopes(readonly=False) == ["Primary"]
+    assert not db._wrote
+    with pytest.raises(OperationalError, match="readonly"):
+        with get_session(readonly=True) as session:
+            session.execute(insert(m.Envelope), [{"name": "Nope"}])
+
+    # A committed write pins this command's reads to the primary
+    with get_session() as session:
+        session.add(m.Envelope(name="Written"))
+    assert _envelopes(readonly=True) == ["Primary", "Written"]
+    db.forget_writes()
+    assert _envelopes(readonly=True) == ["Replica"]
+
+    # Rolled back writes do not count, and the pinning can be turned off
+    with pytest.raises(RuntimeError):
+        with get_session() as session:
+            session.execute(insert(m.Envelope), [{"name": "Lost"}])
+            raise RuntimeError
+    assert _envelopes(readonly=True) == ["Replica"]
+    settings = db.get_settings()._replace(read_your_writes=False)
+    monkeypatch.setattr(db, "_settings", settings)
+    with get_session() as session:
+        session.execute(insert(m.Envelope), [{"name": "Bulk"}])
+    assert db._wrote
+    assert _envelopes(readonly=True) == ["Replica"]
@@ -0,0 +1,96 @@
+import random
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.orm import Session
+
+from budgetwise_cli.domain.money import (
+    format_amount,
+    format_cents,
+    from_cents,
+    to_cents,
+)
+from budgetwise_cli.services.budget_service import BudgetService
+
+# Property tests draw from a seeded generator so failures reproduce
+SEED = 20240601
+CASES = 2000
+
+
+def _cents(rng: random.Random) -> int:
+    # Mostly everyday amounts, with the column's full Numeric(12, 2) range mixed in
+    limit = rng.choice((100, 10_000, 1_000_000, 10**12 - 1))
+    return rng.randint(-limit, limit)
+
+
+# test cents and Decimal convert both ways without losing a cent
+def test_round_trip() -> None:
+    rng = random.Random(SEED)
+    for _ in range(CASES):
+        cents = _cents(rng)
+        amount = Decimal(cents) / 100
+        assert from_cents(cents) == amount
+        assert to_cents(amount) == to_cents(from_cents(cents)) == cents
+        assert to_cents(str(amount)) == cents
+        assert format_cents(cents) == format_amount(amount) == f"{amount:.2f}"
+
+
+# test integer sums match Decimal sums exactly, where floats drift
+def test_sums_match_decimal() -> None:
+    rng = random.Random(SEED)
+    for _ in range(200):
+        cents = [_cents(rng) for _ in range(rng.randint(1, 500))]
+        amounts = [from_cents(c) for c in cents]
+        assert from_cents(sum(cents)) == sum(amounts, Decimal("0"))
+    drift = [from_cents(10)] * 10
+    assert sum(float(a) for a in drift) != 1.0
+    assert from_cents(sum(map(to_cents, drift))) == Decimal("1.00")
+
+
+def test_to_cents_is_exact() -> None:
+    assert to_cents(Decimal("12.3")) == 1230
+    assert to_cents(Decimal("1E+2")) == 10000
+    assert to_cents(Decimal("-0.00")) == 0
+    assert to_cents(7) == 700
+    assert format_cents(-5) == "-0.05"
+    for bad in (Decimal("0.005"), Decimal("-1.001"), Decimal("NaN"), "abc"):
+        with pytest.raises(ValueError):
+            to_cents(bad)
+
+
+# test the service's cent based aggregations against a Decimal reference
+def test_service_matches_decimal_reference(
+    budget_service: BudgetService, db: Session
+) -> None:
+    rng = random.Random(SEED)
+    names = ["Food", "Rent", "Fun", "Salary"]
+    records = [
+        (
+            rng.choice(names),
+            from_cents(_cents(rng) % 10**8 - 5 * 10**7),
+            "",
+            datetime(2024, rng.randint(1, 6), rng.randint(1, 28), 12),
+        )
+        for _ in range(1500)
+    ]
+    budget_service.import_transactions(records, batch_size=400)
+    db.commit()
+
+    expected: dict[str, list[Decimal]] = {n: [Decimal("0")] * 6 for n in names}
+    for name, amount, _, ts in records:
+        expected[name][ts.month - 1] += amount
+    pivot = budget_service.pivot_report(date(2024, 1, 1), date(2024, 6, 30))
+    assert pivot.balances == expected
+
+    as_of = date(2024, 4, 15)
+    totals = {n: sum(row[:3], Decimal("0")) for n, row in expected.items()}
+    for name, amount, _, ts in records:
+        if ts.month == 4 and ts.day <= 15:
+            totals[name] += amount
+    assert budget_service.balance_as_of(as_of) == totals
+    assert budget_service.balance_as_of(as_of, full_scan=True) == totals
+    assert budget_service.verify_month_balances() == []
+
+    with pytest.raises(ValueError, match="two decimal places"):
+        budget_service.add_transaction("Food", Decimal("-1.005"))
@@ -0,0 +1,42 @@
+import json
+import time
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+from sqlalchemy.orm import Session
+
+from budgetwise_cli.infra.profiling import SLOWEST, Profiler
+from budgetwise_cli.services.budget_service import BudgetService
+
+
+# test statements and service time are recorded and the hooks removed after
+def test_profiler_counts_statements(db: Session, tmp_path: Path) -> None:
+    original = BudgetService.add_transaction
+    profiler = Profiler(time.perf_counter())
+    profiler.enable(BudgetService)
+    try:
+        service = BudgetService(db)
+        for i in range(10):
+            service.add_transaction(f"Envelope {i % 3}", Decimal("5.00"))
+        service.report(date.today(), date.today())
+        list(service.iter_transactions())
+    finally:
+        profiler.disable()
+    assert BudgetService.add_transaction is original
+
+    summary = profiler.summary()
+    assert summary["statements"] == profiler.count > 10
+    assert sum(s["count"] for s in summary["by_statement"]) == summary["statements"]
+    assert len(summary["slowest"]) == SLOWEST
+    assert 0 < summary["phases"]["service"] <= summary["phases"]["total"]
+    assert summary["db_seconds"] <= summary["phases"]["service"]
+
+    # Statements run after disable() are not counted
+    BudgetService(db).add_transaction("Late", Decimal("1.00"))
+    assert profiler.count == summary["statements"]
+
+    out = tmp_path / "profile.json"
+    profiler.write_json(out)
+    assert json.loads(out.read_text())["statements"] == summary["statements"]
+    assert "statements" in profiler.format_text()
@@ -0,0 +1,74 @@
+import re
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from budgetwise_cli.services.budget_service import BudgetService
+
+# Any full pass over the ledger or the snapshot table is a regression
+FULL_SCAN = re.compile(r"^SCAN (transactions|envelope_month_balances)\b")
+LEDGER = re.compile(r"\b(transactions|envelope_month_balances)\b")
+# INSERT .. SELECT and UPDATE .. WHERE have query plans too
+PLANNED = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+
+def _query_plans(db: Session, action: Callable[[], Any]) -> list[str]:
+    # Run action and EXPLAIN QUERY PLAN every statement it issued
+    captured: list[tuple[str, Any]] = []
+
+    def capture(conn: Any, cursor: Any, stmt: str, params: Any, *args: Any) -> None:
+        if stmt.lstrip().upper().startswith(PLANNED):
+            captured.append((stmt, params))
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        action()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    conn = db.connection()
+    plans = [
+        row[3]
+        for stmt, params in captured
+        for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {stmt}", params)
+    ]
+    # An empty capture would make the scan checks pass vacuously
+    assert [p for p in plans if LEDGER.search(p)], "no ledger table was planned"
+    return plans
+
+
+@pytest.fixture
+def ledger(budget_service: BudgetService, db: Session) -> BudgetService:
+    for day in range(1, 29):
+        budget_service.add_transactions(
+            [
+                ("Groceries", Decimal("-4.20"), "", datetime(2024, 2, day)),
+                ("Salary", Decimal("50.00"), "", datetime(2024, 2, day)),
+            ]
+        )
+    db.commit()
+    return budget_service
+
+
+@pytest.mark.parametrize(
+    "start, end",
+    [
+        (date(2024, 2, 3), date(2024, 2, 17)),  # raw ledger range
+        (date(2024, 2, 1), date(2024, 2, 29)),  # whole month snapshot
+    ],
+)
+def test_report_uses_indexes(
+    ledger: BudgetService, db: Session, start: date, end: date
+) -> None:
+    plans = _query_plans(db, lambda: ledger.report(start, end))
+    assert not [p for p in plans if FULL_SCAN.match(p)], plans
+
+
+def test_close_month_uses_indexes(ledger: BudgetService, db: Session) -> None:
+    plans = _query_plans(db, lambda: ledger.close_month(2024, 2))
+    assert not [p for p in plans if FULL_SCAN.match(p)], plans
@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Wall-clock budget for `--help`, generous enough for a loaded CI runner
+HELP_BUDGET_SECONDS = 1.5
+
+# Modules that must only load once a command actually runs
+HEAVY_MODULES = (
+    "sqlalchemy",
+    "psycopg",
+    "psycopg2",
+    "numpy",
+    "budgetwise_cli.domain.models",
+    "budgetwise_cli.services.budget_service",
+    "budgetwise_cli.services.analytics",
+)
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _run_help(*python_flags: str) -> subprocess.CompletedProcess[str]:
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    return subprocess.run(
+        [sys.executable, *python_flags, "-m", "budgetwise_cli.cli.app", "--help"],
+        capture_output=True,
+        text=True,
+        env=env,
+        timeout=60,
+        check=True,
+    )
+
+
+def test_help_does_not_import_heavy_modules() -> None:
+    result = _run_help("-X", "importtime")
+    imported = {
+        line.rsplit("|", 1)[-1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:")
+    }
+
+    heavy = sorted(
+        name
+        for name in imported
+        for prefix in HEAVY_MODULES
+        if name == prefix or name.startswith(prefix + ".")
+    )
+    assert heavy == []
+
+
+def test_help_within_time_budget() -> None:
+    timings = []
+    for _ in range(3):
+        started = time.perf_counter()
+        _run_help()
+        timings.append(time.perf_counter() - started)
+    assert min(timings) < HELP_BUDGET_SECONDS, timings
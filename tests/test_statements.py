@@ -0,0 +1,120 @@
+import pytest
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+from budgetwise_cli.services.statements import (
+    StatementRow,
+    read_statement,
+    with_content_ids,
+    write_statement,
+)
+
+
+def test_read_csv(tmp_path: Path) -> None:
+    path = tmp_path / "bank.csv"
+    path.write_text(
+        "Date,Description,Amount,Category\n"
+        "2024-06-01,Supermarket,-42.10,Groceries\n"
+        '06/02/2024,Paycheck,"1,500.00",\n'
+    )
+
+    rows = list(read_statement(path, default_envelope="Checking"))
+
+    assert rows == [
+        StatementRow(
+            "Groceries", Decimal("-42.10"), "Supermarket", datetime(2024, 6, 1)
+        ),
+        StatementRow("Checking", Decimal("1500.00"), "Paycheck", datetime(2024, 6, 2)),
+    ]
+
+
+def test_read_ofx(tmp_path: Path) -> None:
+    path = tmp_path / "bank.ofx"
+    path.write_text(
+        "OFXHEADER:100\n<OFX><BANKTRANLIST>\n"
+        "<STMTTRN>\n<TRNTYPE>DEBIT\n<DTPOSTED>20240603120000.000[-5:EST]\n"
+        "<TRNAMT>-9.99\n<NAME>Streaming\n</STMTTRN>\n"
+        "<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20240604<TRNAMT>20.00<MEMO>Refund</STMTTRN>\n"
+        "</BANKTRANLIST></OFX>\n"
+    )
+
+    rows = list(read_statement(path, default_envelope="Checking"))
+
+    assert rows == [
+        StatementRow(
+            "Checking", Decimal("-9.99"), "Streaming", datetime(2024, 6, 3, 12)
+        ),
+        StatementRow("Checking", Decimal("20.00"), "Refund", datetime(2024, 6, 4)),
+    ]
+
+
+# test FITIDs are scoped to the statement's account, or else the envelope
+def test_read_ofx_fitids(tmp_path: Path) -> None:
+    transaction = (
+        "<STMTTRN><DTPOSTED>20240603<TRNAMT>-9.99<NAME>Coffee<FITID>1001</STMTTRN>\n"
+    )
+    path = tmp_path / "bank.ofx"
+    path.write_text(
+        "<OFX><BANKACCTFROM><BANKID>99<ACCTID>12345</BANKACCTFROM>\n"
+        f"<BANKTRANLIST>\n{transaction}</BANKTRANLIST></OFX>\n"
+    )
+    bare = tmp_path / "bare.ofx"
+    bare.write_text(f"<OFX><BANKTRANLIST>\n{transaction}</BANKTRANLIST></OFX>\n")
+
+    assert [r.external_id for r in read_statement(path)] == ["12345:1001"]
+    assert [
+        r.external_id for r in read_statement(bare, default_envelope="Checking")
+    ] == ["Checking:1001"]
+
+
+def test_read_jsonl_reports_bad_line(tmp_path: Path) -> None:
+    path = tmp_path / "ledger.jsonl"
+    path.write_text(
+        '{"envelope": "Rent", "amount": "-800", "ts": "2024-06-01T09:00:00"}\n'
+        '{"envelope": "Rent", "amount": "oops", "ts": "2024-06-02"}\n'
+    )
+
+    rows = read_statement(path)
+    assert next(rows).amount == Decimal("-800")
+    with pytest.raises(ValueError, match="line 2"):
+        next(rows)
+
+
+def test_export_round_trips_through_import(tmp_path: Path) -> None:
+    rows = [
+        (1, "Rent", "expense", Decimal("-800.00"), "June, rent", datetime(2024, 6, 1)),
+        (2, "Salary", "income", Decimal("2500.00"), None, datetime(2024, 6, 2, 9)),
+    ]
+    expected = [
+        StatementRow("Rent", Decimal("-800.00"), "June, rent", datetime(2024, 6, 1)),
+        StatementRow("Salary", Decimal("2500.00"), "", datetime(2024, 6, 2, 9)),
+    ]
+    for fmt in ("csv", "jsonl"):
+        path = tmp_path / f"export.{fmt}"
+        with path.open("w", newline="") as fh:
+            assert write_statement(rows, fh, fmt) == 2
+        assert list(read_statement(path)) == expected
+
+
+# test identical rows get distinct content ids that are stable across runs
+def test_content_ids(tmp_path: Path) -> None:
+    path = tmp_path / "bank.csv"
+    path.write_text(
+        "Date,Description,Amount,FITID\n"
+        "2024-06-01,Coffee,-3.00,\n"
+        "2024-06-01,Coffee,-3.00,\n"
+        "2024-06-02,Coffee,-3.00,\n"
+        "2024-06-02,Book,-12.00,bank-77\n"
+    )
+
+    ids = [row.external_id for row in with_content_ids(read_statement(path))]
+    assert ids[3] == "bank-77"
+    assert len(set(ids)) == 4
+    assert ids == [row.external_id for row in with_content_ids(read_statement(path))]
+    # Rows identical but for the amount's exponent hash alike
+    row = StatementRow("Food", Decimal("-3.0"), "Coffee", datetime(2024, 6, 1))
+    again = row._replace(amount=Decimal("-3.00"))
+    assert [r.external_id for r in with_content_ids([row])] == [
+        r.external_id for r in with_content_ids([again])
+    ]